@@ -2,15 +2,19 @@ import os
 from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
 import certifi
+from app.utils.telemetry import mongo_listener
 
 load_dotenv()
 
 MONGO_URL = os.getenv("MONGO_URL")
+# Atlas needs TLS; a local mongod (benchmarks, development) usually doesn't
+MONGO_TLS = os.getenv("MONGO_TLS", "true").lower() == "true"
 
 client = AsyncIOMotorClient(
     MONGO_URL,
-    tls=True,
-    tlsCAFile=certifi.where()
+    # Spans and duration histograms for every command
+    event_listeners=[mongo_listener],
+    **({"tls": True, "tlsCAFile": certifi.where()} if MONGO_TLS else {})
 )
 db = client.resume_analyzer
 
@@ -23,4 +27,8 @@ async def test_connection():
     except Exception as e:
         print("❌ MongoDB connection failed:", str(e))
 
-asyncio.create_task(test_connection())
+try:
+    asyncio.get_running_loop().create_task(test_connection())
+except RuntimeError:
+    # Imported outside an event loop (worker / migration CLIs): skip the startup ping
+    pass
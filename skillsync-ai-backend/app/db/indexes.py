@@ -0,0 +1,39 @@
+# app/db/indexes.py
+
+from .database import db
+
+async def ensure_indexes():
+    """Creates the indexes the app relies on. Safe to run on every startup."""
+    try:
+        # Persistent LLM result cache: Mongo drops rows once `expires_at` passes
+        await db.llm_cache.create_index("expires_at", expireAfterSeconds=0)
+        # Scraped JD cache: same TTL scheme, keyed by canonical posting id
+        await db.scraped_jds.create_index("expires_at", expireAfterSeconds=0)
+
+        # /recruit/filter-matches: score range + sort, date sort, and skill lookups,
+        # each ending in _id so keyset pagination stays on the index
+        await db.matches.create_index([("fit_percentage", -1), ("created_at", -1), ("_id", -1)])
+        await db.matches.create_index([("created_at", -1), ("_id", -1)])
+        await db.matches.create_index([("matching_skills_lc", 1), ("fit_percentage", -1), ("created_at", -1), ("_id", -1)])
+        # Match rows reference their JD / parsed resume by content hash
+        await db.matches.create_index("jd_id")
+        await db.matches.create_index("resume_id")
+        # One match row per bulk job item, however many times the item is processed
+        await db.matches.create_index(
+            [("bulk_job_id", 1), ("bulk_item_id", 1)],
+            unique=True,
+            partialFilterExpression={"bulk_item_id": {"$exists": True}}
+        )
+
+        # Per-user lookups used when (re)building the user_stats aggregates
+        await db.resumes.create_index("user_email")
+        await db.job_descriptions.create_index("user_email")
+        await db.analysis.create_index("user_id")
+
+        # Bulk job queue: claiming the next item and reading a job's finished items
+        await db.bulk_job_items.create_index([("status", 1), ("lease_expires_at", 1), ("_id", 1)])
+        await db.bulk_job_items.create_index([("job_id", 1), ("status", 1), ("finished_at", 1)])
+        await db.bulk_jobs.create_index("status")
+        print("✅ MongoDB indexes ensured.")
+    except Exception as e:
+        print("❌ Failed to ensure MongoDB indexes:", str(e))
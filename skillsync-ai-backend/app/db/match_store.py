@@ -0,0 +1,117 @@
+# app/db/match_store.py
+#
+# Match rows reference their JD and parsed resume by content hash instead of embedding them:
+#   jd_documents:   {_id: sha256(jd_text), jd_text, created_at}
+#   parsed_resumes: {_id: sha256(parsed_text), parsed_resume, created_at}
+#   matches:        {jd_id, resume_id, resume_name, fit_percentage, ...}
+#                   (+ bulk_job_id, bulk_item_id for rows written by the job queue)
+
+import os
+from datetime import datetime
+from typing import List, Optional
+
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from .database import db
+from app.utils.text_utils import content_hash
+
+BULK_WRITE_BATCH_SIZE = int(os.getenv("BULK_WRITE_BATCH_SIZE", 25))
+
+
+def jd_upsert(jd_text: str, now: datetime) -> UpdateOne:
+    return UpdateOne(
+        {"_id": content_hash(jd_text)},
+        {"$setOnInsert": {"jd_text": jd_text, "created_at": now}},
+        upsert=True
+    )
+
+
+def resume_upsert(parsed: dict, now: datetime) -> UpdateOne:
+    return UpdateOne(
+        {"_id": content_hash(parsed.get("parsed_text", ""))},
+        {"$setOnInsert": {"parsed_resume": parsed, "created_at": now}},
+        upsert=True
+    )
+
+
+async def save_jd(jd_text: str) -> str:
+    """Stores the JD once per distinct content and returns its id."""
+    jd_id = content_hash(jd_text)
+    await db.jd_documents.update_one(
+        {"_id": jd_id},
+        {"$setOnInsert": {"jd_text": jd_text, "created_at": datetime.utcnow()}},
+        upsert=True
+    )
+    return jd_id
+
+
+def _match_write(record: dict, key: Optional[dict]):
+    if key is None:
+        return InsertOne(record)
+    return UpdateOne(
+        key,
+        {"$setOnInsert": {k: v for k, v in record.items() if k not in key}},
+        upsert=True
+    )
+
+
+class MatchWriter:
+    """
+    Buffers match rows of one batch and writes them with one bulk upsert of the parsed
+    resumes plus one bulk write of the match rows per `batch_size` records.
+    Rows added with a `key` are upserted on it instead of inserted, so writing the same
+    item twice (e.g. a queue item re-run after its lease expired) leaves a single row.
+    If a flush fails, the affected results are flipped to status False.
+    """
+
+    def __init__(self, jd_id: str, batch_size: int = BULK_WRITE_BATCH_SIZE):
+        self.jd_id = jd_id
+        self.batch_size = max(1, batch_size)
+        self._pending: List[tuple] = []
+
+    async def add(self, record: dict, parsed: dict, result: dict, key: Optional[dict] = None):
+        record["jd_id"] = self.jd_id
+        record["resume_id"] = content_hash(parsed.get("parsed_text", ""))
+        self._pending.append((record, parsed, result, key))
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        # Swap the buffer before awaiting so concurrent add() calls start a new one
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        now = datetime.utcnow()
+        try:
+            await db.parsed_resumes.bulk_write([resume_upsert(parsed, now) for _, parsed, _, _ in pending], ordered=False)
+        except BulkWriteError as e:
+            # Concurrent batches can race to upsert the same resume; a duplicate key means it is stored
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                self._fail([result for _, _, result, _ in pending], e)
+                return
+        except Exception as e:
+            self._fail([result for _, _, result, _ in pending], e)
+            return
+
+        try:
+            await db.matches.bulk_write([_match_write(record, key) for record, _, _, key in pending], ordered=False)
+        except BulkWriteError as e:
+            # Unordered write: only the rows listed in writeErrors were not stored; a duplicate key
+            # on a keyed row means a concurrent writer stored that item already
+            failed = {
+                err["index"] for err in e.details.get("writeErrors", [])
+                if not (err.get("code") == 11000 and pending[err["index"]][3] is not None)
+            }
+            if failed:
+                self._fail([result for index, (_, _, result, _) in enumerate(pending) if index in failed], e)
+        except Exception as e:
+            self._fail([result for _, _, result, _ in pending], e)
+
+    def _fail(self, results: List[dict], error: Exception):
+        print("❌ Failed to save match results:", str(error))
+        for result in results:
+            result.update({"status": False, "error": "Failed to save match result."})
+
+    async def close(self):
+        await self.flush()
@@ -0,0 +1,120 @@
+# app/db/migrations.py
+#
+# One-off data migrations. Run from skillsync-ai-backend/:
+#   python -m app.db.migrations backfill-match-skills
+#   python -m app.db.migrations normalize-matches
+#   python -m app.db.migrations rebuild-user-stats
+
+import asyncio
+import sys
+
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+BATCH_SIZE = 500
+
+
+async def backfill_match_skills(db) -> int:
+    """Adds `matching_skills_lc` to match rows written before it was stored at write time."""
+    from app.services.skill_matcher import normalize_skills
+
+    updated = 0
+    batch = []
+    cursor = db.matches.find(
+        {"matching_skills_lc": {"$exists": False}},
+        {"matching_skills": 1}
+    )
+    async for doc in cursor:
+        batch.append(UpdateOne(
+            {"_id": doc["_id"]},
+            {"$set": {"matching_skills_lc": normalize_skills(doc.get("matching_skills", []))}}
+        ))
+        if len(batch) >= BATCH_SIZE:
+            updated += (await db.matches.bulk_write(batch, ordered=False)).modified_count
+            batch = []
+    if batch:
+        updated += (await db.matches.bulk_write(batch, ordered=False)).modified_count
+    return updated
+
+
+async def normalize_matches(db) -> int:
+    """
+    Moves the embedded `jd_text` / `parsed_resume` of old match rows into the deduplicated
+    jd_documents / parsed_resumes collections and replaces them with `jd_id` / `resume_id`.
+    """
+    from app.db.match_store import jd_upsert, resume_upsert
+    from app.utils.text_utils import content_hash
+
+    updated = 0
+    jds, resumes, matches = [], [], []
+
+    async def flush() -> int:
+        if jds:
+            await db.jd_documents.bulk_write(jds, ordered=False)
+        if resumes:
+            await db.parsed_resumes.bulk_write(resumes, ordered=False)
+        count = (await db.matches.bulk_write(matches, ordered=False)).modified_count if matches else 0
+        jds.clear()
+        resumes.clear()
+        matches.clear()
+        return count
+
+    cursor = db.matches.find(
+        {"$or": [{"jd_text": {"$exists": True}}, {"parsed_resume": {"$exists": True}}]},
+        {"jd_text": 1, "parsed_resume": 1, "created_at": 1}
+    )
+    async for doc in cursor:
+        created_at = doc.get("created_at") or datetime.utcnow()
+        update = {"$set": {}, "$unset": {}}
+        if "jd_text" in doc:
+            jds.append(jd_upsert(doc["jd_text"], created_at))
+            update["$set"]["jd_id"] = content_hash(doc["jd_text"])
+            update["$unset"]["jd_text"] = ""
+        if "parsed_resume" in doc:
+            parsed = doc["parsed_resume"] or {}
+            resumes.append(resume_upsert(parsed, created_at))
+            update["$set"]["resume_id"] = content_hash(parsed.get("parsed_text", ""))
+            update["$unset"]["parsed_resume"] = ""
+        matches.append(UpdateOne({"_id": doc["_id"]}, update))
+        if len(matches) >= BATCH_SIZE:
+            updated += await flush()
+    updated += await flush()
+    return updated
+
+
+async def rebuild_all_user_stats(db) -> int:
+    """Recomputes the per-user dashboard aggregates from the source collections."""
+    from app.db.user_stats import rebuild_user_stats
+
+    users = set(await db.resumes.distinct("user_email"))
+    users.update(await db.job_descriptions.distinct("user_email"))
+    users.update(await db.analysis.distinct("user_id"))
+    for user_email in users:
+        if user_email:
+            await rebuild_user_stats(user_email, db)
+    return len(users)
+
+
+MIGRATIONS = {
+    "backfill-match-skills": backfill_match_skills,
+    "normalize-matches": normalize_matches,
+    "rebuild-user-stats": rebuild_all_user_stats
+}
+
+
+async def main(name: str):
+    # Imported here: the database module needs a running event loop
+    from app.db.database import db
+    from app.db.indexes import ensure_indexes
+
+    await ensure_indexes()
+    count = await MIGRATIONS[name](db)
+    print(f"✅ {name}: {count} documents updated.")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 or sys.argv[1] not in MIGRATIONS:
+        print("Usage: python -m app.db.migrations <" + "|".join(MIGRATIONS) + ">")
+        sys.exit(1)
+    asyncio.run(main(sys.argv[1]))
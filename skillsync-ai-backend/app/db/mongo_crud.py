@@ -1,4 +1,5 @@
 from .database import db
+from .user_stats import record_analysis, record_resume
 from datetime import datetime
 from bson import ObjectId
 
@@ -22,6 +23,7 @@ async def save_resume_analysis(user_email: str, filename: str, resume_doc: dict)
     })
 
     result = await db.resumes.insert_one(resume_doc)
+    await record_resume(user_email)
     return str(result.inserted_id)
 
 
@@ -40,6 +42,7 @@ async def save_analysis_result(user_id, resume_id, analysis):
         "job_fit_score": analysis["job_fit_score"],
     }
     await db.analysis.insert_one(analysis_doc)
+    await record_analysis(user_id, analysis_doc["job_fit_score"], analysis_doc["skills"])
 
 # In mongo_crud.py (add helper function)
 async def get_latest_resume_version(user_email: str, filename: str) -> int:
@@ -0,0 +1,141 @@
+# app/db/user_stats.py
+#
+# Per-user aggregates, maintained with $inc at write time so the dashboard and
+# analytics endpoints read one small document instead of scanning collections:
+#   user_stats: {_id: user_email, resumes, job_descriptions, analyses, score_sum,
+#                skills: {skill: count}, seeded_at, updated_at}
+
+from datetime import datetime
+from typing import List, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from .database import db
+
+TOP_SKILLS = 5
+
+# Mongo field names cannot contain "." or start with "$"; swap them for look-alikes
+_KEY_ESCAPES = {".": "．", "$": "＄"}
+
+
+def _now() -> datetime:
+    # Mongo stores milliseconds; truncate so comparisons against stored values are exact
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
+def _skill_key(skill: str) -> str:
+    key = " ".join(str(skill).split())
+    for char, escaped in _KEY_ESCAPES.items():
+        key = key.replace(char, escaped)
+    return key
+
+
+def _skill_name(key: str) -> str:
+    for char, escaped in _KEY_ESCAPES.items():
+        key = key.replace(escaped, char)
+    return key
+
+
+async def compute_user_stats(user_email: str, database=None) -> dict:
+    """Builds the aggregate document from the source collections with server-side counts."""
+    database = database if database is not None else db
+    # Source documents written before this instant are included in the counts
+    seeded_at = _now()
+
+    resumes = await database.resumes.count_documents({"user_email": user_email})
+    job_descriptions = await database.job_descriptions.count_documents({"user_email": user_email})
+
+    totals = await database.analysis.aggregate([
+        {"$match": {"user_id": user_email}},
+        {"$group": {"_id": None, "analyses": {"$sum": 1}, "score_sum": {"$sum": "$job_fit_score"}}}
+    ]).to_list(length=1)
+
+    skills = {}
+    skill_cursor = database.analysis.aggregate([
+        {"$match": {"user_id": user_email}},
+        {"$unwind": "$skills"},
+        {"$group": {"_id": "$skills", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1}}
+    ])
+    async for row in skill_cursor:
+        if isinstance(row["_id"], str) and row["_id"].strip():
+            key = _skill_key(row["_id"])
+            skills[key] = skills.get(key, 0) + row["count"]
+
+    return {
+        "_id": user_email,
+        "resumes": resumes,
+        "job_descriptions": job_descriptions,
+        "analyses": totals[0]["analyses"] if totals else 0,
+        "score_sum": totals[0]["score_sum"] if totals else 0,
+        "skills": skills,
+        "seeded_at": seeded_at,
+        "updated_at": datetime.utcnow()
+    }
+
+
+async def rebuild_user_stats(user_email: str, database=None) -> dict:
+    """Recomputes and overwrites one user's aggregates."""
+    database = database if database is not None else db
+    stats = await compute_user_stats(user_email, database)
+    await database.user_stats.replace_one({"_id": user_email}, stats, upsert=True)
+    return stats
+
+
+async def _seed(user_email: str, stats: dict) -> bool:
+    """Inserts the stats row if there is none yet; False when another writer seeded it first."""
+    try:
+        result = await db.user_stats.update_one({"_id": user_email}, {"$setOnInsert": stats}, upsert=True)
+    except DuplicateKeyError:
+        # Two concurrent upserts on one _id: the loser can fail instead of matching
+        return False
+    return result.upserted_id is not None
+
+
+async def _increment(user_email: str, inc: dict):
+    # The caller has already written the source document, so it predates `written`
+    written = _now()
+    update = {"$inc": inc, "$set": {"updated_at": datetime.utcnow()}}
+    result = await db.user_stats.update_one({"_id": user_email}, update)
+    if result.matched_count == 0:
+        # First write for this user: seed from the source collections, which already
+        # contain the document that was just written
+        stats = await compute_user_stats(user_email)
+        if not await _seed(user_email, stats):
+            # Another writer seeded the row first. Its snapshot includes our document only if
+            # it started after we wrote it; otherwise apply our $inc so the write isn't lost.
+            await db.user_stats.update_one({"_id": user_email, "seeded_at": {"$lte": written}}, update)
+
+
+async def record_resume(user_email: str):
+    await _increment(user_email, {"resumes": 1})
+
+
+async def record_job_description(user_email: str):
+    await _increment(user_email, {"job_descriptions": 1})
+
+
+async def record_analysis(user_email: str, job_fit_score: Optional[float], skills: List[str]):
+    inc = {"analyses": 1, "score_sum": job_fit_score or 0}
+    for skill in skills or []:
+        if isinstance(skill, str) and skill.strip():
+            key = f"skills.{_skill_key(skill)}"
+            inc[key] = inc.get(key, 0) + 1
+    await _increment(user_email, inc)
+
+
+async def get_user_stats(user_email: str) -> dict:
+    """Single document read; falls back to an aggregation for users without a stats row yet."""
+    stats = await db.user_stats.find_one({"_id": user_email})
+    if stats is None:
+        stats = await compute_user_stats(user_email)
+        await _seed(user_email, stats)
+    return stats
+
+
+def top_skills(stats: dict, k: int = TOP_SKILLS) -> List[str]:
+    skills = stats.get("skills") or {}
+    # sorted() is stable, so ties keep first-seen order
+    ranked = sorted(skills.items(), key=lambda item: item[1], reverse=True)
+    return [_skill_name(key) for key, count in ranked[:k] if count > 0]
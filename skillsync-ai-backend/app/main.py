@@ -9,8 +9,18 @@ from app.routes import insights, improvements
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from fastapi import Request
+from fastapi.responses import JSONResponse
 from slowapi.errors import RateLimitExceeded
 from app.routes import auth_routes
+from app.routes import metrics
+from app.services.llm_client import start_llm_client, close_llm_client
+from app.services.llm_limiter import LLMUnavailableError
+from app.db.indexes import ensure_indexes
+from app.services.parsing_service import start_parser_pool, close_parser_pool
+from app.services.job_queue import start_job_workers, stop_job_workers
+from app.utils.telemetry import TelemetryMiddleware
+from app.services.browser_pool import start_browser_pool, stop_browser_pool
+from app.services.scraper_client import start_scraper_client, close_scraper_client
 
 
 app = FastAPI(
@@ -27,6 +37,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Request spans and per-route duration histograms (exported via OTLP and /metrics)
+app.add_middleware(TelemetryMiddleware)
 
 # Include routers
 app.include_router(upload.router)
@@ -41,12 +53,45 @@ app.include_router(recruit.router)
 app.include_router(insights.router, tags=["Insights"])
 app.include_router(improvements.router)
 app.include_router(auth_routes.router)
+app.include_router(metrics.router)
 
 
 limiter = Limiter(key_func=get_remote_address)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+# LLM provider down (circuit open) or overloaded: fail fast with a retryable 503
+@app.exception_handler(LLMUnavailableError)
+async def llm_unavailable_handler(request: Request, exc: LLMUnavailableError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))}
+    )
+
+# --- Lifecycle hooks ---
+@app.on_event("startup")
+async def startup():
+    # Shared keep-alive pool for all OpenRouter traffic
+    await start_llm_client()
+    # Shared keep-alive pool for static JD pages (Indeed, Google Jobs)
+    await start_scraper_client()
+    await ensure_indexes()
+    # Worker processes for CPU-bound PDF extraction
+    start_parser_pool()
+    # Background workers for queued bulk-match jobs (resumes unfinished jobs)
+    await start_job_workers()
+    # Long-lived Chromium instances for JS-rendered JD pages
+    await start_browser_pool()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await stop_job_workers()
+    await stop_browser_pool()
+    await close_llm_client()
+    await close_scraper_client()
+    close_parser_pool()
+
 @app.get("/")
 def root():
     return {"message": "AI Resume Analyzer Backend is running 🚀"}
\ No newline at end of file
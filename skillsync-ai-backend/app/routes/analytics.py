@@ -1,8 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from app.auth.auth_handler import get_current_user
-from app.db.database import db
-from bson.son import SON
-from collections import Counter
+from app.db.user_stats import get_user_stats, top_skills
 
 router = APIRouter()
 
@@ -11,33 +9,21 @@ async def get_resume_analytics(current_user: dict = Depends(get_current_user)):
     try:
         user_id = current_user["sub"]
 
-        # Get all analysis docs for this user
-        cursor = db.analysis.find({"user_id": user_id})
-        analyses = await cursor.to_list(length=None)
+        # Aggregates are maintained at write time; this is a single document read
+        stats = await get_user_stats(user_id)
+        total_resumes = stats.get("analyses", 0)
 
-        if not analyses:
+        if not total_resumes:
             return {
                 "total_resumes": 0,
                 "average_fit_score": 0,
                 "top_skills": []
             }
 
-        # Total resumes
-        total_resumes = len(analyses)
-
-        # Average fit score
-        avg_score = sum(a.get("job_fit_score", 0) for a in analyses) / total_resumes
-
-        # Collect skills
-        all_skills = []
-        for a in analyses:
-            all_skills.extend(a.get("skills", []))
-        top_skills = [skill for skill, _ in Counter(all_skills).most_common(5)]
-
         return {
             "total_resumes": total_resumes,
-            "average_fit_score": round(avg_score, 2),
-            "top_skills": top_skills
+            "average_fit_score": round(stats.get("score_sum", 0) / total_resumes, 2),
+            "top_skills": top_skills(stats)
         }
 
     except Exception as e:
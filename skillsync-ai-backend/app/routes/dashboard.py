@@ -2,8 +2,7 @@
 
 from fastapi import APIRouter, Depends, HTTPException
 from app.auth.auth_handler import get_current_user
-from app.db.database import db
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.db.user_stats import get_user_stats
 
 router = APIRouter()
 
@@ -12,9 +11,11 @@ async def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
     try:
         user_email = current_user["sub"]
 
-        resumes_analyzed = await db.resumes.count_documents({"user_email": user_email})
-        job_descriptions = await db.job_descriptions.count_documents({"user_email": user_email})
-        matches_created = await db.analysis.count_documents({"user_id": user_email})
+        # One read of the per-user aggregates instead of three count_documents calls
+        stats = await get_user_stats(user_email)
+        resumes_analyzed = stats.get("resumes", 0)
+        job_descriptions = stats.get("job_descriptions", 0)
+        matches_created = stats.get("analyses", 0)
         reports_generated = matches_created  # Assuming each match has a downloadable report
 
         return {
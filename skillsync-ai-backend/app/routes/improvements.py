@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
+from app.services.llm_limiter import LLMUnavailableError
 from app.utils.llm_utils import suggest_resume_improvements
 
 router = APIRouter()
@@ -19,5 +20,7 @@ async def suggest_improvements(data: SuggestImprovementRequest):
             "message": "Improvement suggestions generated.",
             "suggestions": result.dict()
         }
+    except LLMUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI error: {str(e)}")
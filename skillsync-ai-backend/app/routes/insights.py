@@ -1,6 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
-from app.utils.llm_utils import suggest_resume_improvements
+from app.services.llm_limiter import LLMUnavailableError
+from app.utils.llm_utils import suggest_resume_improvements, stream_resume_improvements
+from app.utils.streaming import STREAM_FORMATS, event_stream
 
 router = APIRouter()
 
@@ -9,7 +12,10 @@ class InsightRequest(BaseModel):
     job_description: str
 
 @router.post("/get-insights")
-async def get_insights(data: InsightRequest):
+async def get_insights(data: InsightRequest, stream: Optional[str] = Query(None, pattern=STREAM_FORMATS)):
+    # stream=ndjson|sse: insight sections are sent as soon as each one is complete
+    if stream:
+        return event_stream(stream_resume_improvements(data.resume_text, data.job_description), stream)
     try:
         result = await suggest_resume_improvements(data.resume_text, data.job_description)
         if not result:
@@ -18,5 +24,7 @@ async def get_insights(data: InsightRequest):
             "status": True,
             "insights": result.dict()
         }
+    except LLMUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI error: {str(e)}")
@@ -1,81 +1,137 @@
+import asyncio
+import os
+from typing import List
 from fastapi import APIRouter, HTTPException, Query, Depends
+from pydantic import BaseModel
 from app.auth.auth_handler import get_current_user
+from app.utils.streaming import STREAM_FORMATS, event_stream
 from app.utils.jd_scrapers import (
     extract_jd_from_linkedin,
     extract_from_indeed,
-    extract_from_google_jobs
+    extract_from_google_jobs,
+    detect_source,
+    describe_scrape_error,
+    EXTRACTORS,
+    SOURCE_LABELS
 )
 
+# Batch import limits; per-domain rate limits still apply to every fetch
+SCRAPER_BATCH_MAX_URLS = int(os.getenv("SCRAPER_BATCH_MAX_URLS", 200))
+SCRAPER_BATCH_CONCURRENCY = int(os.getenv("SCRAPER_BATCH_CONCURRENCY", 16))
+
 router = APIRouter()
 
-@router.get("/extract_jd_from_linkedin/")
-async def extract_jd_linkedin(
-    url: str = Query(...),
-    current_user: dict = Depends(get_current_user)
-):
+class JDBatchRequest(BaseModel):
+    urls: List[str]
+
+async def _extract_response(extractor, label: str, url: str) -> dict:
     try:
-        jd_text = await extract_jd_from_linkedin(url)
+        jd_text = await extractor(url)
 
         if not jd_text or len(jd_text.strip()) < 30:
             return {
                 "status": False,
-                "message": "JD extraction from LinkedIn is not available at the moment.",
-                "job_description": None
+                "message": f"JD extraction from {label} is not available at the moment.",
+                "job_description": None,
+                "error": {"kind": "not_found", "detail": "No job description was found on the page."}
             }
 
         return {"status": True, "message": "JD extracted successfully.", "job_description": jd_text}
 
-    except Exception:
+    except Exception as e:
+        print(f"❌ JD extraction from {label} failed for {url}:", str(e))
         return {
             "status": False,
-            "message": "JD extraction from LinkedIn is not available at the moment.",
-            "job_description": None
+            "message": f"JD extraction from {label} is not available at the moment.",
+            "job_description": None,
+            # Lets batch imports report why each URL failed
+            "error": describe_scrape_error(e)
         }
 
-@router.get("/extract_jd_from_indeed/")
-async def extract_jd_indeed(
+async def _extract_any(url: str) -> dict:
+    source = detect_source(url)
+    if source is None:
+        return {
+            "status": False,
+            "message": "Unsupported job site.",
+            "job_description": None,
+            "source": None,
+            "error": {"kind": "unsupported", "detail": "Use a LinkedIn, Indeed or Google Jobs URL."}
+        }
+    result = await _extract_response(EXTRACTORS[source], SOURCE_LABELS[source], url)
+    return {**result, "source": source}
+
+@router.get("/extract_jd/")
+async def extract_jd_any(
     url: str = Query(...),
     current_user: dict = Depends(get_current_user)
 ):
+    # ✅ One endpoint for every supported site; dispatches on the URL's domain
+    if detect_source(url) is None:
+        raise HTTPException(status_code=400, detail="Unsupported job site. Use a LinkedIn, Indeed or Google Jobs URL.")
+    return await _extract_any(url)
+
+@router.post("/extract_jd/batch")
+async def extract_jd_batch(
+    request: JDBatchRequest,
+    format: str = Query("ndjson", pattern=STREAM_FORMATS),
+    concurrency: int = Query(SCRAPER_BATCH_CONCURRENCY, ge=1, le=SCRAPER_BATCH_CONCURRENCY),
+    current_user: dict = Depends(get_current_user)
+):
+    if not request.urls:
+        raise HTTPException(status_code=400, detail="No URLs given.")
+    if len(request.urls) > SCRAPER_BATCH_MAX_URLS:
+        raise HTTPException(status_code=400, detail=f"You can import a maximum of {SCRAPER_BATCH_MAX_URLS} URLs at once.")
+
+    # ✅ URLs are fetched concurrently (each domain at its own polite rate);
+    # one event per URL as soon as it finishes, then a summary
+    return event_stream(_batch_events(request.urls, concurrency), format)
+
+async def _batch_events(urls: List[str], concurrency: int):
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(index: int, url: str):
+        async with gate:
+            return index, url, await _extract_any(url)
+
+    tasks = [asyncio.create_task(one(index, url)) for index, url in enumerate(urls)]
+    succeeded = 0
     try:
-        jd_text = await extract_from_indeed(url)
+        for completed, next_done in enumerate(asyncio.as_completed(tasks), start=1):
+            index, url, result = await next_done
+            succeeded += result["status"]
+            yield {"event": "result", "index": index, "url": url, "completed": completed, "total": len(urls), **result}
+    finally:
+        # Client went away: don't keep scraping for nobody
+        for task in tasks:
+            task.cancel()
 
-        if not jd_text or len(jd_text.strip()) < 30:
-            return {
-                "status": False,
-                "message": "JD extraction from Indeed is not available at the moment.",
-                "job_description": None
-            }
+    yield {
+        "event": "summary",
+        "status": True,
+        "message": "Batch import completed",
+        "total": len(urls),
+        "succeeded": succeeded,
+        "failed": len(urls) - succeeded
+    }
 
-        return {"status": True, "message": "JD extracted successfully.", "job_description": jd_text}
+@router.get("/extract_jd_from_linkedin/")
+async def extract_jd_linkedin(
+    url: str = Query(...),
+    current_user: dict = Depends(get_current_user)
+):
+    return await _extract_response(extract_jd_from_linkedin, "LinkedIn", url)
 
-    except Exception:
-        return {
-            "status": False,
-            "message": "JD extraction from Indeed is not available at the moment.",
-            "job_description": None
-        }
+@router.get("/extract_jd_from_indeed/")
+async def extract_jd_indeed(
+    url: str = Query(...),
+    current_user: dict = Depends(get_current_user)
+):
+    return await _extract_response(extract_from_indeed, "Indeed", url)
 
 @router.get("/extract_jd_from_google_jobs/")
 async def extract_jd_google(
     url: str = Query(...),
     current_user: dict = Depends(get_current_user)
 ):
-    try:
-        jd_text = await extract_from_google_jobs(url)
-
-        if not jd_text or len(jd_text.strip()) < 30:
-            return {
-                "status": False,
-                "message": "JD extraction from Google Jobs is not available at the moment.",
-                "job_description": None
-            }
-
-        return {"status": True, "message": "JD extracted successfully.", "job_description": jd_text}
-
-    except Exception:
-        return {
-            "status": False,
-            "message": "JD extraction from Google Jobs is not available at the moment.",
-            "job_description": None
-        }
+    return await _extract_response(extract_from_google_jobs, "Google Jobs", url)
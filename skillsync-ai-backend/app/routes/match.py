@@ -1,7 +1,10 @@
-from fastapi import APIRouter, HTTPException, Depends
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel
 from app.auth.auth_handler import get_current_user
-from app.utils.llm_utils import match_resume_with_jd
+from app.utils.llm_utils import match_resume_with_jd, stream_resume_match, JDMatchResult
+from app.utils.streaming import STREAM_FORMATS, event_stream
+from app.services.skill_matcher import score_skill_overlap
 
 router = APIRouter()
 
@@ -10,7 +13,20 @@ class MatchRequest(BaseModel):
     job_description: str
 
 @router.post("/match_resume/")
-async def match_resume(data: MatchRequest, current_user: dict = Depends(get_current_user)):
+async def match_resume(
+    data: MatchRequest,
+    engine: str = Query("llm", pattern="^(llm|local)$"),
+    stream: Optional[str] = Query(None, pattern=STREAM_FORMATS),
+    current_user: dict = Depends(get_current_user)
+):
+    # engine=local: deterministic taxonomy-based skill overlap, no LLM call
+    if engine == "local":
+        return JDMatchResult(**score_skill_overlap(data.resume_text, data.job_description)).dict()
+
+    # stream=ndjson|sse: each field as soon as the LLM has produced it, then the validated result
+    if stream:
+        return event_stream(stream_resume_match(data.resume_text, data.job_description), stream)
+
     result = await match_resume_with_jd(data.resume_text, data.job_description)
     if not result:
         raise HTTPException(status_code=500, detail="Failed to match resume")
@@ -0,0 +1,48 @@
+# app/routes/metrics.py
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.services.llm_client import get_transport_stats
+from app.services.llm_limiter import llm_limiter
+from app.services.llm_router import llm_router
+from app.services.browser_pool import browser_pool
+from app.services.scrape_cache import scrape_cache
+from app.services.scraper_client import get_scraper_client_stats
+from app.services.domain_limiter import domain_limiter
+from app.utils.llm_cache import llm_cache
+from app.utils.prompt_budget import get_budget_stats
+from app.utils.llm_utils import get_batch_stats
+from app.utils.telemetry import register_gauge, render_prometheus
+
+router = APIRouter(tags=["Metrics"])
+
+register_gauge("llm.limiter.limit", "Current adaptive LLM concurrency limit", lambda: llm_limiter.limit)
+register_gauge("llm.limiter.in_flight", "LLM requests in flight", lambda: llm_limiter.in_flight)
+register_gauge("llm.limiter.queue_depth", "LLM requests waiting for a slot", lambda: len(llm_limiter._waiters))
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_prometheus_metrics():
+    # Prometheus text format: request, LLM, parser, Mongo and scraper duration histograms
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@router.get("/metrics/llm")
+async def get_llm_metrics():
+    return {
+        "status": True,
+        "transport": get_transport_stats(),
+        "limiter": llm_limiter.stats(),
+        "router": llm_router.stats(),
+        "cache": llm_cache.stats(),
+        "prompt_budget": get_budget_stats(),
+        "batching": get_batch_stats()
+    }
+
+@router.get("/metrics/scraper")
+async def get_scraper_metrics():
+    return {
+        "status": True,
+        "browser_pool": browser_pool.stats(),
+        "cache": scrape_cache.stats(),
+        "client": get_scraper_client_stats(),
+        "domains": domain_limiter.stats()
+    }
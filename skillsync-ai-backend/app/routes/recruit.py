@@ -1,79 +1,335 @@
 # app/routes/recruit.py
 
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query
+import asyncio
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, Field, ValidationError
 from typing import List, Optional
 from datetime import datetime
-from app.utils.resume_parser import parse_resume
 from app.db.database import db
-import pprint
-from app.utils.llm_utils import match_resume_with_jd
+from app.services.skill_matcher import skill_key
+from app.services.vector_store import get_vector_store
+from app.utils.pagination import encode_cursor, decode_cursor, keyset_condition
+from app.utils.streaming import STREAM_FORMATS, event_stream
+from app.utils.uploads import (
+    FILE_PROPERTY,
+    UPLOAD_MAX_BYTES,
+    UPLOAD_MAX_FIELD_BYTES,
+    UploadRejected,
+    check_content_length,
+    iter_multipart,
+    multipart_openapi
+)
+from app.services.bulk_matcher import (
+    run_bulk_match,
+    iter_bulk_match,
+    rank_results,
+    run_semantic_rank,
+    PrefetchedUpload,
+    BULK_MATCH_CONCURRENCY,
+    BULK_PARSE_CONCURRENCY,
+    MAX_BULK_MATCH_CONCURRENCY
+)
+from app.services.job_queue import (
+    submit_job,
+    store_job_file,
+    delete_job_files,
+    get_job,
+    get_finished_items,
+    parse_job_id,
+    job_progress,
+    BULK_JOB_MAX_FILES,
+    BULK_JOB_POLL_SECONDS,
+    JOB_COMPLETED
+)
 
 router = APIRouter()
 
-@router.post("/recruit/bulk-match")
-async def bulk_match(
+BULK_MATCH_MAX_FILES = 50
+
+
+class BulkMatchOptions(BaseModel):
+    jd_text: str
+    concurrency: int = Field(BULK_MATCH_CONCURRENCY, ge=1, le=MAX_BULK_MATCH_CONCURRENCY)
+    top_k: Optional[int] = Field(None, ge=1)
+    min_skill_overlap: Optional[int] = Field(None, ge=0, le=100)
+    stream: Optional[str] = Field(None, pattern=STREAM_FORMATS)
+    batched: bool = False
+
+
+class BulkJobOptions(BaseModel):
+    jd_text: str
+    min_skill_overlap: Optional[int] = Field(None, ge=0, le=100)
+    batched: bool = False
+
+
+def _form_options(model, fields: dict):
+    try:
+        # Empty form values mean "not set", as with Form(None)
+        return model(**{k: v for k, v in fields.items() if v != ""})
+    except ValidationError as e:
+        raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in e.errors()])
+
+
+@router.post("/recruit/bulk-match", openapi_extra=multipart_openapi(
+    ["jd_text", "resumes"],
+    jd_text={"type": "string"},
+    resumes={"type": "array", "items": FILE_PROPERTY},
+    concurrency={"type": "integer", "default": BULK_MATCH_CONCURRENCY, "minimum": 1, "maximum": MAX_BULK_MATCH_CONCURRENCY},
+    top_k={"type": "integer", "minimum": 1},
+    min_skill_overlap={"type": "integer", "minimum": 0, "maximum": 100},
+    stream={"type": "string", "enum": ["ndjson", "sse"]},
+    batched={"type": "boolean", "default": False}
+))
+async def bulk_match(request: Request):
+    # ✅ The multipart body is parsed as it arrives: each resume is type-sniffed and size-checked
+    # while it streams in and starts parsing right away; large files are spooled to disk, not RAM.
+    # Form fields may come before, between or after the files: the options they carry decide how
+    # resumes are scored, so scoring starts once the whole body (and every field) has arrived.
+    try:
+        check_content_length(request, BULK_MATCH_MAX_FILES * UPLOAD_MAX_BYTES + UPLOAD_MAX_FIELD_BYTES)
+    except UploadRejected as e:
+        raise HTTPException(status_code=400, detail=e.message)
+
+    raw_parts = iter_multipart(request, skip_rejected=True)
+    parts = _guard_form(raw_parts)
+    parse_slots = asyncio.Semaphore(BULK_PARSE_CONCURRENCY)
+    # Every upload is tracked as soon as it arrives so its spool file is always cleaned up
+    received = []
+    fields = {}
+
+    try:
+        async for part in parts:
+            if not part.is_file:
+                fields[part.name] = part.value
+                continue
+            received.append(PrefetchedUpload(part.upload, parse_slots))
+            # ✅ Enforce 50-file upload limit
+            if len(received) > BULK_MATCH_MAX_FILES:
+                raise HTTPException(status_code=400, detail=f"You can upload a maximum of {BULK_MATCH_MAX_FILES} resumes at once.")
+
+        options = _form_options(BulkMatchOptions, fields)
+        if not received:
+            raise HTTPException(status_code=400, detail="No resumes uploaded.")
+        # Without the pre-screen, top_k would quietly send every resume to the LLM
+        if options.top_k and get_vector_store() is None:
+            raise HTTPException(status_code=503, detail="Semantic pre-screening (top_k) is not configured (EMBEDDING_MODEL_DIR).")
+
+        # ✅ stream=ndjson|sse: events follow as resumes are scored
+        if options.stream:
+            files, received = received, []  # cleaned up by the event stream instead
+            return event_stream(_bulk_match_events(options, files), options.stream)
+
+        # ✅ Per-file failures are reported, not raised
+        # ✅ With top_k / min_skill_overlap, only promising resumes are sent to the LLM
+        # ✅ With batched, several resumes share one LLM prompt (the JD is sent once)
+        results = await run_bulk_match(
+            options.jd_text,
+            received,
+            concurrency=options.concurrency,
+            top_k=options.top_k,
+            min_skill_overlap=options.min_skill_overlap,
+            batched=options.batched
+        )
+    finally:
+        await parts.aclose()
+        await raw_parts.aclose()
+        for upload in received:
+            upload.close()
+
+    failed = sum(1 for r in results if not r["status"])
+
+    return {
+        "status": True,
+        "message": "Batch analysis completed",
+        "failed": failed,
+        "matches": results
+    }
+
+
+async def _guard_form(parts):
+    # Malformed bodies and oversized form fields are client errors
+    try:
+        async for part in parts:
+            yield part
+    except UploadRejected as e:
+        raise HTTPException(status_code=400, detail=e.message)
+
+
+async def _bulk_match_events(options: BulkMatchOptions, files: list):
+    results = []
+    try:
+        async for index, result in iter_bulk_match(
+            options.jd_text,
+            files,
+            concurrency=options.concurrency,
+            top_k=options.top_k,
+            min_skill_overlap=options.min_skill_overlap,
+            batched=options.batched
+        ):
+            results.append(result)
+            yield {
+                "event": "result",
+                "index": index,
+                "completed": len(results),
+                "total": len(files),
+                "result": result
+            }
+    finally:
+        # Resumes whose parse was never used (client went away): stop it, drop the spool file
+        for upload in files:
+            upload.close()
+
+    # Sent after the batch's writes are flushed, so statuses here are final
+    yield {
+        "event": "summary",
+        "status": True,
+        "message": "Batch analysis completed",
+        "failed": sum(1 for r in results if not r["status"]),
+        "ranking": rank_results(results)
+    }
+
+
+@router.post("/recruit/rank")
+async def rank_resumes(
     jd_text: str = Form(...),
     resumes: List[UploadFile] = File(...)
 ):
-    # ✅ Enforce 50-file upload limit
-    if len(resumes) > 50:
-        raise HTTPException(status_code=400, detail="You can upload a maximum of 50 resumes at once.")
+    # Embedding-only ranking: no LLM calls, so larger batches are fine
+    if len(resumes) > 500:
+        raise HTTPException(status_code=400, detail="You can rank a maximum of 500 resumes at once.")
 
-    results = []
+    ranked = await run_semantic_rank(jd_text, resumes)
+    if ranked is None:
+        raise HTTPException(status_code=503, detail="Semantic ranking is not configured (EMBEDDING_MODEL_DIR).")
+
+    return {
+        "status": True,
+        "message": "Ranking completed",
+        "ranked": ranked
+    }
 
-    for resume in resumes:
-        try:
-            content = await resume.read()
-
-            # ✅ File type & size validation
-            if resume.content_type not in ["application/pdf", "text/plain"]:
-                raise HTTPException(status_code=400, detail=f"File {resume.filename} is not PDF/TXT.")
-            if len(content) > 5 * 1024 * 1024:
-                raise HTTPException(status_code=400, detail=f"File {resume.filename} too large (max 5MB).")
-
-            parsed = parse_resume(content, resume.filename)
-            resume_text = parsed.get("parsed_text", "")
-            if not resume_text.strip():
-                raise ValueError("Empty or invalid resume content")
-
-            # ✅ AI match
-            match_result = await match_resume_with_jd(resume_text, jd_text)
-
-            record = {
-                "resume_name": resume.filename,
-                "jd_text": jd_text,
-                "fit_percentage": match_result.get("fit_percentage", 0),
-                "matching_skills": match_result.get("matching_skills", []),
-                "missing_skills": match_result.get("missing_skills", []),
-                "strengths": match_result.get("strengths", []),
-                "weaknesses": match_result.get("weaknesses", []),
-                "verdict": match_result.get("verdict", ""),
-                "parsed_resume": parsed,
-                "created_at": datetime.utcnow()
-            }
 
-            await db.matches.insert_one(record)
+@router.post("/recruit/jobs", openapi_extra=multipart_openapi(
+    ["jd_text", "resumes"],
+    jd_text={"type": "string"},
+    resumes={"type": "array", "items": FILE_PROPERTY},
+    min_skill_overlap={"type": "integer", "minimum": 0, "maximum": 100},
+    batched={"type": "boolean", "default": False}
+))
+async def submit_bulk_job(request: Request):
+    # Queued and processed by background workers; poll or stream the job for results
+    # ✅ Streamed like /recruit/bulk-match: each resume is type/size-checked as it arrives (a bad
+    # file becomes a failed item, not a failed request) and moved to GridFS straight away, so
+    # neither this request nor the queue items hold the files in memory
+    try:
+        check_content_length(request, BULK_JOB_MAX_FILES * UPLOAD_MAX_BYTES + UPLOAD_MAX_FIELD_BYTES)
+    except UploadRejected as e:
+        raise HTTPException(status_code=400, detail=e.message)
 
-            results.append({
-                "resume_name": record["resume_name"],
-                "fit_percentage": record["fit_percentage"],
-                "matching_skills": record["matching_skills"],
-                "missing_skills": record["missing_skills"],
-                "strengths": record["strengths"],
-                "weaknesses": record["weaknesses"],
-                "verdict": record["verdict"]
-            })
+    raw_parts = iter_multipart(request, skip_rejected=True)
+    parts = _guard_form(raw_parts)
+    fields = {}
+    files = []
+    try:
+        async for part in parts:
+            if not part.is_file:
+                fields[part.name] = part.value
+                continue
+            if len(files) >= BULK_JOB_MAX_FILES:
+                part.upload.close()
+                raise HTTPException(status_code=400, detail=f"You can queue a maximum of {BULK_JOB_MAX_FILES} resumes per job.")
+            files.append(await store_job_file(part.upload))
 
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error processing {resume.filename}: {str(e)}")
+        options = _form_options(BulkJobOptions, fields)
+        if not files:
+            raise HTTPException(status_code=400, detail="No resumes uploaded.")
+        job_id = await submit_job(options.jd_text, files, min_skill_overlap=options.min_skill_overlap, batched=options.batched)
+    except BaseException:
+        # Nothing was queued: drop the files already stored
+        await delete_job_files([f["file_id"] for f in files if "file_id" in f])
+        raise
+    finally:
+        await parts.aclose()
+        await raw_parts.aclose()
 
     return {
         "status": True,
-        "message": "Batch analysis completed",
-        "matches": results
+        "message": "Batch queued",
+        "job_id": job_id,
+        "total": len(files),
+        "rejected": sum(1 for f in files if "error" in f)
     }
 
 
+async def _load_job(job_id: str) -> dict:
+    oid = parse_job_id(job_id)
+    job = await get_job(oid) if oid else None
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
+
+@router.get("/recruit/jobs/{job_id}")
+async def get_bulk_job(job_id: str, include_results: bool = False):
+    job = await _load_job(job_id)
+    response = {"status": True, **job_progress(job)}
+    if include_results:
+        items = await get_finished_items(job["_id"])
+        results = [item["result"] for item in sorted(items, key=lambda i: i["index"])]
+        response["results"] = results
+        response["ranking"] = rank_results(results)
+    return response
+
+
+@router.get("/recruit/jobs/{job_id}/stream")
+async def stream_bulk_job(job_id: str, format: str = Query("ndjson", pattern=STREAM_FORMATS)):
+    """
+    One "result" event per finished resume (with the ranking so far),
+    then a final "done" event with the complete ranking.
+    """
+    job = await _load_job(job_id)
+    return event_stream(_job_events(job["_id"]), format)
+
+
+async def _job_events(job_id):
+    seen = set()
+    results = []
+    since = None
+    while True:
+        current = await get_job(job_id)
+        if current is None:
+            return
+        # Items finishing in the same millisecond are caught by `$gte` and de-duplicated here
+        for item in await get_finished_items(job_id, since):
+            since = item["finished_at"]
+            if item["_id"] in seen:
+                continue
+            seen.add(item["_id"])
+            results.append(item["result"])
+            yield {
+                "event": "result",
+                "result": item["result"],
+                "progress": job_progress(current),
+                "ranking": [
+                    {"resume_name": r["resume_name"], "fit_percentage": r["fit_percentage"]}
+                    for r in rank_results(results)
+                ]
+            }
+        if current["status"] == JOB_COMPLETED:
+            yield {"event": "done", "progress": job_progress(current), "ranking": rank_results(results)}
+            return
+        await asyncio.sleep(BULK_JOB_POLL_SECONDS)
+
+
+# Large blobs that the result list never needs
+FILTER_PROJECTION = {"parsed_resume": 0, "jd_text": 0}
+SORT_KEYS = {
+    "fit_percentage": ["fit_percentage", "created_at", "_id"],
+    "created_at": ["created_at", "_id"]
+}
+
+
 @router.get("/recruit/filter-matches")
 async def filter_matches(
     min_score: int = Query(0, ge=0, le=100),
@@ -82,24 +338,22 @@ async def filter_matches(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     sort_by: str = Query("fit_percentage", pattern="^(fit_percentage|created_at)$"),
-    sort_order: str = Query("desc", pattern="^(asc|desc)$")
+    sort_order: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    include_total: bool = False
 ):
     query = {
         "fit_percentage": {"$gte": min_score, "$lte": max_score}
     }
 
+    # Skills are matched against the lowercase array stored at write time, so the index is used.
+    # Only the names as given (case-insensitive): expanding them through the taxonomy would
+    # widen the filter ("Java Script" would also match Java-only rows)
     if skills:
-        query["$or"] = [
-            {
-                "matching_skills": {
-                    "$elemMatch": {
-                        "$regex": f"^{skill}$",
-                        "$options": "i"
-                    }
-                }
-            }
-            for skill in skills
-        ]
+        keys = [key for key in (skill_key(skill) for skill in skills) if key]
+        if keys:
+            query["matching_skills_lc"] = {"$in": keys}
 
     if start_date and end_date:
         try:
@@ -109,25 +363,46 @@ async def filter_matches(
         except ValueError:
             return {"status": False, "message": "Invalid date format. Use YYYY-MM-DD"}
 
-    sort_field = "fit_percentage" if sort_by == "fit_percentage" else "created_at"
+    # Sort keys mirror the compound indexes; _id makes the order total for keyset pagination
+    sort_fields = SORT_KEYS[sort_by]
     sort_direction = -1 if sort_order == "desc" else 1
 
-    print("📦 Final Mongo Query:")
-    pprint.pprint(query)
+    # Keyset pagination: continue after the last row of the previous page
+    page_query = query
+    if cursor:
+        position = decode_cursor(cursor, len(sort_fields))
+        if position is None:
+            return {"status": False, "message": "Invalid cursor."}
+        page_query = {"$and": [query, keyset_condition(sort_fields, sort_direction, position)]}
 
     try:
-        results_cursor = db.matches.find(query).sort(sort_field, sort_direction)
-        raw_results = await results_cursor.to_list(length=None)
+        results_cursor = (
+            db.matches.find(page_query, FILTER_PROJECTION)
+            .sort([(field, sort_direction) for field in sort_fields])
+            .limit(limit + 1)
+        )
+        raw_results = await results_cursor.to_list(length=limit + 1)
+
+        has_more = len(raw_results) > limit
+        raw_results = raw_results[:limit]
+        next_cursor = None
+        if has_more:
+            last = raw_results[-1]
+            next_cursor = encode_cursor([last.get(field) for field in sort_fields])
 
         results = []
         for item in raw_results:
             item["_id"] = str(item["_id"])
             results.append(item)
-        
-        return {
+
+        response = {
             "status": True,
-            "total_matches": len(results),
+            "returned": len(results),
+            "next_cursor": next_cursor,
             "filtered_results": results
         }
+        if include_total:
+            response["total_matches"] = await db.matches.count_documents(query)
+        return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Query failed: {str(e)}")
@@ -1,26 +1,30 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from app.utils.resume_parser import parse_resume
+from fastapi import APIRouter, HTTPException, Request
+from app.services.parsing_service import parse_upload
+from app.utils.uploads import FILE_PROPERTY, UploadRejected, multipart_openapi, receive_single_file
 
 router = APIRouter(
     prefix="/upload_resume",
     tags=["Upload Resume"]
 )
 
-@router.post("/")
-async def upload_resume(file: UploadFile = File(...)):
-    file_bytes = await file.read()
-    # File type and size validation
-    if file.content_type not in ["application/pdf", "text/plain"]:
-        raise HTTPException(status_code=400, detail="Only PDF or TXT files are supported.")
-    if len(file_bytes) > 5 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="File too large (max 5MB).")
+@router.post("/", openapi_extra=multipart_openapi(["file"], file=FILE_PROPERTY))
+async def upload_resume(request: Request):
+    # File type (magic bytes) and size are checked while the upload streams in;
+    # an oversized or non-PDF/TXT/DOCX file is refused without reading the rest of it
+    try:
+        upload = await receive_single_file(request)
+    except UploadRejected as e:
+        raise HTTPException(status_code=400, detail=e.message)
 
-    parsed = parse_resume(file_bytes, file.filename)
+    try:
+        parsed = await parse_upload(upload)
+    finally:
+        upload.close()
     if not parsed["parsed_text"]:
         raise HTTPException(status_code=500, detail="Failed to extract text from resume.")
 
     return {
-        "filename": file.filename,
+        "filename": upload.filename,
         "content": parsed["parsed_text"][:500] + "...",  # preview only
         "length": parsed["word_count"]
     }
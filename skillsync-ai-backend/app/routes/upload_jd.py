@@ -1,26 +1,30 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
 from datetime import datetime
 from typing import Optional
-from app.utils.resume_parser import parse_resume
+from app.services.parsing_service import parse_upload
+from app.utils.uploads import FILE_PROPERTY, UploadRejected, multipart_openapi, receive_single_file
 from app.auth.auth_handler import get_current_user
 from app.db.database import db
+from app.db.user_stats import record_job_description
 
 router = APIRouter(
     prefix="/upload_jd",
     tags=["Upload Job Description"]
 )
 
-@router.post("/")
-async def upload_jd(file: UploadFile = File(...), current_user: dict = Depends(get_current_user)):
-    # Validate file type and size
-    if file.content_type not in ["application/pdf", "text/plain"]:
-        raise HTTPException(status_code=400, detail="Only PDF or TXT files are allowed.")
-    content = await file.read()
-    if len(content) > 5 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="File too large (max 5MB).")
+@router.post("/", openapi_extra=multipart_openapi(["file"], file=FILE_PROPERTY))
+async def upload_jd(request: Request, current_user: dict = Depends(get_current_user)):
+    # Validate file type (magic bytes) and size while the upload streams in
+    try:
+        upload = await receive_single_file(request)
+    except UploadRejected as e:
+        raise HTTPException(status_code=400, detail=e.message)
 
     # Use the unified parser for both PDF and TXT for consistency
-    parsed = parse_resume(content, file.filename)
+    try:
+        parsed = await parse_upload(upload)
+    finally:
+        upload.close()
     jd_text = parsed.get("parsed_text", "")
 
     if not jd_text:
@@ -28,16 +32,17 @@ async def upload_jd(file: UploadFile = File(...), current_user: dict = Depends(g
 
     jd_doc = {
         "user_email": current_user["sub"],
-        "filename": file.filename,
+        "filename": upload.filename,
         "jd_text": jd_text,
         "uploaded_at": datetime.utcnow()
     }
 
     result = await db.job_descriptions.insert_one(jd_doc)
+    await record_job_description(current_user["sub"])
     return {
         "message": "Job Description uploaded successfully",
         "jd_id": str(result.inserted_id),
-        "filename": file.filename
+        "filename": upload.filename
     }
 
 @router.get("/history/")
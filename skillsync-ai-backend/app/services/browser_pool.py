@@ -0,0 +1,212 @@
+# app/services/browser_pool.py
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import List
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Pool settings ---
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", 2))
+# Global cap on pages open at once, across all browsers
+BROWSER_MAX_CONCURRENCY = int(os.getenv("BROWSER_MAX_CONCURRENCY", 4))
+# A browser is replaced after this many leases (Chromium slowly leaks memory)
+BROWSER_MAX_USES = int(os.getenv("BROWSER_MAX_USES", 100))
+BROWSER_LEASE_TIMEOUT_SECONDS = float(os.getenv("BROWSER_LEASE_TIMEOUT_SECONDS", 30))
+# Playwright resource types that are aborted; scraping only needs the DOM
+BROWSER_BLOCKED_RESOURCES = {
+    r.strip() for r in os.getenv("BROWSER_BLOCKED_RESOURCES", "image,media,font,stylesheet").split(",") if r.strip()
+}
+BROWSER_USER_AGENT = os.getenv(
+    "BROWSER_USER_AGENT",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+BROWSER_LAUNCH_ARGS = ["--disable-dev-shm-usage", "--disable-gpu", "--no-first-run", "--mute-audio"]
+
+
+class BrowserPoolError(Exception):
+    """No browser page could be leased (pool saturated, or Chromium failed to start)."""
+
+
+class _PooledBrowser:
+    def __init__(self, index: int):
+        self.index = index
+        self.browser = None
+        self.uses = 0
+        self.active = 0
+        self.retiring = False
+
+    @property
+    def healthy(self) -> bool:
+        return self.browser is not None and self.browser.is_connected() and not self.retiring
+
+
+class BrowserPool:
+    """
+    A fixed set of Chromium processes started once and shared by all scrapers.
+    - Each lease gets its own browser context (cookies/storage isolated per request) and page,
+      with images, media, fonts and CSS blocked.
+    - At most BROWSER_MAX_CONCURRENCY pages are open at once; further callers wait up to
+      BROWSER_LEASE_TIMEOUT_SECONDS.
+    - A browser is relaunched after BROWSER_MAX_USES leases, or when it disconnects (crash).
+    """
+
+    def __init__(self, size: int = BROWSER_POOL_SIZE, max_concurrency: int = BROWSER_MAX_CONCURRENCY):
+        self.size = max(1, size)
+        self._slots: List[_PooledBrowser] = [_PooledBrowser(i) for i in range(self.size)]
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._max_concurrency = max(1, max_concurrency)
+        self._playwright = None
+        # Serializes Playwright startup and browser (re)launches
+        self._launch_lock = asyncio.Lock()
+        self._stats = {
+            "leases": 0,
+            "lease_timeouts": 0,
+            "launches": 0,
+            "recycles": 0,
+            "crashes": 0,
+            "blocked_requests": 0,
+            "lease_wait_seconds_total": 0.0
+        }
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        async with self._launch_lock:
+            await self._ensure_started()
+
+    async def _ensure_started(self):
+        if self._playwright is None:
+            from playwright.async_api import async_playwright
+            self._playwright = await async_playwright().start()
+        # A dead or retired browser is relaunched once its last lease has ended
+        for slot in self._slots:
+            if not slot.healthy and slot.active == 0:
+                await self._launch(slot)
+
+    async def stop(self):
+        for slot in self._slots:
+            await self._close(slot)
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def _launch(self, slot: _PooledBrowser):
+        await self._close(slot)
+        browser = await self._playwright.chromium.launch(headless=True, args=BROWSER_LAUNCH_ARGS)
+
+        def on_disconnected(_):
+            # Crashed or killed: the next lease relaunches it
+            if slot.browser is browser and not slot.retiring:
+                self._stats["crashes"] += 1
+                print(f"❌ Pooled browser {slot.index} disconnected; it will be relaunched")
+            if slot.browser is browser:
+                slot.browser = None
+
+        browser.on("disconnected", on_disconnected)
+        slot.browser = browser
+        slot.uses = 0
+        slot.retiring = False
+        self._stats["launches"] += 1
+
+    async def _close(self, slot: _PooledBrowser):
+        browser, slot.browser = slot.browser, None
+        if browser is not None:
+            try:
+                await browser.close()
+            except Exception as e:
+                print(f"❌ Failed to close pooled browser {slot.index}:", str(e))
+
+    # --- Leasing ---
+
+    async def _pick(self) -> _PooledBrowser:
+        if self._playwright is None or any(not s.healthy and s.active == 0 for s in self._slots):
+            async with self._launch_lock:
+                await self._ensure_started()
+        # Least busy healthy browser
+        candidates = [s for s in self._slots if s.healthy]
+        if not candidates:
+            raise BrowserPoolError("No browser available")
+        return min(candidates, key=lambda s: (s.active, s.uses))
+
+    async def _block_resources(self, route):
+        if route.request.resource_type in BROWSER_BLOCKED_RESOURCES:
+            self._stats["blocked_requests"] += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    @asynccontextmanager
+    async def page(self, timeout: float = BROWSER_LEASE_TIMEOUT_SECONDS):
+        """Leases a fresh page in an isolated context; the context is closed on exit."""
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self._stats["lease_timeouts"] += 1
+            raise BrowserPoolError(f"Timed out after {timeout}s waiting for a browser page")
+        self._stats["lease_wait_seconds_total"] += time.perf_counter() - started
+
+        slot = None
+        context = None
+        try:
+            try:
+                slot = await self._pick()
+                slot.active += 1
+                context = await slot.browser.new_context(user_agent=BROWSER_USER_AGENT, java_script_enabled=True)
+                if BROWSER_BLOCKED_RESOURCES:
+                    await context.route("**/*", self._block_resources)
+                page = await context.new_page()
+            except BrowserPoolError:
+                raise
+            except Exception as e:
+                raise BrowserPoolError(f"Could not open a browser page: {e}") from e
+            self._stats["leases"] += 1
+            yield page
+        finally:
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception:
+                    # The browser went away mid-lease; the disconnect handler already flagged it
+                    pass
+            if slot is not None:
+                slot.active -= 1
+                slot.uses += 1
+                if slot.uses >= BROWSER_MAX_USES:
+                    slot.retiring = True
+                if slot.retiring and slot.active == 0:
+                    self._stats["recycles"] += 1
+                    await self._close(slot)
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        leases = self._stats["leases"]
+        return {
+            **self._stats,
+            "size": self.size,
+            "max_concurrency": self._max_concurrency,
+            "browsers_alive": sum(1 for s in self._slots if s.healthy),
+            "active_pages": sum(s.active for s in self._slots),
+            "avg_lease_wait_seconds": round(self._stats["lease_wait_seconds_total"] / leases, 4) if leases else 0.0,
+            "uses": [s.uses for s in self._slots]
+        }
+
+
+browser_pool = BrowserPool()
+
+
+async def start_browser_pool():
+    # Chromium may not be installed everywhere; scraping then fails per request instead of at startup
+    try:
+        await browser_pool.start()
+    except Exception as e:
+        print("❌ Browser pool failed to start (will retry on first use):", str(e))
+
+
+async def stop_browser_pool():
+    await browser_pool.stop()
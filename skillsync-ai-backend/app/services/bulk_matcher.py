@@ -0,0 +1,467 @@
+# app/services/bulk_matcher.py
+
+import asyncio
+import os
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, List, Optional, Tuple, Union
+
+from fastapi import UploadFile
+
+from app.db.match_store import BULK_WRITE_BATCH_SIZE, MatchWriter, save_jd
+from app.utils.llm_utils import LLM_BATCH_MAX_CANDIDATES, match_resume_with_jd, match_resumes_with_jd_batch
+from app.services.parsing_service import parse_document, parse_upload
+from app.services.resume_parser import SUPPORTED_CONTENT_TYPES
+from app.services.vector_store import VectorStore, get_vector_store
+from app.services.skill_matcher import extract_skills, normalize_skills, score_skill_overlap
+from app.utils.uploads import ReceivedUpload
+
+# --- Concurrency limits (per batch) ---
+# LLM calls dominate the latency of a batch, so they get their own limit;
+# parsing runs in the parser process pool and is capped separately so it overlaps with the LLM stage.
+BULK_MATCH_CONCURRENCY = int(os.getenv("BULK_MATCH_CONCURRENCY", 8))
+MAX_BULK_MATCH_CONCURRENCY = int(os.getenv("MAX_BULK_MATCH_CONCURRENCY", 20))
+BULK_PARSE_CONCURRENCY = int(os.getenv("BULK_PARSE_CONCURRENCY", os.cpu_count() or 2))
+
+MAX_FILE_SIZE = 5 * 1024 * 1024
+# The LLM only needs the first part of a long resume, so extraction stops early
+BULK_PARSE_MAX_CHARS = int(os.getenv("BULK_PARSE_MAX_CHARS", 50000))
+# Batched scoring: how long to wait for more resumes before sending a partial batch
+BULK_LLM_BATCH_WINDOW_MS = int(os.getenv("BULK_LLM_BATCH_WINDOW_MS", 100))
+
+
+class BulkMatchError(Exception):
+    """A per-file failure that is reported in the results instead of aborting the batch."""
+
+
+def _error_result(resume_name: str, message: str) -> dict:
+    return {"resume_name": resume_name, "status": False, "error": message}
+
+
+def _rejected_message(upload: ReceivedUpload) -> str:
+    # Same wording as the checks in BulkMatchRun.parse_bytes
+    if upload.error.kind == "size":
+        return f"File {upload.filename} too large (max 5MB)."
+    return f"File {upload.filename} is not PDF/TXT/DOCX."
+
+
+def _screened_result(resume_name: str, extra: dict, verdict: str) -> dict:
+    return {"resume_name": resume_name, "status": True, "screened_out": True, **extra, "verdict": verdict}
+
+
+async def _guarded(resume_name: str, work: Awaitable[dict], passthrough: tuple = ()) -> dict:
+    # `passthrough`: exceptions the caller handles itself instead of reporting a failed file
+    try:
+        return await work
+    except passthrough:
+        raise
+    except BulkMatchError as e:
+        return _error_result(resume_name, str(e))
+    except Exception as e:
+        return _error_result(resume_name, f"Error processing {resume_name}: {str(e)}")
+
+
+async def _parse_received(upload: ReceivedUpload, slots: asyncio.Semaphore) -> dict:
+    # Type (magic bytes) and size were already checked while the file streamed in
+    try:
+        if upload.error is not None:
+            raise BulkMatchError(_rejected_message(upload))
+        async with slots:
+            parsed = await parse_upload(upload, max_chars=BULK_PARSE_MAX_CHARS)
+    finally:
+        # Spooled uploads are deleted as soon as they are parsed
+        upload.close()
+    if not parsed.get("parsed_text", "").strip():
+        raise BulkMatchError("Empty or invalid resume content")
+    return parsed
+
+
+class PrefetchedUpload:
+    """
+    A received upload that starts parsing as soon as it arrives, before the batch options
+    (which decide how it is scored) are known. Accepted wherever a ReceivedUpload is.
+    """
+
+    def __init__(self, upload: ReceivedUpload, slots: asyncio.Semaphore):
+        self.upload = upload
+        self.filename = upload.filename
+        self.parsing = asyncio.create_task(_parse_received(upload, slots))
+        # Failures are reported when the batch awaits the parse; a rejected batch never does
+        self.parsing.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    def close(self):
+        # Batch rejected or client gone before the parse was used: stop it, drop the spool file
+        self.parsing.cancel()
+        self.upload.close()
+
+
+class LLMMicroBatcher:
+    """
+    Collects resumes scored against the same JD and sends them as multi-resume prompts.
+    A batch is sent when it reaches LLM_BATCH_MAX_CANDIDATES or after the batch window;
+    each batch call takes one of the run's LLM slots.
+    """
+
+    def __init__(self, jd_text: str, slots: asyncio.Semaphore, window_ms: int = BULK_LLM_BATCH_WINDOW_MS):
+        self.jd_text = jd_text
+        self.slots = slots
+        self.window = window_ms / 1000
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+    async def submit(self, resume_text: str):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((resume_text, future))
+        if len(self._pending) >= LLM_BATCH_MAX_CANDIDATES:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(lambda done: self._settle(done, batch))
+
+    def _settle(self, task: asyncio.Task, batch: List[Tuple[str, asyncio.Future]]):
+        self._tasks.discard(task)
+        # A task cancelled before it started never reaches _run's handler; release its waiters here
+        for _, future in batch:
+            if not future.done():
+                future.cancel()
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]):
+        try:
+            async with self.slots:
+                results = await match_resumes_with_jd_batch([text for text, _ in batch], self.jd_text)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except BaseException as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e if isinstance(e, Exception) else BulkMatchError("Batch scoring was cancelled."))
+            if not isinstance(e, Exception):
+                raise
+
+    async def close(self):
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def cancel(self):
+        """Drops buffered resumes and cancels the batch calls in flight (nobody is waiting for them)."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        for _, future in pending:
+            future.cancel()
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class BulkMatchRun:
+    """State shared by every file of one batch: the JD, the stage limits and the screening options."""
+
+    def __init__(
+        self,
+        jd_text: str,
+        concurrency: int = BULK_MATCH_CONCURRENCY,
+        min_skill_overlap: Optional[int] = None,
+        write_batch_size: int = BULK_WRITE_BATCH_SIZE,
+        batched: bool = False
+    ):
+        self.jd_text = jd_text
+        self.jd_skills = extract_skills(jd_text)
+        self.min_skill_overlap = min_skill_overlap
+        self.parse_slots = asyncio.Semaphore(BULK_PARSE_CONCURRENCY)
+        self.llm_slots = asyncio.Semaphore(max(1, concurrency))
+        self.write_batch_size = write_batch_size
+        self.writer: Optional[MatchWriter] = None
+        # Batched mode: several resumes per LLM prompt instead of one call each
+        self.batcher = LLMMicroBatcher(jd_text, self.llm_slots) if batched else None
+
+    async def start(self):
+        # The JD is stored once per distinct text; every match row references it
+        self.writer = MatchWriter(await save_jd(self.jd_text), batch_size=self.write_batch_size)
+
+    async def finish(self, abandoned: bool = False):
+        # Abandoned (client gone): cancel batch LLM calls instead of waiting for them; rows
+        # already scored are still flushed
+        if self.batcher is not None:
+            await (self.batcher.cancel() if abandoned else self.batcher.close())
+        if self.writer is not None:
+            await self.writer.close()
+
+    async def parse(self, resume: Union[UploadFile, ReceivedUpload, "PrefetchedUpload"]) -> dict:
+        # --- Stage 1: read, validate and parse ---
+        if isinstance(resume, PrefetchedUpload):
+            return await resume.parsing
+        if isinstance(resume, ReceivedUpload):
+            return await self.parse_received(resume)
+        if resume.content_type not in SUPPORTED_CONTENT_TYPES:
+            raise BulkMatchError(f"File {resume.filename} is not PDF/TXT/DOCX.")
+        return await self.parse_bytes(resume.filename, resume.content_type, await resume.read())
+
+    async def parse_bytes(self, filename: str, content_type: str, content: bytes) -> dict:
+        if content_type not in SUPPORTED_CONTENT_TYPES:
+            raise BulkMatchError(f"File {filename} is not PDF/TXT/DOCX.")
+        if len(content) > MAX_FILE_SIZE:
+            raise BulkMatchError(f"File {filename} too large (max 5MB).")
+        return await self.parse_content(filename, content)
+
+    async def parse_content(self, filename: str, content: bytes) -> dict:
+        # For bytes whose type and size were already validated (e.g. queued uploads)
+        async with self.parse_slots:
+            parsed = await parse_document(content, filename, max_chars=BULK_PARSE_MAX_CHARS)
+        if not parsed.get("parsed_text", "").strip():
+            raise BulkMatchError("Empty or invalid resume content")
+        return parsed
+
+    async def parse_received(self, upload: ReceivedUpload) -> dict:
+        return await _parse_received(upload, self.parse_slots)
+
+    async def parse_all(self, resumes: List[UploadFile]) -> List[dict]:
+        # Each item is either {"parsed": ...} or a per-file error result
+        async def parse_one(resume: UploadFile) -> dict:
+            return {"parsed": await self.parse(resume)}
+
+        return await asyncio.gather(*(_guarded(resume.filename, parse_one(resume)) for resume in resumes))
+
+    async def score(
+        self,
+        resume_name: str,
+        parsed: dict,
+        extra: Optional[dict] = None,
+        match_key: Optional[dict] = None
+    ) -> dict:
+        # --- Stage 2a: local skill overlap (sub-millisecond), optional LLM prefilter ---
+        local = score_skill_overlap(parsed["parsed_text"], self.jd_text, self.jd_skills)
+        extra = {**(extra or {}), "skill_overlap": local["fit_percentage"]}
+        # A JD with no recognizable skills scores every resume 0%, so the threshold can't screen anything
+        if (
+            self.min_skill_overlap is not None
+            and self.jd_skills
+            and local["fit_percentage"] < self.min_skill_overlap
+        ):
+            return _screened_result(
+                resume_name,
+                {**extra, "matching_skills": local["matching_skills"], "missing_skills": local["missing_skills"]},
+                "Below the skill-overlap threshold; not sent for AI review."
+            )
+
+        # --- Stage 2b: AI match ---
+        if self.batcher is not None:
+            match_result = await self.batcher.submit(parsed["parsed_text"])
+        else:
+            async with self.llm_slots:
+                match_result = await match_resume_with_jd(parsed["parsed_text"], self.jd_text)
+        if not match_result:
+            raise BulkMatchError("AI failed to return a valid match result.")
+
+        # --- Stage 3: persist (batched; the JD and parsed resume are stored by reference) ---
+        record = {
+            "resume_name": resume_name,
+            **match_result.dict(),
+            **extra,
+            "matching_skills_lc": normalize_skills(match_result.matching_skills),
+            "created_at": datetime.utcnow()
+        }
+        result = {
+            "resume_name": record["resume_name"],
+            "status": True,
+            "fit_percentage": record["fit_percentage"],
+            "matching_skills": record["matching_skills"],
+            "missing_skills": record["missing_skills"],
+            "strengths": record["strengths"],
+            "weaknesses": record["weaknesses"],
+            "verdict": record["verdict"],
+            **extra
+        }
+        # `match_key` makes the row write idempotent (queue items can be processed twice)
+        await self.writer.add(record, parsed, result, key=match_key)
+        return result
+
+    async def match(self, resume: UploadFile) -> dict:
+        parsed = await self.parse(resume)
+        return await self.score(resume.filename, parsed)
+
+
+def _prescreen(store: VectorStore, jd_text: str, texts: List[str], names: List[str]) -> List[Tuple[int, float]]:
+    # Runs in a worker thread: embeds (and stores) the JD and resumes, then ranks by cosine similarity
+    store.upsert("jd", [jd_text], [{"kind": "jd"}])
+    store.upsert("resume", texts, [{"resume_name": name} for name in names])
+    return store.rank(jd_text, texts)
+
+
+# A list of uploads, or uploads still arriving from a streamed multipart body (app/utils/uploads.py)
+Resumes = Union[List[UploadFile], List[ReceivedUpload], List[PrefetchedUpload], AsyncIterator[ReceivedUpload]]
+
+
+async def run_bulk_match(
+    jd_text: str,
+    resumes: Resumes,
+    concurrency: int = BULK_MATCH_CONCURRENCY,
+    top_k: Optional[int] = None,
+    min_skill_overlap: Optional[int] = None,
+    batched: bool = False
+) -> List[dict]:
+    """
+    Matches every resume against the JD with at most `concurrency` LLM calls in flight.
+    Files move through parse -> LLM -> insert independently, so the stages of different
+    files overlap. Returns one result per file, in upload order; failed files carry
+    status False and an error message instead of failing the batch.
+
+    With `top_k`, all resumes are parsed first and ranked by embedding similarity to the
+    JD; only the `top_k` best go to the LLM and the rest are returned as screened out.
+    `top_k` needs an embedding model: callers check get_vector_store() and refuse it
+    otherwise, since every resume would go to the LLM. With `min_skill_overlap`, resumes whose
+    local skill-overlap score is below it are screened out without an LLM call (ignored when
+    the JD mentions no taxonomy skills, since every resume would score 0).
+    With `batched`, resumes are scored several per LLM prompt (see LLMMicroBatcher).
+    When `resumes` is an async iterator, each file starts as soon as it has been received.
+    """
+    results = {}
+    async for index, result in iter_bulk_match(
+        jd_text, resumes, concurrency=concurrency, top_k=top_k, min_skill_overlap=min_skill_overlap, batched=batched
+    ):
+        results[index] = result
+    return [results[index] for index in sorted(results)]
+
+
+async def _indexed(index: int, work: Awaitable[dict]) -> Tuple[int, dict]:
+    return index, await work
+
+
+async def iter_bulk_match(
+    jd_text: str,
+    resumes: Resumes,
+    concurrency: int = BULK_MATCH_CONCURRENCY,
+    top_k: Optional[int] = None,
+    min_skill_overlap: Optional[int] = None,
+    batched: bool = False
+) -> AsyncIterator[Tuple[int, dict]]:
+    """
+    Same pipeline as run_bulk_match, but yields (upload index, result) in completion order.
+    Rows are written in batches, so a result yielded early can still be flipped to status
+    False by a failed flush; the dicts are updated in place before the iterator ends.
+    """
+    run = BulkMatchRun(jd_text, concurrency=concurrency, min_skill_overlap=min_skill_overlap, batched=batched)
+    await run.start()
+    tasks: List[asyncio.Task] = []
+    try:
+        store = get_vector_store() if top_k else None
+        if store is None:
+            if isinstance(resumes, list):
+                tasks = [
+                    asyncio.create_task(_indexed(index, _guarded(resume.filename, run.match(resume))))
+                    for index, resume in enumerate(resumes)
+                ]
+            else:
+                # Still uploading: parse/score each file while the next one arrives
+                async for resume in resumes:
+                    tasks.append(asyncio.create_task(_indexed(len(tasks), _guarded(resume.filename, run.match(resume)))))
+        else:
+            if not isinstance(resumes, list):
+                resumes = [resume async for resume in resumes]
+            # --- Pre-screen: parse everything, rank locally, LLM-score the shortlist only ---
+            immediate, shortlist = await _prescreen_batch(run, store, resumes, top_k)
+            for item in immediate:
+                yield item
+            tasks = [
+                asyncio.create_task(_indexed(index, _guarded(resumes[index].filename, run.score(resumes[index].filename, parsed, extra))))
+                for index, parsed, extra in shortlist
+            ]
+
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Abandoned iteration (e.g. the client disconnected) must not leave LLM calls running
+        abandoned = any(not task.done() for task in tasks)
+        for task in tasks:
+            task.cancel()
+        # Flush buffered writes; a failed flush flips the affected results to status False
+        await run.finish(abandoned=abandoned)
+
+
+async def _prescreen_batch(
+    run: BulkMatchRun,
+    store: VectorStore,
+    resumes: List[UploadFile],
+    top_k: int
+) -> Tuple[List[Tuple[int, dict]], List[Tuple[int, dict, dict]]]:
+    """
+    Parses and ranks the whole batch by embedding similarity.
+    Returns the results that are final already (parse failures, screened-out files) and the
+    shortlist of (index, parsed, extra) to score with the LLM.
+    """
+    parsed_results = await run.parse_all(resumes)
+    immediate = []
+    candidates = []
+    for index, item in enumerate(parsed_results):
+        if "parsed" in item:
+            candidates.append(index)
+        else:
+            immediate.append((index, item))
+
+    ranking = await asyncio.to_thread(
+        _prescreen,
+        store,
+        run.jd_text,
+        [parsed_results[i]["parsed"]["parsed_text"] for i in candidates],
+        [resumes[i].filename for i in candidates]
+    )
+
+    shortlist = []
+    for rank, (position, similarity) in enumerate(ranking):
+        index = candidates[position]
+        if rank < top_k:
+            shortlist.append((index, parsed_results[index]["parsed"], {"similarity": similarity, "screened_out": False}))
+        else:
+            immediate.append((index, _screened_result(
+                resumes[index].filename,
+                {"similarity": similarity},
+                "Not shortlisted by the semantic pre-screen."
+            )))
+    return immediate, shortlist
+
+
+def rank_results(results: List[dict]) -> List[dict]:
+    """Scored results best first; screened-out and failed files are left out."""
+    scored = [r for r in results if r.get("status") and not r.get("screened_out") and "fit_percentage" in r]
+    return sorted(scored, key=lambda r: r["fit_percentage"], reverse=True)
+
+
+async def run_semantic_rank(jd_text: str, resumes: List[UploadFile]) -> Optional[List[dict]]:
+    """
+    Ranks resumes against the JD by embedding similarity only (no LLM).
+    Returns results best first, followed by files that failed to parse,
+    or None when no embedding model is configured.
+    """
+    store = get_vector_store()
+    if store is None:
+        return None
+
+    parsed_results = await BulkMatchRun(jd_text).parse_all(resumes)
+    candidates = [i for i, item in enumerate(parsed_results) if "parsed" in item]
+    ranking = await asyncio.to_thread(
+        _prescreen,
+        store,
+        jd_text,
+        [parsed_results[i]["parsed"]["parsed_text"] for i in candidates],
+        [resumes[i].filename for i in candidates]
+    )
+    ranked = [
+        {"resume_name": resumes[candidates[position]].filename, "status": True, "similarity": similarity}
+        for position, similarity in ranking
+    ]
+    return ranked + [item for item in parsed_results if "parsed" not in item]
@@ -0,0 +1,107 @@
+# app/services/domain_limiter.py
+
+import asyncio
+import json
+import os
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Dict
+from urllib.parse import urlsplit
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Politeness settings (per registrable domain) ---
+# Sustained requests/second and burst size of each domain's token bucket
+SCRAPER_DOMAIN_RATE = float(os.getenv("SCRAPER_DOMAIN_RATE", 1.0))
+SCRAPER_DOMAIN_BURST = int(os.getenv("SCRAPER_DOMAIN_BURST", 3))
+# Minimum gap between two request starts on one domain, plus up to 50% random jitter
+SCRAPER_POLITENESS_DELAY_SECONDS = float(os.getenv("SCRAPER_POLITENESS_DELAY_SECONDS", 0.5))
+# Requests in flight per domain
+SCRAPER_DOMAIN_CONCURRENCY = int(os.getenv("SCRAPER_DOMAIN_CONCURRENCY", 2))
+# Per-domain overrides, e.g. {"linkedin.com": {"rate": 0.5, "burst": 1, "delay": 2}}
+SCRAPER_DOMAIN_OVERRIDES: Dict[str, dict] = json.loads(os.getenv("SCRAPER_DOMAIN_OVERRIDES", "{}"))
+
+
+def domain_of(url: str) -> str:
+    """Registrable domain used as the rate-limit key (jobs.example.co.uk -> example.co.uk)."""
+    host = urlsplit(url).hostname or ""
+    labels = host.split(".")
+    # Keep three labels for two-letter second levels such as co.uk / com.au
+    keep = 3 if len(labels) >= 3 and len(labels[-1]) == 2 and len(labels[-2]) <= 3 else 2
+    return ".".join(labels[-keep:])
+
+
+class _DomainBucket:
+    def __init__(self, rate: float, burst: int, delay: float, concurrency: int):
+        self.rate = max(rate, 1e-6)
+        self.burst = max(1, burst)
+        self.delay = max(0.0, delay)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.next_start = 0.0
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.requests = 0
+        self.waited_seconds = 0.0
+
+    def reserve(self) -> float:
+        """Takes a token (going into debt if none are left) and returns how long to wait for it."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        ready = now + (-self.tokens / self.rate if self.tokens < 0 else 0.0)
+        start = max(ready, self.next_start)
+        self.next_start = start + self.delay * (1 + random.random() * 0.5)
+        return start - now
+
+
+class DomainLimiter:
+    """
+    Per-domain token buckets for outbound scraping: each domain gets SCRAPER_DOMAIN_RATE
+    requests/second (bursts up to SCRAPER_DOMAIN_BURST), request starts at least
+    SCRAPER_POLITENESS_DELAY_SECONDS apart, and at most SCRAPER_DOMAIN_CONCURRENCY in flight.
+    Different domains never wait on each other.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[str, _DomainBucket] = {}
+
+    def _bucket(self, domain: str) -> _DomainBucket:
+        if domain not in self._buckets:
+            override = SCRAPER_DOMAIN_OVERRIDES.get(domain, {})
+            self._buckets[domain] = _DomainBucket(
+                rate=override.get("rate", SCRAPER_DOMAIN_RATE),
+                burst=override.get("burst", SCRAPER_DOMAIN_BURST),
+                delay=override.get("delay", SCRAPER_POLITENESS_DELAY_SECONDS),
+                concurrency=override.get("concurrency", SCRAPER_DOMAIN_CONCURRENCY)
+            )
+        return self._buckets[domain]
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """Waits for the domain's turn, then holds one of its concurrency slots for the request."""
+        bucket = self._bucket(domain_of(url))
+        async with bucket.semaphore:
+            # Reserved after the semaphore, so queued requests don't burn tokens while waiting
+            wait = bucket.reserve()
+            if wait > 0:
+                bucket.waited_seconds += wait
+                await asyncio.sleep(wait)
+            bucket.requests += 1
+            yield
+
+    def stats(self) -> dict:
+        return {
+            domain: {
+                "requests": b.requests,
+                "waited_seconds": round(b.waited_seconds, 3),
+                "tokens": round(min(b.burst, b.tokens + (time.monotonic() - b.updated) * b.rate), 2)
+            }
+            for domain, b in self._buckets.items()
+        }
+
+
+domain_limiter = DomainLimiter()
@@ -0,0 +1,462 @@
+# app/services/job_queue.py
+#
+# Mongo-backed queue for bulk matching. A submitted batch becomes one job plus one item per
+# resume; workers claim items with a lease, so a crashed worker's items are picked up again
+# once the lease runs out and jobs survive restarts.
+#   bulk_jobs:      {jd_text, min_skill_overlap, batched, status, total, completed, failed, created_at, finished_at}
+#   bulk_job_items: {job_id, index, resume_name, content_type, file_id, status, attempts,
+#                    lease_expires_at, not_before, worker_id, result, finished_at}
+#   bulk_job_files: GridFS bucket holding each queued resume until its item is processed
+#                   (items only keep the `file_id` reference)
+#
+# Workers run inside the API process (BULK_JOB_WORKERS) and/or standalone:
+#   python -m app.services.job_queue
+
+import asyncio
+import os
+import socket
+import sys
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from gridfs.errors import NoFile
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from pymongo import ReturnDocument
+from pymongo.errors import ConnectionFailure
+
+from app.db.database import db
+from app.services.bulk_matcher import BulkMatchRun, _error_result, _guarded, _rejected_message
+from app.services.llm_limiter import LLMUnavailableError
+from app.utils.uploads import ReceivedUpload
+
+# --- Worker settings ---
+BULK_JOB_WORKERS = int(os.getenv("BULK_JOB_WORKERS", 4))  # 0 = no in-process workers
+BULK_JOB_LEASE_SECONDS = int(os.getenv("BULK_JOB_LEASE_SECONDS", 300))
+BULK_JOB_MAX_ATTEMPTS = int(os.getenv("BULK_JOB_MAX_ATTEMPTS", 3))
+# Backoff before an item that hit a transient error is claimed again (doubles per attempt)
+BULK_JOB_RETRY_SECONDS = float(os.getenv("BULK_JOB_RETRY_SECONDS", 60))
+BULK_JOB_POLL_SECONDS = float(os.getenv("BULK_JOB_POLL_SECONDS", 1))
+BULK_JOB_MAX_FILES = int(os.getenv("BULK_JOB_MAX_FILES", 200))
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+ITEM_DONE = "done"
+ITEM_FAILED = "failed"
+
+# Outages rather than bad files: the item goes back to the queue (file kept) instead of failing
+TRANSIENT_ERRORS = (LLMUnavailableError, ConnectionFailure)
+
+
+def parse_job_id(job_id: str) -> Optional[ObjectId]:
+    try:
+        return ObjectId(job_id)
+    except (InvalidId, TypeError):
+        return None
+
+
+_bucket: Optional[AsyncIOMotorGridFSBucket] = None
+
+
+def _files() -> AsyncIOMotorGridFSBucket:
+    global _bucket
+    if _bucket is None:
+        _bucket = AsyncIOMotorGridFSBucket(db, bucket_name="bulk_job_files")
+    return _bucket
+
+
+async def store_job_file(upload: ReceivedUpload) -> dict:
+    """
+    Moves a received upload into GridFS and returns the file entry for `submit_job`.
+    Uploads refused while streaming (type/size) become entries with an `error` instead.
+    The upload (and its spool file) is closed either way.
+    """
+    entry = {"filename": upload.filename, "content_type": upload.content_type}
+    try:
+        if upload.error is not None:
+            return {**entry, "error": _rejected_message(upload)}
+        metadata = {"content_type": upload.content_type, "format": upload.format}
+        if upload.path is not None:
+            with open(upload.path, "rb") as source:
+                file_id = await _files().upload_from_stream(upload.filename, source, metadata=metadata)
+        else:
+            file_id = await _files().upload_from_stream(upload.filename, upload.content, metadata=metadata)
+        return {**entry, "file_id": file_id}
+    finally:
+        upload.close()
+
+
+async def delete_job_files(file_ids: List[ObjectId]):
+    for file_id in file_ids:
+        try:
+            await _files().delete(file_id)
+        except NoFile:
+            pass
+
+
+async def _load_job_file(file_id: ObjectId) -> bytes:
+    stream = await _files().open_download_stream(file_id)
+    return await stream.read()
+
+
+async def submit_job(
+    jd_text: str,
+    files: List[dict],
+    min_skill_overlap: Optional[int] = None,
+    batched: bool = False
+) -> str:
+    """
+    Queues one bulk match. `files` are entries from `store_job_file`: {"filename",
+    "content_type", "file_id"}, or {"filename", "content_type", "error"} for a file that was
+    refused on upload (stored as an already-failed item).
+    Returns the job id as soon as the job and its items are stored.
+    """
+    now = datetime.utcnow()
+    failed = sum(1 for f in files if "error" in f)
+    job = {
+        "jd_text": jd_text,
+        "min_skill_overlap": min_skill_overlap,
+        "batched": batched,
+        "status": JOB_COMPLETED if failed == len(files) else JOB_QUEUED,
+        "total": len(files),
+        "completed": 0,
+        "failed": failed,
+        "created_at": now,
+        "updated_at": now,
+        "finished_at": now if failed == len(files) else None
+    }
+    job_id = (await db.bulk_jobs.insert_one(job)).inserted_id
+    await db.bulk_job_items.insert_many([
+        {
+            "job_id": job_id,
+            "index": index,
+            "resume_name": f["filename"],
+            "content_type": f["content_type"],
+            "file_id": f.get("file_id"),
+            "status": ITEM_FAILED if "error" in f else JOB_QUEUED,
+            "attempts": 0,
+            "lease_expires_at": None,
+            "worker_id": None,
+            "result": _error_result(f["filename"], f["error"]) if "error" in f else None,
+            "finished_at": now if "error" in f else None
+        }
+        for index, f in enumerate(files)
+    ])
+    _wake_workers()
+    return str(job_id)
+
+
+async def get_job(job_id: ObjectId) -> Optional[dict]:
+    return await db.bulk_jobs.find_one({"_id": job_id}, {"jd_text": 0})
+
+
+async def get_finished_items(job_id: ObjectId, since: Optional[datetime] = None) -> List[dict]:
+    """Finished items of a job in completion order, optionally only those finished at/after `since`."""
+    query = {"job_id": job_id, "status": {"$in": [ITEM_DONE, ITEM_FAILED]}}
+    if since is not None:
+        query["finished_at"] = {"$gte": since}
+    cursor = db.bulk_job_items.find(query, {"content": 0, "file_id": 0}).sort([("finished_at", 1), ("_id", 1)])
+    return await cursor.to_list(length=None)
+
+
+def job_progress(job: dict) -> dict:
+    done = job.get("completed", 0) + job.get("failed", 0)
+    total = job.get("total", 0)
+    return {
+        "job_id": str(job["_id"]),
+        "status": job["status"],
+        "total": total,
+        "completed": job.get("completed", 0),
+        "failed": job.get("failed", 0),
+        "progress": round(100 * done / total, 1) if total else 100.0,
+        "created_at": job.get("created_at"),
+        "finished_at": job.get("finished_at")
+    }
+
+
+# --- Workers ---
+
+class JobWorkerPool:
+    """Asyncio workers that claim queue items one at a time and run them through BulkMatchRun."""
+
+    def __init__(self, workers: int = BULK_JOB_WORKERS):
+        self.workers = workers
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._tasks: List[asyncio.Task] = []
+        # One BulkMatchRun per job this process is working on, shared by its workers so items
+        # claimed together share batched prompts; `_active` counts the items using each run
+        self._runs: Dict[ObjectId, BulkMatchRun] = {}
+        self._active: Dict[ObjectId, int] = {}
+        self._runs_lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+
+    async def start(self):
+        if self.workers <= 0 or self._tasks:
+            return
+        await self.recover()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for run in self._runs.values():
+            await run.finish()
+        self._runs.clear()
+        self._active.clear()
+
+    def wake(self):
+        self._wake.set()
+
+    async def recover(self):
+        """Re-syncs job counters with their items; jobs cut short by a crash resume where they left off."""
+        async for job in db.bulk_jobs.find({"status": {"$ne": JOB_COMPLETED}}, {"_id": 1}):
+            await self._refresh_job(job["_id"])
+
+    async def _claim(self) -> Optional[dict]:
+        now = datetime.utcnow()
+        return await db.bulk_job_items.find_one_and_update(
+            {"$or": [
+                # not_before: backing off after a transient error (missing on fresh items)
+                {"status": JOB_QUEUED, "not_before": {"$not": {"$gt": now}}},
+                {"status": JOB_RUNNING, "lease_expires_at": {"$lt": now}}
+            ]},
+            {
+                "$set": {
+                    "status": JOB_RUNNING,
+                    "worker_id": self.worker_id,
+                    "lease_expires_at": now + timedelta(seconds=BULK_JOB_LEASE_SECONDS)
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("_id", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _heartbeat(self, item_id: ObjectId):
+        # Long LLM retries must not let the lease lapse while the item is still being worked on
+        while True:
+            await asyncio.sleep(BULK_JOB_LEASE_SECONDS / 3)
+            await db.bulk_job_items.update_one(
+                {"_id": item_id, "worker_id": self.worker_id},
+                {"$set": {"lease_expires_at": datetime.utcnow() + timedelta(seconds=BULK_JOB_LEASE_SECONDS)}}
+            )
+
+    async def _acquire_run(self, job_id: ObjectId) -> Optional[BulkMatchRun]:
+        async with self._runs_lock:
+            if job_id not in self._runs:
+                job = await db.bulk_jobs.find_one({"_id": job_id})
+                if job is None:
+                    return None
+                # Write each match row as soon as it is scored, so a finished item is durable
+                run = BulkMatchRun(
+                    job["jd_text"],
+                    concurrency=max(1, self.workers),
+                    min_skill_overlap=job.get("min_skill_overlap"),
+                    write_batch_size=1,
+                    # Items claimed concurrently by this process's workers share batched prompts
+                    batched=job.get("batched", False)
+                )
+                await run.start()
+                self._runs[job_id] = run
+                self._active[job_id] = 0
+                if job["status"] == JOB_QUEUED:
+                    await db.bulk_jobs.update_one(
+                        {"_id": job_id, "status": JOB_QUEUED},
+                        {"$set": {"status": JOB_RUNNING, "updated_at": datetime.utcnow()}}
+                    )
+            self._active[job_id] += 1
+            return self._runs[job_id]
+
+    async def _release_run(self, job_id: ObjectId):
+        """
+        Drops this item's hold on the job's run. The run is kept while the job still has queued
+        items for the next claim; otherwise (job finished, the rest claimed by other workers or
+        processes, or our lease lost) it is flushed and closed.
+        """
+        async with self._runs_lock:
+            self._active[job_id] -= 1
+            if self._active[job_id] > 0:
+                return
+            queued = await db.bulk_job_items.find_one({"job_id": job_id, "status": JOB_QUEUED}, {"_id": 1})
+            if queued is not None:
+                return
+            run = self._runs.pop(job_id)
+            self._active.pop(job_id)
+        await run.finish()
+
+    async def _evict_idle_runs(self, keep: Optional[ObjectId] = None):
+        # Runs kept for queued items that were then claimed elsewhere; called when a worker
+        # idles or moves on to another job
+        async with self._runs_lock:
+            idle = [job_id for job_id, count in self._active.items() if count == 0 and job_id != keep]
+            runs = [self._runs.pop(job_id) for job_id in idle]
+            for job_id in idle:
+                self._active.pop(job_id)
+        for run in runs:
+            await run.finish()
+
+    async def _load_content(self, item: dict) -> bytes:
+        if item.get("file_id") is None:
+            # Items queued before files moved to GridFS carry the bytes inline
+            return item.get("content") or b""
+        return await _load_job_file(item["file_id"])
+
+    async def _process(self, item: dict, run: BulkMatchRun) -> dict:
+        async def work() -> dict:
+            content = await self._load_content(item)
+            if item.get("file_id") is not None:
+                # Type and size were checked while the upload streamed in
+                parsed = await run.parse_content(item["resume_name"], content)
+            else:
+                parsed = await run.parse_bytes(item["resume_name"], item["content_type"], content)
+            # Keyed on the item, so a re-run after a lost lease doesn't add a second match row
+            key = {"bulk_job_id": item["job_id"], "bulk_item_id": item["_id"]}
+            return await run.score(item["resume_name"], parsed, match_key=key)
+
+        heartbeat = asyncio.create_task(self._heartbeat(item["_id"]))
+        try:
+            return await _guarded(item["resume_name"], work(), passthrough=TRANSIENT_ERRORS)
+        finally:
+            heartbeat.cancel()
+
+    async def _run_item(self, item: dict) -> dict:
+        if item["attempts"] > BULK_JOB_MAX_ATTEMPTS:
+            return _error_result(item["resume_name"], f"Gave up after {BULK_JOB_MAX_ATTEMPTS} attempts.")
+        run = await self._acquire_run(item["job_id"])
+        if run is None:
+            return _error_result(item["resume_name"], "Job no longer exists.")
+        try:
+            return await self._process(item, run)
+        finally:
+            await self._release_run(item["job_id"])
+
+    async def _retry_item(self, item: dict, error: Exception):
+        """Releases the lease so the item is retried after a backoff; fails it once out of attempts."""
+        if item["attempts"] >= BULK_JOB_MAX_ATTEMPTS:
+            message = f"Gave up after {BULK_JOB_MAX_ATTEMPTS} attempts: {str(error)}"
+            await self._finish_item(item, _error_result(item["resume_name"], message))
+            return
+        delay = max(BULK_JOB_RETRY_SECONDS * 2 ** (item["attempts"] - 1), getattr(error, "retry_after", 0) or 0)
+        print(f"❌ Bulk job item {item['_id']} hit a transient error, retrying in {delay:.0f}s:", str(error))
+        # The GridFS file stays; only the lease is given up
+        await db.bulk_job_items.update_one(
+            {"_id": item["_id"], "worker_id": self.worker_id, "status": JOB_RUNNING},
+            {
+                "$set": {"status": JOB_QUEUED, "not_before": datetime.utcnow() + timedelta(seconds=delay)},
+                "$unset": {"lease_expires_at": "", "worker_id": ""}
+            }
+        )
+
+    async def _finish_item(self, item: dict, result: dict):
+        updated = await db.bulk_job_items.update_one(
+            {"_id": item["_id"], "worker_id": self.worker_id, "status": JOB_RUNNING},
+            {
+                "$set": {
+                    "status": ITEM_DONE if result["status"] else ITEM_FAILED,
+                    "result": result,
+                    "finished_at": datetime.utcnow()
+                },
+                # The file is not needed once it has been processed
+                "$unset": {"content": "", "lease_expires_at": ""}
+            }
+        )
+        if updated.modified_count:
+            if item.get("file_id") is not None:
+                await delete_job_files([item["file_id"]])
+            await self._refresh_job(item["job_id"])
+
+    async def _refresh_job(self, job_id: ObjectId):
+        # Counters are recounted from the items (indexed), so they are right even after a crash
+        # between finishing an item and updating its job
+        completed = await db.bulk_job_items.count_documents({"job_id": job_id, "status": ITEM_DONE})
+        failed = await db.bulk_job_items.count_documents({"job_id": job_id, "status": ITEM_FAILED})
+        now = datetime.utcnow()
+        job = await db.bulk_jobs.find_one_and_update(
+            {"_id": job_id},
+            {"$set": {"completed": completed, "failed": failed, "updated_at": now}},
+            return_document=ReturnDocument.AFTER
+        )
+        if job is not None and completed + failed >= job["total"] and job["status"] != JOB_COMPLETED:
+            await db.bulk_jobs.update_one(
+                {"_id": job_id},
+                {"$set": {"status": JOB_COMPLETED, "finished_at": now}}
+            )
+
+    async def _work(self):
+        while True:
+            try:
+                item = await self._claim()
+                if item is None:
+                    await self._evict_idle_runs()
+                    self._wake.clear()
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), timeout=BULK_JOB_POLL_SECONDS)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await self._evict_idle_runs(keep=item["job_id"])
+                try:
+                    result = await self._run_item(item)
+                except TRANSIENT_ERRORS as e:
+                    await self._retry_item(item, e)
+                    continue
+                await self._finish_item(item, result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Mongo hiccups must not kill the worker; the item's lease will expire and it is retried
+                print("❌ Bulk job worker error:", str(e))
+                await asyncio.sleep(BULK_JOB_POLL_SECONDS)
+
+
+_pool: Optional[JobWorkerPool] = None
+
+
+def _wake_workers():
+    if _pool is not None:
+        _pool.wake()
+
+
+async def start_job_workers(workers: int = BULK_JOB_WORKERS):
+    global _pool
+    if _pool is None and workers > 0:
+        _pool = JobWorkerPool(workers)
+        await _pool.start()
+
+
+async def stop_job_workers():
+    global _pool
+    if _pool is not None:
+        await _pool.stop()
+        _pool = None
+
+
+async def main(workers: int):
+    from app.services.llm_client import start_llm_client, close_llm_client
+    from app.services.parsing_service import start_parser_pool, close_parser_pool
+    from app.db.indexes import ensure_indexes
+
+    await start_llm_client()
+    await ensure_indexes()
+    start_parser_pool()
+    await start_job_workers(workers)
+    print(f"✅ Bulk job worker running with {workers} workers.")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await stop_job_workers()
+        close_parser_pool()
+        await close_llm_client()
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else max(1, BULK_JOB_WORKERS)
+    try:
+        asyncio.run(main(count))
+    except KeyboardInterrupt:
+        pass
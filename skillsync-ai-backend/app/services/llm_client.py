@@ -0,0 +1,205 @@
+# app/services/llm_client.py
+
+import json
+import os
+import time
+from typing import AsyncIterator, Optional, Tuple
+
+import httpx
+from dotenv import load_dotenv
+
+from app.services.llm_limiter import LLMLimiter, llm_limiter
+
+# --- Load environment variables ---
+load_dotenv()
+OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+
+# --- Connection pool settings ---
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", 50))
+LLM_POOL_MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", 20))
+LLM_POOL_KEEPALIVE_EXPIRY = float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", 120))
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "true").lower() == "true"
+
+# HTTP/2 needs the optional `h2` package; fall back to HTTP/1.1 keep-alive without it
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+HEADERS = {
+    "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+    "Content-Type": "application/json",
+    "X-Title": "Resume Analyzer",
+    "HTTP-Referer": "https://yourdomain.com"  # customize!
+}
+
+# One client for the whole app lifetime, created in the startup hook
+_client: Optional[httpx.AsyncClient] = None
+
+# --- Transport metrics ---
+_stats = {
+    "requests": 0,
+    "new_connections": 0,
+    "reused_connections": 0,
+    "http2_requests": 0,
+    "handshake_seconds_total": 0.0
+}
+
+
+def _build_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=OPENROUTER_BASE_URL,
+        headers=HEADERS,
+        http2=LLM_HTTP2 and HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=LLM_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=LLM_POOL_KEEPALIVE_EXPIRY
+        ),
+        timeout=httpx.Timeout(60.0)
+    )
+
+
+async def start_llm_client():
+    global _client
+    if _client is None:
+        _client = _build_client()
+
+
+async def close_llm_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_llm_client() -> httpx.AsyncClient:
+    # Created lazily as well, so scripts that never run the app startup hook still work
+    global _client
+    if _client is None:
+        _client = _build_client()
+    return _client
+
+
+class _HandshakeTrace:
+    """httpcore trace hook that times TCP connect + TLS for requests that open a new connection."""
+
+    def __init__(self):
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    async def __call__(self, event_name: str, info: dict):
+        if event_name == "connection.connect_tcp.started":
+            self.started_at = time.perf_counter()
+        elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            self.finished_at = time.perf_counter()
+
+    @property
+    def new_connection(self) -> bool:
+        return self.started_at is not None
+
+    @property
+    def seconds(self) -> float:
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+
+def _record(trace: _HandshakeTrace, response: Optional[httpx.Response]):
+    _stats["requests"] += 1
+    if trace.new_connection:
+        _stats["new_connections"] += 1
+        _stats["handshake_seconds_total"] += trace.seconds
+    else:
+        _stats["reused_connections"] += 1
+    if response is not None and response.http_version == "HTTP/2":
+        _stats["http2_requests"] += 1
+
+
+def _target(route) -> Tuple[str, Optional[dict], "LLMLimiter"]:
+    """URL, header overrides and limiter for a router route (see llm_router); None is the default OpenRouter endpoint."""
+    if route is None or route.base_url == OPENROUTER_BASE_URL:
+        headers = route.headers if route is not None else None
+        return "/chat/completions", headers, route.limiter if route is not None else llm_limiter
+    # Absolute URLs bypass the client's base_url but still share its connection pool
+    return f"{route.base_url.rstrip('/')}/chat/completions", route.headers, route.limiter
+
+
+async def post_chat_completion(body: dict, timeout: float = 60, route=None) -> httpx.Response:
+    """
+    POSTs a chat completion request over the shared pooled client, admitted by the endpoint's
+    LLM limiter (raises LLMUnavailableError when the provider is down or overloaded).
+    """
+    url, headers, limiter = _target(route)
+    trace = _HandshakeTrace()
+    response = None
+    try:
+        async with limiter.slot() as slot:
+            response = await get_llm_client().post(
+                url,
+                json=body,
+                headers=headers,
+                timeout=timeout,
+                extensions={"trace": trace}
+            )
+            slot.observe(response)
+        return response
+    finally:
+        _record(trace, response)
+
+
+class LLMStreamError(Exception):
+    """OpenRouter reported an error inside an already-started stream."""
+
+
+async def stream_chat_completion(body: dict, timeout: float = 60, route=None) -> AsyncIterator[str]:
+    """
+    POSTs a chat completion with `stream: true` and yields the content deltas of the SSE
+    stream as they arrive. Raises httpx.HTTPStatusError before the first delta on HTTP errors.
+    """
+    url, headers, limiter = _target(route)
+    trace = _HandshakeTrace()
+    response = None
+    try:
+        async with limiter.slot() as slot, get_llm_client().stream(
+            "POST",
+            url,
+            json={**body, "stream": True},
+            headers=headers,
+            timeout=timeout,
+            extensions={"trace": trace}
+        ) as response:
+            slot.observe(response)
+            if response.is_error:
+                await response.aread()
+                response.raise_for_status()
+            async for line in response.aiter_lines():
+                # Lines starting with ":" are keep-alive comments ("OPENROUTER PROCESSING")
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                if "error" in chunk:
+                    raise LLMStreamError(chunk["error"].get("message", str(chunk["error"])))
+                choices = chunk.get("choices") or [{}]
+                delta = (choices[0].get("delta") or {}).get("content")
+                if delta:
+                    yield delta
+    finally:
+        _record(trace, response)
+
+
+def get_transport_stats() -> dict:
+    new_connections = _stats["new_connections"]
+    avg_handshake = _stats["handshake_seconds_total"] / new_connections if new_connections else 0.0
+    return {
+        **_stats,
+        "http2_enabled": LLM_HTTP2 and HTTP2_AVAILABLE,
+        "avg_handshake_seconds": round(avg_handshake, 4),
+        # Every reused connection skipped one TCP + TLS handshake
+        "handshake_seconds_saved": round(_stats["reused_connections"] * avg_handshake, 4)
+    }
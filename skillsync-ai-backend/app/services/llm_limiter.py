@@ -0,0 +1,286 @@
+# app/services/llm_limiter.py
+
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Deque, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Adaptive concurrency (AIMD) ---
+LLM_LIMIT_INITIAL = float(os.getenv("LLM_LIMIT_INITIAL", 16))
+LLM_LIMIT_MIN = float(os.getenv("LLM_LIMIT_MIN", 1))
+LLM_LIMIT_MAX = float(os.getenv("LLM_LIMIT_MAX", 64))
+LLM_LIMIT_BACKOFF_RATIO = float(os.getenv("LLM_LIMIT_BACKOFF_RATIO", 0.5))
+# Latency above baseline * tolerance counts as congestion
+LLM_LATENCY_TOLERANCE = float(os.getenv("LLM_LATENCY_TOLERANCE", 2.0))
+# At most one multiplicative decrease per window, so one burst of 429s doesn't collapse the limit
+LLM_DECREASE_COOLDOWN_SECONDS = float(os.getenv("LLM_DECREASE_COOLDOWN_SECONDS", 2))
+
+# --- Admission queue ---
+LLM_QUEUE_MAX = int(os.getenv("LLM_QUEUE_MAX", 500))
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", 120))
+
+# --- Circuit breaker ---
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", 5))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", 30))
+
+# --- Retry backoff ---
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", 1))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", 30))
+LLM_MAX_RETRY_AFTER_SECONDS = float(os.getenv("LLM_MAX_RETRY_AFTER_SECONDS", 60))
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+
+class LLMUnavailableError(Exception):
+    """The LLM provider is down (circuit open) or overloaded (admission queue full / timed out)."""
+
+    def __init__(self, message: str, retry_after: float = LLM_BREAKER_COOLDOWN_SECONDS):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After as seconds; accepts delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), LLM_MAX_RETRY_AFTER_SECONDS)
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff, never shorter than the provider's Retry-After."""
+    delay = random.uniform(0, min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * 2 ** attempt))
+    return max(delay, retry_after or 0.0)
+
+
+def is_retryable_status(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+class _Slot:
+    def __init__(self, limiter: "LLMLimiter"):
+        self.limiter = limiter
+        self.started_at = time.monotonic()
+        self.observed = False
+
+    def observe(self, response: httpx.Response):
+        """Records the outcome as soon as the response headers are in (streams keep the slot longer)."""
+        if not self.observed:
+            self.observed = True
+            self.limiter._on_response(response, time.monotonic() - self.started_at)
+
+
+class LLMLimiter:
+    """
+    Shared admission controller for LLM calls.
+    - Concurrency limit adapts AIMD-style: +1/limit per fast success, x LLM_LIMIT_BACKOFF_RATIO
+      on 429/5xx/timeouts or when latency rises well above its baseline.
+    - Callers over the limit wait in a bounded FIFO queue.
+    - A 429 with Retry-After pauses new admissions until it has passed.
+    - LLM_BREAKER_FAILURES consecutive 5xx/timeouts/connection errors open the breaker: calls fail
+      fast with LLMUnavailableError for LLM_BREAKER_COOLDOWN_SECONDS, then one probe is let through.
+    """
+
+    def __init__(self):
+        self.limit = LLM_LIMIT_INITIAL
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._latency_ewma: Optional[float] = None
+        self._latency_baseline: Optional[float] = None
+        self._breaker = BREAKER_CLOSED
+        self._breaker_opened_at = 0.0
+        self._probe_in_flight = False
+        self._consecutive_failures = 0
+        self._stats = {
+            "admitted": 0,
+            "queued": 0,
+            "max_queue_depth": 0,
+            "rejected_queue_full": 0,
+            "rejected_queue_timeout": 0,
+            "rejected_breaker_open": 0,
+            "successes": 0,
+            "throttled": 0,
+            "server_errors": 0,
+            "transport_errors": 0,
+            "limit_increases": 0,
+            "limit_decreases": 0,
+            "breaker_opens": 0
+        }
+
+    @property
+    def breaker_state(self) -> str:
+        if self._breaker == BREAKER_OPEN and time.monotonic() >= self._breaker_opened_at + LLM_BREAKER_COOLDOWN_SECONDS:
+            return BREAKER_HALF_OPEN
+        return self._breaker
+
+    # --- Admission ---
+
+    def _check_breaker(self) -> bool:
+        """Raises while the breaker is open; returns True if this caller is the half-open probe."""
+        if self._breaker == BREAKER_CLOSED:
+            return False
+        remaining = self._breaker_opened_at + LLM_BREAKER_COOLDOWN_SECONDS - time.monotonic()
+        if self._breaker == BREAKER_OPEN and remaining <= 0:
+            self._breaker = BREAKER_HALF_OPEN
+        if self._breaker == BREAKER_HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        self._stats["rejected_breaker_open"] += 1
+        raise LLMUnavailableError(
+            "The AI provider is currently unavailable. Please try again shortly.",
+            retry_after=max(remaining, 1.0)
+        )
+
+    async def acquire(self) -> bool:
+        while True:
+            pause = self._paused_until - time.monotonic()
+            if pause <= 0:
+                break
+            await asyncio.sleep(pause)
+
+        probe = self._check_breaker()
+        if probe or (self.in_flight < int(self.limit) and not self._waiters):
+            self.in_flight += 1
+            self._stats["admitted"] += 1
+            return probe
+
+        if len(self._waiters) >= LLM_QUEUE_MAX:
+            self._stats["rejected_queue_full"] += 1
+            raise LLMUnavailableError("Too many AI requests are queued. Please try again shortly.", retry_after=5)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._stats["queued"] += 1
+        self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], len(self._waiters))
+        try:
+            await asyncio.wait_for(waiter, LLM_QUEUE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            self._stats["rejected_queue_timeout"] += 1
+            raise LLMUnavailableError("Timed out waiting for an AI request slot.", retry_after=5)
+        except BaseException:
+            # Cancelled after the slot was granted: hand it on
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        self._stats["admitted"] += 1
+        return False
+
+    def _release(self):
+        self.in_flight -= 1
+        self._grant()
+
+    def _grant(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self):
+        """Holds one admission for the duration of an LLM request; call `observe()` with the response."""
+        probe = await self.acquire()
+        slot = _Slot(self)
+        try:
+            yield slot
+        except (httpx.TimeoutException, httpx.TransportError):
+            self._on_failure(transport=True)
+            raise
+        finally:
+            if probe:
+                self._probe_in_flight = False
+            self._release()
+
+    # --- Feedback ---
+
+    def _on_response(self, response: httpx.Response, latency: float):
+        if response.status_code == 429:
+            self._stats["throttled"] += 1
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            self._decrease()
+        elif response.status_code >= 500:
+            self._stats["server_errors"] += 1
+            self._on_failure()
+        else:
+            self._on_success(latency)
+
+    def _on_success(self, latency: float):
+        self._stats["successes"] += 1
+        self._consecutive_failures = 0
+        if self._breaker != BREAKER_CLOSED:
+            self._breaker = BREAKER_CLOSED
+
+        self._latency_ewma = latency if self._latency_ewma is None else 0.7 * self._latency_ewma + 0.3 * latency
+        if self._latency_baseline is None:
+            self._latency_baseline = latency
+        if self._latency_ewma > self._latency_baseline * LLM_LATENCY_TOLERANCE:
+            self._decrease()
+        else:
+            # The baseline follows only uncongested latencies, and slowly
+            self._latency_baseline = 0.95 * self._latency_baseline + 0.05 * latency
+            if self.limit < LLM_LIMIT_MAX:
+                self.limit = min(LLM_LIMIT_MAX, self.limit + 1 / self.limit)
+                self._stats["limit_increases"] += 1
+                self._grant()
+
+    def _on_failure(self, transport: bool = False):
+        if transport:
+            self._stats["transport_errors"] += 1
+        self._consecutive_failures += 1
+        self._decrease()
+        if self._breaker == BREAKER_HALF_OPEN or self._consecutive_failures >= LLM_BREAKER_FAILURES:
+            if self._breaker != BREAKER_OPEN:
+                self._stats["breaker_opens"] += 1
+                print("❌ LLM circuit breaker opened after", self._consecutive_failures, "consecutive failures")
+            self._breaker = BREAKER_OPEN
+            self._breaker_opened_at = time.monotonic()
+
+    def _decrease(self):
+        now = time.monotonic()
+        if now - self._last_decrease < LLM_DECREASE_COOLDOWN_SECONDS:
+            return
+        self._last_decrease = now
+        self.limit = max(LLM_LIMIT_MIN, self.limit * LLM_LIMIT_BACKOFF_RATIO)
+        self._stats["limit_decreases"] += 1
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queue_depth": len(self._waiters),
+            "breaker_state": self._breaker,
+            "consecutive_failures": self._consecutive_failures,
+            "paused_seconds_remaining": round(max(0.0, self._paused_until - time.monotonic()), 2),
+            "latency_ewma_seconds": round(self._latency_ewma or 0.0, 4),
+            "latency_baseline_seconds": round(self._latency_baseline or 0.0, 4)
+        }
+
+
+llm_limiter = LLMLimiter()
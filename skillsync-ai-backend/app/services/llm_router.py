@@ -0,0 +1,250 @@
+# app/services/llm_router.py
+
+import asyncio
+import bisect
+import json
+import os
+import random
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import httpx
+from dotenv import load_dotenv
+
+from app.services.llm_client import OPENROUTER_BASE_URL, post_chat_completion
+from app.services.llm_limiter import BREAKER_OPEN, LLMLimiter, llm_limiter
+from app.utils.telemetry import span
+
+load_dotenv()
+OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "deepseek/deepseek-chat-v3-0324:free")
+
+# Ordered routes as a JSON list, e.g.
+#   [{"model": "deepseek/deepseek-chat-v3-0324", "weight": 3},
+#    {"model": "meta-llama/llama-3.3-70b-instruct", "weight": 1},
+#    {"name": "groq", "model": "llama-3.3-70b-versatile", "base_url": "https://api.groq.com/openai/v1",
+#     "api_key_env": "GROQ_API_KEY"}]
+# Without it, every call goes to OPENROUTER_MODEL as before.
+LLM_ROUTES = os.getenv("LLM_ROUTES")
+
+# --- Rolling stats ---
+LLM_ROUTE_WINDOW = int(os.getenv("LLM_ROUTE_WINDOW", 200))
+# Routes failing more than this share of recent calls are skipped while others are healthy
+LLM_ROUTE_MAX_ERROR_RATE = float(os.getenv("LLM_ROUTE_MAX_ERROR_RATE", 0.5))
+LLM_ROUTE_MIN_SAMPLES = int(os.getenv("LLM_ROUTE_MIN_SAMPLES", 20))
+
+# --- Hedging ---
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "true").lower() == "true"
+# Deadline before the primary's p95 is known
+LLM_HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY_SECONDS", 10))
+LLM_HEDGE_MIN_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", 0.25))
+# Hedges are capped at this share of requests so a slow provider can't double the load
+LLM_HEDGE_MAX_RATIO = float(os.getenv("LLM_HEDGE_MAX_RATIO", 0.2))
+
+# Histogram upper bounds in seconds (the last bucket is +Inf)
+LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 16, 32, 64)
+
+
+class LLMRoute:
+    """One model on one endpoint, with its weight and rolling latency/error window."""
+
+    def __init__(self, name: str, model: str, base_url: str, headers: Optional[dict], weight: float, limiter: LLMLimiter):
+        self.name = name
+        self.model = model
+        self.base_url = base_url
+        self.headers = headers
+        self.weight = weight
+        self.limiter = limiter
+        self._window: Deque[Tuple[float, bool]] = deque(maxlen=LLM_ROUTE_WINDOW)
+        self._buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self._latency_sum = 0.0
+        self._stats = {"requests": 0, "errors": 0, "cancelled": 0, "hedged_wins": 0}
+
+    def observe(self, latency: float, ok: bool):
+        self._window.append((latency, ok))
+        self._buckets[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self._latency_sum += latency
+        self._stats["requests"] += 1
+        if not ok:
+            self._stats["errors"] += 1
+
+    def error_rate(self) -> float:
+        if not self._window:
+            return 0.0
+        return sum(1 for _, ok in self._window if not ok) / len(self._window)
+
+    def percentile(self, q: float) -> Optional[float]:
+        latencies = sorted(latency for latency, ok in self._window if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    def healthy(self) -> bool:
+        if self.limiter.breaker_state == BREAKER_OPEN:
+            return False
+        return len(self._window) < LLM_ROUTE_MIN_SAMPLES or self.error_rate() <= LLM_ROUTE_MAX_ERROR_RATE
+
+    def histogram(self) -> dict:
+        # Cumulative, Prometheus-style
+        counts, total = {}, 0
+        for bound, count in zip([*LATENCY_BUCKETS, "+Inf"], self._buckets):
+            total += count
+            counts[str(bound)] = total
+        return {"buckets": counts, "sum": round(self._latency_sum, 4), "count": total}
+
+    def stats(self) -> dict:
+        p50, p95, p99 = (self.percentile(q) for q in (0.5, 0.95, 0.99))
+        return {
+            **self._stats,
+            "name": self.name,
+            "model": self.model,
+            "base_url": self.base_url,
+            "weight": self.weight,
+            "healthy": self.healthy(),
+            "breaker_state": self.limiter.breaker_state,
+            "window": len(self._window),
+            "error_rate": round(self.error_rate(), 4),
+            "p50_seconds": round(p50, 4) if p50 is not None else None,
+            "p95_seconds": round(p95, 4) if p95 is not None else None,
+            "p99_seconds": round(p99, 4) if p99 is not None else None,
+            "latency_histogram": self.histogram()
+        }
+
+
+def _is_valid(response: httpx.Response) -> bool:
+    """A usable answer: 2xx with non-empty message content."""
+    if not response.is_success:
+        return False
+    try:
+        return bool(response.json()["choices"][0]["message"]["content"].strip())
+    except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+        return False
+
+
+def load_routes(config: Optional[str] = LLM_ROUTES) -> List[LLMRoute]:
+    specs = json.loads(config) if config else [{"model": OPENROUTER_MODEL}]
+    # Routes on the same endpoint share one limiter (and circuit breaker)
+    limiters: Dict[str, LLMLimiter] = {OPENROUTER_BASE_URL: llm_limiter}
+    routes = []
+    for spec in specs:
+        base_url = spec.get("base_url", OPENROUTER_BASE_URL)
+        api_key = os.getenv(spec["api_key_env"]) if spec.get("api_key_env") else None
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else None
+        if base_url not in limiters:
+            limiters[base_url] = LLMLimiter()
+        routes.append(LLMRoute(
+            name=spec.get("name", spec["model"]),
+            model=spec["model"],
+            base_url=base_url,
+            headers=headers,
+            weight=float(spec.get("weight", 1)),
+            limiter=limiters[base_url]
+        ))
+    if not routes:
+        raise ValueError("LLM_ROUTES must list at least one route")
+    return routes
+
+
+class LLMRouter:
+    """
+    Picks a route per call and hedges slow ones.
+    - The primary is a weighted random choice among healthy routes (breaker not open, error rate
+      under LLM_ROUTE_MAX_ERROR_RATE); if none are healthy the first route in order is used.
+    - If the primary hasn't answered by its rolling p95, the next healthy route in order is tried
+      as well and the first valid response wins; the loser is cancelled.
+    """
+
+    def __init__(self, routes: List[LLMRoute]):
+        self.routes = routes
+        self._stats = {"requests": 0, "hedges": 0, "hedge_wins": 0, "hedges_skipped_budget": 0}
+
+    @property
+    def cache_model(self) -> str:
+        """
+        Model label for LLM cache keys. Any route may answer a call, so results are keyed on the
+        whole configured route set: changing LLM_ROUTES never serves another model's answers.
+        With a single route this is just its model, so cache entries from before routing still hit.
+        """
+        if len(self.routes) == 1:
+            return self.routes[0].model
+        return "routes:" + ",".join(sorted(f"{r.name}={r.model}@{r.base_url}" for r in self.routes))
+
+    def pick(self, exclude: Tuple[LLMRoute, ...] = ()) -> LLMRoute:
+        candidates = [r for r in self.routes if r not in exclude] or self.routes
+        healthy = [r for r in candidates if r.healthy()]
+        if not healthy:
+            return candidates[0]
+        return random.choices(healthy, weights=[r.weight for r in healthy])[0]
+
+    def _hedge_route(self, primary: LLMRoute) -> Optional[LLMRoute]:
+        return next((r for r in self.routes if r is not primary and r.healthy()), None)
+
+    def _hedge_delay(self, route: LLMRoute, timeout: float) -> Optional[float]:
+        p95 = route.percentile(0.95) if len(route._window) >= LLM_ROUTE_MIN_SAMPLES else None
+        delay = max(LLM_HEDGE_MIN_DELAY_SECONDS, p95 if p95 is not None else LLM_HEDGE_DEFAULT_DELAY_SECONDS)
+        return delay if delay < timeout else None
+
+    async def _attempt(self, route: LLMRoute, body: dict, timeout: float) -> httpx.Response:
+        started = time.monotonic()
+        attributes = {"llm.route": route.name, "llm.model": route.model}
+        with span("llm.request", "llm.request.duration", attributes, kind="client") as current:
+            try:
+                response = await post_chat_completion({**body, "model": route.model}, timeout=timeout, route=route)
+            except asyncio.CancelledError:
+                route._stats["cancelled"] += 1
+                raise
+            except Exception:
+                route.observe(time.monotonic() - started, ok=False)
+                raise
+            current["http.response.status_code"] = response.status_code
+            route.observe(time.monotonic() - started, ok=_is_valid(response))
+            return response
+
+    async def complete(self, body: dict, timeout: float = 60) -> httpx.Response:
+        """
+        Sends the chat completion (its "model" is set per route) and returns the first valid
+        response. When nothing valid comes back, the primary's response or exception is surfaced.
+        """
+        self._stats["requests"] += 1
+        primary = self.pick()
+        first = asyncio.create_task(self._attempt(primary, body, timeout))
+        tasks = {first: primary}
+
+        hedge = self._hedge_route(primary) if LLM_HEDGE_ENABLED else None
+        delay = self._hedge_delay(primary, timeout) if hedge is not None else None
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait({first}, timeout=delay)
+                if not done:
+                    if self._stats["hedges"] < LLM_HEDGE_MAX_RATIO * self._stats["requests"]:
+                        self._stats["hedges"] += 1
+                        tasks[asyncio.create_task(self._attempt(hedge, body, timeout))] = hedge
+                    else:
+                        self._stats["hedges_skipped_budget"] += 1
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and _is_valid(task.result()):
+                        if task is not first:
+                            self._stats["hedge_wins"] += 1
+                            tasks[task]._stats["hedged_wins"] += 1
+                        return task.result()
+            return first.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # retrieved, so losing hedges don't log "never retrieved"
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "hedging_enabled": LLM_HEDGE_ENABLED and len(self.routes) > 1,
+            "routes": [route.stats() for route in self.routes]
+        }
+
+
+llm_router = LLMRouter(load_routes())
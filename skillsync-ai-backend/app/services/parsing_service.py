@@ -0,0 +1,144 @@
+# app/services/parsing_service.py
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from app.services.resume_parser import parse_resume, parse_resume_path
+from app.utils.telemetry import span
+
+# --- Pool settings ---
+PARSER_WORKERS = int(os.getenv("PARSER_WORKERS", os.cpu_count() or 2))
+PARSER_TIMEOUT_SECONDS = float(os.getenv("PARSER_TIMEOUT_SECONDS", 30))
+
+# PDF extraction is CPU-bound, so it runs in worker processes instead of on the event loop.
+# "spawn" keeps the workers free of the parent's event loop and Mongo client threads.
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _build_executor() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=max(1, PARSER_WORKERS),
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def start_parser_pool():
+    global _executor
+    if _executor is None:
+        _executor = _build_executor()
+
+
+def close_parser_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _recycle_executor(executor: ProcessPoolExecutor):
+    """
+    Drops `executor` (if it is still the current pool) and kills its workers, so a document stuck
+    in MuPDF doesn't keep a worker busy forever. The next call builds a fresh pool.
+    """
+    global _executor
+    if _executor is not executor:
+        return
+    _executor = None
+    # ProcessPoolExecutor has no public terminate (before 3.14); the other jobs on it fail with
+    # BrokenProcessPool and are retried on the new pool by _run_parser
+    # (cancel_futures would cancel their asyncio waiters instead)
+    processes = list((getattr(executor, "_processes", None) or {}).values())
+    executor.shutdown(wait=False)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = _build_executor()
+    return _executor
+
+
+def _failed(message: str) -> dict:
+    return {"parsed_text": "", "word_count": 0, "error": message}
+
+
+async def parse_document(
+    file_bytes: bytes,
+    filename: str = "",
+    timeout: float = PARSER_TIMEOUT_SECONDS,
+    max_pages: Optional[int] = None,
+    max_chars: Optional[int] = None
+) -> dict:
+    """
+    Parses a document in the process pool and returns the same dict as `parse_resume`.
+    A document that exceeds `timeout` seconds is reported as an error and the pool is recycled,
+    so the worker stuck on it is killed instead of staying busy.
+    """
+    return await _run_parser(parse_resume, file_bytes, len(file_bytes), filename, timeout, max_pages, max_chars)
+
+
+async def parse_document_path(
+    path: str,
+    filename: str = "",
+    timeout: float = PARSER_TIMEOUT_SECONDS,
+    max_pages: Optional[int] = None,
+    max_chars: Optional[int] = None
+) -> dict:
+    """parse_document for a file on disk: only the path crosses to the worker, which mmaps it."""
+    return await _run_parser(parse_resume_path, path, os.path.getsize(path), filename, timeout, max_pages, max_chars)
+
+
+async def parse_upload(upload, **kwargs) -> dict:
+    """Parses a ReceivedUpload (app/utils/uploads.py) from memory or from its spool file."""
+    if upload.path is not None:
+        return await parse_document_path(upload.path, upload.filename, **kwargs)
+    return await parse_document(upload.content, upload.filename, **kwargs)
+
+
+async def _run_parser(fn, source, size: int, filename: str, timeout: float, max_pages, max_chars) -> dict:
+    loop = asyncio.get_running_loop()
+    # The span covers the round trip to the worker; the worker's own timings are attached to it
+    with span(
+        "parse_document",
+        "parser.duration",
+        {"parser.bytes": size},
+        labels=("parser.format", "parser.backend", "parser.error")
+    ) as attributes:
+        for attempt in range(2):
+            executor = _get_executor()
+            try:
+                result = await asyncio.wait_for(
+                    loop.run_in_executor(executor, fn, source, filename, max_pages, max_chars),
+                    timeout=timeout
+                )
+                break
+            except asyncio.TimeoutError:
+                print(f"❌ Parsing {filename} timed out after {timeout}s, recycling the parser pool")
+                _recycle_executor(executor)
+                attributes["parser.error"] = "timeout"
+                return _failed(f"Parsing timed out after {timeout}s")
+            except BrokenProcessPool as e:
+                if executor is not _executor and attempt == 0:
+                    # The pool was recycled under us (another document timed out); run again on the new one
+                    continue
+                # A worker died (e.g. crashed inside MuPDF); replace the pool so later requests still work
+                print("❌ Parser pool broken, restarting:", str(e))
+                _recycle_executor(executor)
+                attributes["parser.error"] = "crashed"
+                return _failed("Parser worker crashed")
+
+        attributes.update({
+            "parser.format": result.get("format") or "unknown",
+            "parser.backend": result.get("backend") or "none",
+            "parser.pages": result.get("page_count", 0)
+        })
+        for stage, seconds in (result.get("timings") or {}).items():
+            attributes[f"parser.{stage}_seconds"] = round(seconds, 6)
+        return result
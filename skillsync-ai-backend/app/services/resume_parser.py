@@ -1,43 +1,250 @@
+import io
+import mmap
+import os
+import time
+import zipfile
+from typing import Iterator, Optional
+from xml.etree import ElementTree
+
 import fitz  # PyMuPDF
 import pdfplumber
-import io
 
-def parse_resume(file_bytes: bytes, filename: str = ""):
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+DOCX_MAIN_PART = "word/document.xml"
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+SUPPORTED_CONTENT_TYPES = [
+    "application/pdf",
+    "text/plain",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+]
+
+
+def detect_format(file_bytes: bytes, filename: str = "") -> str:
+    """
+    Detects 'pdf', 'docx' or 'txt' from the leading bytes; the filename is only a tie-breaker.
+    Returns 'unknown' for anything else.
+    """
+    head = bytes(file_bytes[:1024])
+    # The PDF spec allows junk before the header, so look for it anywhere in the first KB
+    if PDF_MAGIC in head:
+        return "pdf"
+    if head.startswith(ZIP_MAGIC):
+        try:
+            with zipfile.ZipFile(io.BytesIO(file_bytes)) as archive:
+                if DOCX_MAIN_PART in archive.namelist():
+                    return "docx"
+        except zipfile.BadZipFile:
+            pass
+        return "unknown"
+    if b"\x00" not in head or head.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return "txt"
+    if filename.lower().endswith(".txt"):
+        return "txt"
+    return "unknown"
+
+
+def sniff_format(head: bytes, filename: str = "", content_type: str = "") -> str:
     """
-    Tries to parse PDF using PyMuPDF first, then pdfplumber if needed.
-    If it's a .txt file, decodes as utf-8.
-    Returns {'parsed_text': ..., 'word_count': ...}
+    Format guess from the first chunk of an upload, before the rest has arrived: 'pdf', 'docx',
+    'txt' or 'unknown'. A ZIP header counts as DOCX here (the parser checks the archive later);
+    text is only accepted when declared as such, since most bytes "look like" text.
     """
-    text = ""
+    if PDF_MAGIC in head[:1024]:
+        return "pdf"
+    if head.startswith(ZIP_MAGIC):
+        return "docx"
+    declared_text = content_type == "text/plain" or filename.lower().endswith(".txt")
+    if declared_text and (b"\x00" not in head[:1024] or head.startswith((b"\xff\xfe", b"\xfe\xff"))):
+        return "txt"
+    return "unknown"
+
+
+# --- Page generators (one string per page) ---
+# They take bytes or a memoryview (of an mmapped upload, see parse_resume_path)
+
+def _iter_pdf_pymupdf(file_bytes: bytes, timings: dict) -> Iterator[str]:
+    started = time.perf_counter()
+    doc = fitz.open(stream=file_bytes, filetype="pdf")
+    timings["open"] = time.perf_counter() - started
     try:
-        if filename.lower().endswith('.pdf'):
-            try:
-                # First try PyMuPDF
-                doc = fitz.open(stream=file_bytes, filetype="pdf")
-                for page in doc:
-                    text += page.get_text()
-            except Exception as e:
-                print("PyMuPDF failed, trying pdfplumber:", e)
-                # Try pdfplumber as fallback
-                try:
-                    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-                        for page in pdf.pages:
-                            page_text = page.extract_text()
-                            if page_text:
-                                text += page_text + "\n"
-                except Exception as e2:
-                    print("Both parsers failed:", e2)
-        elif filename.lower().endswith('.txt'):
+        for page in doc:
+            yield page.get_text()
+    finally:
+        doc.close()
+
+
+def _iter_pdf_pdfplumber(file_bytes: bytes, timings: dict) -> Iterator[str]:
+    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            yield page_text + "\n" if page_text else ""
+
+
+def _iter_txt(file_bytes: bytes, timings: dict) -> Iterator[str]:
+    started = time.perf_counter()
+    file_bytes = bytes(file_bytes)
+    if file_bytes.startswith((b"\xff\xfe", b"\xfe\xff")):
+        text = file_bytes.decode("utf-16")
+    else:
+        try:
+            text = file_bytes.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            # Windows-exported resumes are often cp1252; latin-1 never fails as a last resort
             try:
-                text = file_bytes.decode('utf-8')
-            except Exception as e:
-                print("TXT file decode failed:", e)
-        else:
-            print("Unsupported file type for:", filename)
+                text = file_bytes.decode("cp1252")
+            except UnicodeDecodeError:
+                text = file_bytes.decode("latin-1")
+    timings["open"] = time.perf_counter() - started
+    yield text
+
+
+def _iter_docx(file_bytes: bytes, timings: dict) -> Iterator[str]:
+    started = time.perf_counter()
+    archive = zipfile.ZipFile(io.BytesIO(file_bytes))
+    timings["open"] = time.perf_counter() - started
+    with archive, archive.open(DOCX_MAIN_PART) as xml:
+        # Stream the XML; explicit page breaks delimit "pages"
+        paragraphs = []
+        current = []
+        for event, elem in ElementTree.iterparse(xml, events=("end",)):
+            if elem.tag == _W + "t" and elem.text:
+                current.append(elem.text)
+            elif elem.tag == _W + "tab":
+                current.append("\t")
+            elif elem.tag == _W + "br" and elem.get(_W + "type") == "page":
+                paragraphs.append("".join(current))
+                current = []
+                yield "\n".join(paragraphs) + "\n"
+                paragraphs = []
+            elif elem.tag == _W + "p":
+                paragraphs.append("".join(current))
+                current = []
+                elem.clear()
+        if current:
+            paragraphs.append("".join(current))
+        if paragraphs:
+            yield "\n".join(paragraphs) + "\n"
+
+
+_PAGE_ITERATORS = {
+    "pdf": _iter_pdf_pymupdf,
+    "txt": _iter_txt,
+    "docx": _iter_docx
+}
+
+
+def iter_pages(file_bytes: bytes, filename: str = "", timings: Optional[dict] = None) -> Iterator[str]:
+    """Streams the text of a PDF, TXT or DOCX document page by page, without the fallback parser."""
+    fmt = detect_format(file_bytes, filename)
+    if fmt not in _PAGE_ITERATORS:
+        raise ValueError(f"Unsupported file type for: {filename}")
+    return _PAGE_ITERATORS[fmt](file_bytes, timings if timings is not None else {})
+
+
+def _collect(pages: Iterator[str], max_pages: Optional[int], max_chars: Optional[int]):
+    """Joins pages in linear time, stopping early at `max_pages` / `max_chars`."""
+    parts = []
+    total_chars = 0
+    page_count = 0
+    truncated = False
+    for page_text in pages:
+        if max_pages is not None and page_count >= max_pages:
+            truncated = True
+            break
+        parts.append(page_text)
+        page_count += 1
+        total_chars += len(page_text)
+        if max_chars is not None and total_chars >= max_chars:
+            truncated = total_chars > max_chars
+            break
+    pages.close()
+    text = "".join(parts)
+    if max_chars is not None:
+        text = text[:max_chars]
+    return text, page_count, truncated
+
+
+def parse_resume(
+    file_bytes: bytes,
+    filename: str = "",
+    max_pages: Optional[int] = None,
+    max_chars: Optional[int] = None
+):
+    """
+    Extracts text from PDF (PyMuPDF, falling back to pdfplumber), TXT or DOCX.
+    The format is detected from magic bytes. Extraction stops after `max_pages` pages or
+    `max_chars` characters when given.
+    Returns {'parsed_text', 'word_count', 'format', 'page_count', 'truncated', 'backend', 'timings'},
+    plus 'error' when nothing could be extracted.
+    """
+    timings = {"open": 0.0, "extract": 0.0, "fallback": 0.0}
+    result = {
+        "parsed_text": "",
+        "word_count": 0,
+        "format": detect_format(file_bytes, filename),
+        "page_count": 0,
+        "truncated": False,
+        "backend": None,
+        "timings": timings
+    }
+    fmt = result["format"]
+    if fmt not in _PAGE_ITERATORS:
+        print("Unsupported file type for:", filename)
+        result["error"] = f"Unsupported file type for: {filename}"
+        return result
+
+    started = time.perf_counter()
+    try:
+        text, page_count, truncated = _collect(_PAGE_ITERATORS[fmt](file_bytes, timings), max_pages, max_chars)
+        result["backend"] = "pymupdf" if fmt == "pdf" else fmt
     except Exception as e:
-        print("Parse error:", e)
-    word_count = len(text.split())
-    return {
+        if fmt != "pdf":
+            print(f"{fmt.upper()} extraction failed:", e)
+            result["error"] = str(e)
+            timings["extract"] = time.perf_counter() - started - timings["open"]
+            return result
+        print("PyMuPDF failed, trying pdfplumber:", e)
+        timings["extract"] = time.perf_counter() - started - timings["open"]
+        fallback_started = time.perf_counter()
+        try:
+            text, page_count, truncated = _collect(_iter_pdf_pdfplumber(file_bytes, timings), max_pages, max_chars)
+            result["backend"] = "pdfplumber"
+        except Exception as e2:
+            print("Both parsers failed:", e2)
+            result["error"] = str(e2)
+            return result
+        finally:
+            timings["fallback"] = time.perf_counter() - fallback_started
+    else:
+        timings["extract"] = time.perf_counter() - started - timings["open"]
+
+    result.update({
         "parsed_text": text,
-        "word_count": word_count
-    }
+        "word_count": len(text.split()),
+        "page_count": page_count,
+        "truncated": truncated
+    })
+    return result
+
+
+def parse_resume_path(
+    path: str,
+    filename: str = "",
+    max_pages: Optional[int] = None,
+    max_chars: Optional[int] = None
+):
+    """
+    parse_resume for an upload spooled to disk: the file is memory-mapped, so only the pages
+    PyMuPDF actually reads are loaded, and nothing is copied into the worker's heap up front.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return parse_resume(b"", filename, max_pages, max_chars)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                return parse_resume(view, filename, max_pages, max_chars)
+            finally:
+                view.release()
@@ -0,0 +1,226 @@
+# app/services/scrape_cache.py
+
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from cachetools import TTLCache
+from dotenv import load_dotenv
+
+from app.db.database import db
+from app.utils.singleflight import SingleFlight
+
+load_dotenv()
+
+# --- Cache settings ---
+SCRAPE_CACHE_ENABLED = os.getenv("SCRAPE_CACHE_ENABLED", "true").lower() == "true"
+# Served without contacting the site for this long after the last fetch / revalidation
+SCRAPE_CACHE_TTL_SECONDS = int(os.getenv("SCRAPE_CACHE_TTL_SECONDS", 6 * 3600))
+# Rows are evicted (Mongo TTL index) this long after the last successful fetch / revalidation
+SCRAPE_CACHE_MAX_AGE_SECONDS = int(os.getenv("SCRAPE_CACHE_MAX_AGE_SECONDS", 7 * 24 * 3600))
+SCRAPE_CACHE_MAX_ENTRIES = int(os.getenv("SCRAPE_CACHE_MAX_ENTRIES", 2048))
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    "trk", "trkinfo", "trackingid", "refid", "lipi", "originalsubdomain", "position", "pagenum",
+    "from", "tk", "advn", "adid", "sjdu", "acatk", "pub", "xkcb", "xpse", "xfps",
+    "gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "ref", "src", "source", "ebp", "ved", "sa"
+}
+_LINKEDIN_JOB_PATH = re.compile(r"/jobs/view/(?:[^/]*-)?(\d+)/?")
+
+
+@dataclass
+class CanonicalURL:
+    key: str        # cache key: "<source>:<job id>", or the normalized URL when no id is known
+    url: str        # URL to fetch, tracking parameters removed
+    source: str
+
+
+@dataclass
+class ScrapeResult:
+    text: str = ""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    not_modified: bool = False
+
+
+def _host(netloc: str) -> str:
+    host = netloc.lower().split("@")[-1].split(":")[0]
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    return host
+
+
+def canonicalize_url(url: str) -> CanonicalURL:
+    """
+    Normalizes a job URL so every variant of one posting maps to the same cache key:
+    tracking parameters and fragments are dropped, and LinkedIn / Indeed / Google Jobs job ids
+    are resolved from any of their URL shapes (search pages with currentJobId/vjk, /rc/clk, ...).
+    """
+    parts = urlsplit(url.strip())
+    host = _host(parts.netloc)
+    params = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=False)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith("utm_")
+    ]
+    query = dict(params)
+
+    if host.endswith("linkedin.com"):
+        match = _LINKEDIN_JOB_PATH.search(parts.path)
+        job_id = match.group(1) if match else query.get("currentJobId")
+        if job_id:
+            return CanonicalURL(f"linkedin:{job_id}", f"https://www.linkedin.com/jobs/view/{job_id}/", "linkedin")
+    elif "indeed." in host:
+        job_id = query.get("jk") or query.get("vjk")
+        if job_id:
+            site = "www." + host if host.count(".") == 1 else host  # keep country subdomains (uk.indeed.com)
+            return CanonicalURL(f"indeed:{job_id}", f"https://{site}/viewjob?jk={job_id}", "indeed")
+    elif host.startswith("google.") and "htidocid" in parts.fragment:
+        # Google Jobs keeps the posting id in the fragment; the fetch URL must keep it too
+        doc_id = dict(parse_qsl(parts.fragment)).get("htidocid")
+        if doc_id:
+            fetch = urlunsplit((parts.scheme.lower() or "https", parts.netloc.lower(), parts.path, urlencode(params), parts.fragment))
+            return CanonicalURL(f"google_jobs:{doc_id}", fetch, "google_jobs")
+
+    path = parts.path.rstrip("/") or "/"
+    normalized = urlunsplit((parts.scheme.lower() or "https", parts.netloc.lower(), path, urlencode(sorted(params)), ""))
+    return CanonicalURL(normalized, normalized, host)
+
+
+def conditional_headers(entry: Optional[dict]) -> Dict[str, str]:
+    """If-None-Match / If-Modified-Since for revalidating a cached entry."""
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+Fetcher = Callable[[str, Optional[dict]], Awaitable[ScrapeResult]]
+
+
+class ScrapeCache:
+    """
+    Two-tier cache for extracted JD text: an in-process LRU in front of the `scraped_jds`
+    Mongo collection (TTL index on `expires_at`).
+    - Fresh entries (younger than SCRAPE_CACHE_TTL_SECONDS) are served without a request.
+    - Stale entries are revalidated with a conditional GET; a 304 just extends them.
+    - If revalidation fails, the stale text is served rather than nothing.
+    - Concurrent requests for the same posting share one fetch.
+    """
+
+    def __init__(self):
+        self._memory = TTLCache(maxsize=SCRAPE_CACHE_MAX_ENTRIES, ttl=SCRAPE_CACHE_MAX_AGE_SECONDS)
+        self._flights = SingleFlight()
+        self._stats = {
+            "memory_hits": 0,
+            "mongo_hits": 0,
+            "misses": 0,
+            "revalidated": 0,
+            "refreshed": 0,
+            "stale_served": 0,
+            "stores": 0,
+            "mongo_errors": 0
+        }
+
+    async def _load(self, key: str) -> Optional[dict]:
+        if key in self._memory:
+            return self._memory[key]
+        try:
+            entry = await db.scraped_jds.find_one({"_id": key, "expires_at": {"$gt": datetime.utcnow()}})
+        except Exception as e:
+            self._stats["mongo_errors"] += 1
+            print("❌ Scrape cache read failed:", str(e))
+            return None
+        if entry is not None:
+            self._memory[key] = entry
+        return entry
+
+    async def _save(self, entry: dict):
+        self._memory[entry["_id"]] = entry
+        try:
+            await db.scraped_jds.replace_one({"_id": entry["_id"]}, entry, upsert=True)
+        except Exception as e:
+            self._stats["mongo_errors"] += 1
+            print("❌ Scrape cache write failed:", str(e))
+
+    @staticmethod
+    def _is_fresh(entry: dict) -> bool:
+        return entry["validated_at"] > datetime.utcnow() - timedelta(seconds=SCRAPE_CACHE_TTL_SECONDS)
+
+    async def _resolve(self, canonical: CanonicalURL, fetch: Fetcher) -> str:
+        from_memory = canonical.key in self._memory
+        entry = await self._load(canonical.key)
+        if entry is not None and self._is_fresh(entry):
+            self._stats["memory_hits" if from_memory else "mongo_hits"] += 1
+            return entry["text"]
+
+        try:
+            result = await fetch(canonical.url, entry)
+        except Exception as e:
+            if entry is None:
+                raise
+            self._stats["stale_served"] += 1
+            print(f"❌ Revalidating {canonical.url} failed, serving cached copy:", str(e))
+            return entry["text"]
+
+        now = datetime.utcnow()
+        if result.not_modified and entry is not None:
+            self._stats["revalidated"] += 1
+            entry.update(validated_at=now, expires_at=now + timedelta(seconds=SCRAPE_CACHE_MAX_AGE_SECONDS))
+            await self._save(entry)
+            return entry["text"]
+
+        if not result.text:
+            # Nothing extracted (blocked, layout change): don't overwrite a good copy with it
+            if entry is not None:
+                self._stats["stale_served"] += 1
+                return entry["text"]
+            self._stats["misses"] += 1
+            return ""
+
+        self._stats["refreshed" if entry is not None else "misses"] += 1
+        self._stats["stores"] += 1
+        await self._save({
+            "_id": canonical.key,
+            "url": canonical.url,
+            "source": canonical.source,
+            "text": result.text,
+            "etag": result.etag,
+            "last_modified": result.last_modified,
+            "fetched_at": now,
+            "validated_at": now,
+            "expires_at": now + timedelta(seconds=SCRAPE_CACHE_MAX_AGE_SECONDS)
+        })
+        return result.text
+
+    async def get_or_fetch(self, url: str, fetch: Fetcher) -> str:
+        """
+        Extracted JD text for `url`. `fetch(canonical_url, cached_entry)` does the actual scrape;
+        it should send `conditional_headers(cached_entry)` and report a 304 as not_modified.
+        """
+        canonical = canonicalize_url(url)
+        if not SCRAPE_CACHE_ENABLED:
+            return (await fetch(canonical.url, None)).text
+        return await self._flights.do(canonical.key, lambda: self._resolve(canonical, fetch))
+
+    def stats(self) -> dict:
+        hits = self._stats["memory_hits"] + self._stats["mongo_hits"] + self._stats["revalidated"]
+        lookups = hits + self._stats["misses"] + self._stats["refreshed"]
+        return {
+            **self._stats,
+            "enabled": SCRAPE_CACHE_ENABLED,
+            "memory_entries": len(self._memory),
+            "coalesced": self._flights.coalesced,
+            "in_flight": self._flights.in_flight(),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+        }
+
+
+scrape_cache = ScrapeCache()
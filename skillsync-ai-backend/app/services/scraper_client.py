@@ -0,0 +1,128 @@
+# app/services/scraper_client.py
+
+import os
+from typing import Dict, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+from app.services.scrape_cache import ScrapeResult
+from app.utils.html_extract import LXML_AVAILABLE, StreamingExtractor, extract_text, resolve_backend
+
+load_dotenv()
+
+# HTTP/2 needs the optional `h2` package; fall back to HTTP/1.1 keep-alive without it
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# --- Connection pool settings ---
+SCRAPER_POOL_MAX_CONNECTIONS = int(os.getenv("SCRAPER_POOL_MAX_CONNECTIONS", 20))
+SCRAPER_POOL_MAX_KEEPALIVE = int(os.getenv("SCRAPER_POOL_MAX_KEEPALIVE", 10))
+SCRAPER_TIMEOUT_SECONDS = float(os.getenv("SCRAPER_TIMEOUT_SECONDS", 10))
+# Stop downloading/parsing once the description element is closed (needs lxml)
+SCRAPER_STREAMING_PARSE = os.getenv("SCRAPER_STREAMING_PARSE", "true").lower() == "true"
+SCRAPER_USER_AGENT = os.getenv(
+    "SCRAPER_USER_AGENT",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+
+# One client for the whole app lifetime, created in the startup hook
+_client: Optional[httpx.AsyncClient] = None
+
+_stats = {
+    "requests": 0,
+    "not_modified": 0,
+    "streamed": 0,
+    "early_stops": 0,
+    "stream_fallbacks": 0,
+    "bytes_read": 0
+}
+
+
+def _build_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        headers={"User-Agent": SCRAPER_USER_AGENT, "Accept": "text/html,application/xhtml+xml"},
+        http2=HTTP2_AVAILABLE,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=SCRAPER_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=SCRAPER_POOL_MAX_KEEPALIVE
+        ),
+        timeout=httpx.Timeout(SCRAPER_TIMEOUT_SECONDS)
+    )
+
+
+async def start_scraper_client():
+    global _client
+    if _client is None:
+        _client = _build_client()
+
+
+async def close_scraper_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_scraper_client() -> httpx.AsyncClient:
+    # Created lazily as well, so scripts that never run the app startup hook still work
+    global _client
+    if _client is None:
+        _client = _build_client()
+    return _client
+
+
+async def fetch_job_page(url: str, site: str, headers: Optional[Dict[str, str]] = None) -> ScrapeResult:
+    """
+    GETs a job page on the shared client and extracts the site's description element.
+    With SCRAPER_STREAMING_PARSE the body is parsed as it arrives and the download stops once the
+    element is closed (over HTTP/2 that only resets the stream; over HTTP/1.1 the connection is
+    dropped instead of returned to the pool). Pages where the element isn't found while streaming
+    are re-parsed in full with the site's fallback selectors.
+    """
+    _stats["requests"] += 1
+    async with get_scraper_client().stream("GET", url, headers=headers or {}) as response:
+        if response.status_code == 304:
+            _stats["not_modified"] += 1
+            return ScrapeResult(not_modified=True)
+        # Error pages (404, 429, block pages) are failures, not pages without a description
+        response.raise_for_status()
+
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+
+        if SCRAPER_STREAMING_PARSE and LXML_AVAILABLE:
+            _stats["streamed"] += 1
+            extractor = StreamingExtractor(site)
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if extractor.feed(chunk) is not None:
+                    _stats["early_stops"] += 1
+                    break
+            else:
+                extractor.close()
+            _stats["bytes_read"] += len(body)
+            if extractor.matched:
+                return ScrapeResult(extractor.result or "", etag, last_modified)
+            _stats["stream_fallbacks"] += 1
+            html = body.decode(response.encoding or "utf-8", errors="replace")
+        else:
+            await response.aread()
+            _stats["bytes_read"] += len(response.content)
+            html = response.text
+
+    return ScrapeResult(extract_text(html, site), etag, last_modified)
+
+
+def get_scraper_client_stats() -> dict:
+    return {
+        **_stats,
+        "parser": resolve_backend(),
+        "streaming": SCRAPER_STREAMING_PARSE and LXML_AVAILABLE,
+        "http2": HTTP2_AVAILABLE
+    }
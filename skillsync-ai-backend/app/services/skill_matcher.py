@@ -0,0 +1,199 @@
+# app/services/skill_matcher.py
+
+import json
+import os
+import re
+from collections import deque
+from typing import Dict, List, Optional
+
+# Skill taxonomy: canonical name -> aliases, plus surface forms that only count with exact case
+# ("Go", "React", "Excel", ... are also ordinary English words) and single letters ("C", "R")
+# that only count next to another skill or a context word ("C language", "Python, R")
+SKILL_TAXONOMY_PATH = os.getenv(
+    "SKILL_TAXONOMY_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "skill_taxonomy.json")
+)
+
+# How many tokens on each side of a single-letter skill are searched for its context
+_CONTEXT_WINDOW = 2
+
+# Tokens keep the characters that matter inside skill names (c++, c#, node.js, .net);
+# separators like "/" and "-" split tokens on both the text and the alias side.
+_TOKEN = re.compile(r"\.?[A-Za-z0-9](?:[A-Za-z0-9+#.]*[A-Za-z0-9+#])?")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text or "")
+
+
+class TokenAutomaton:
+    """
+    Aho-Corasick automaton over word tokens. Finds every pattern (a token sequence)
+    in a single left-to-right pass, so cost is linear in the number of tokens.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+
+    def add(self, tokens: List[str], value: str):
+        node = 0
+        for token in tokens:
+            nxt = self._goto[node].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][token] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        if value not in self._out[node]:
+            self._out[node].append(value)
+
+    def build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(token, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def search(self, tokens: List[str]) -> List[str]:
+        found = []
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for token in tokens:
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            if out[node]:
+                found.extend(out[node])
+        return found
+
+
+class SkillMatcher:
+    """Extracts canonical skill names from free text using the skill taxonomy."""
+
+    def __init__(self, taxonomy: dict):
+        self._insensitive = TokenAutomaton()
+        self._sensitive = TokenAutomaton()
+        self.skills = list(taxonomy.get("skills", {}))
+
+        case_sensitive = taxonomy.get("case_sensitive", {})
+        for canonical, forms in case_sensitive.items():
+            for form in forms:
+                self._sensitive.add(tokenize(form), canonical)
+
+        # Single-token, exact-case forms that need a neighbouring skill or context word
+        needs_context = taxonomy.get("needs_context", {})
+        self._contextual = {form: canonical for canonical, forms in needs_context.items() for form in forms}
+        self._context_words = {word.lower() for word in taxonomy.get("context_words", [])}
+
+        for canonical, aliases in taxonomy.get("skills", {}).items():
+            exact_forms = {f.lower() for f in case_sensitive.get(canonical, []) + needs_context.get(canonical, [])}
+            surface_forms = [canonical] if canonical.lower() not in exact_forms else []
+            for form in surface_forms + aliases:
+                tokens = [t.lower() for t in tokenize(form)]
+                if tokens:
+                    self._insensitive.add(tokens, canonical)
+
+        self._insensitive.build()
+        self._sensitive.build()
+
+    def extract(self, text: str) -> List[str]:
+        """Returns the canonical skills mentioned in `text`, in order of first mention."""
+        tokens = tokenize(text)
+        hits = self._insensitive.search([t.lower() for t in tokens]) + self._sensitive.search(tokens)
+        if self._contextual:
+            hits += self._contextual_hits(tokens)
+        # dict preserves first-seen order while de-duplicating
+        return list(dict.fromkeys(hits))
+
+    def _contextual_hits(self, tokens: List[str]) -> List[str]:
+        # "Section C" or "option R" is not a skill; "C/C++", "Python, R" and "C language" are
+        found = []
+        for i, token in enumerate(tokens):
+            canonical = self._contextual.get(token)
+            if canonical is None:
+                continue
+            window = tokens[max(0, i - _CONTEXT_WINDOW):i] + tokens[i + 1:i + 1 + _CONTEXT_WINDOW]
+            if any(self._is_context(neighbour) for neighbour in window):
+                found.append(canonical)
+        return found
+
+    def _is_context(self, token: str) -> bool:
+        if token.lower() in self._context_words:
+            return True
+        return bool(self._insensitive.search([token.lower()]) or self._sensitive.search([token]))
+
+
+_matcher: Optional[SkillMatcher] = None
+
+
+def get_skill_matcher() -> SkillMatcher:
+    global _matcher
+    if _matcher is None:
+        with open(SKILL_TAXONOMY_PATH, encoding="utf-8") as f:
+            _matcher = SkillMatcher(json.load(f))
+    return _matcher
+
+
+def extract_skills(text: str) -> List[str]:
+    return get_skill_matcher().extract(text)
+
+
+def skill_key(skill: str) -> str:
+    """The lowercase, whitespace-collapsed form a skill is stored and queried under."""
+    return " ".join(skill.lower().split())
+
+
+def normalize_skills(skills: List[str]) -> List[str]:
+    """
+    Lowercase, de-duplicated skill keys for storage and querying. Each entry is kept as
+    written (lowercased) and also mapped to its canonical taxonomy name, so "K8s" and
+    "Kubernetes (EKS)" both index as "kubernetes".
+    """
+    normalized = []
+    for skill in skills or []:
+        key = skill_key(skill)
+        if key:
+            normalized.append(key)
+        normalized.extend(canonical.lower() for canonical in extract_skills(skill))
+    return list(dict.fromkeys(normalized))
+
+
+def _verdict(fit_percentage: int, jd_skill_count: int) -> str:
+    if not jd_skill_count:
+        return "No recognizable skills found in the job description."
+    if fit_percentage >= 75:
+        return "Strong skill overlap with the job description."
+    if fit_percentage >= 50:
+        return "Partial skill overlap with the job description."
+    return "Low skill overlap with the job description."
+
+
+def score_skill_overlap(resume_text: str, jd_text: str, jd_skills: Optional[List[str]] = None) -> dict:
+    """
+    Deterministic, LLM-free match: the share of JD skills found in the resume.
+    Pass pre-extracted `jd_skills` when scoring many resumes against one JD.
+    Returns the same fields as JDMatchResult.
+    """
+    resume_skills = set(extract_skills(resume_text))
+    if jd_skills is None:
+        jd_skills = extract_skills(jd_text)
+    matching = [s for s in jd_skills if s in resume_skills]
+    missing = [s for s in jd_skills if s not in resume_skills]
+    fit_percentage = round(100 * len(matching) / len(jd_skills)) if jd_skills else 0
+    return {
+        "fit_percentage": fit_percentage,
+        "matching_skills": matching,
+        "missing_skills": missing,
+        "strengths": [],
+        "weaknesses": [],
+        "verdict": _verdict(fit_percentage, len(jd_skills))
+    }
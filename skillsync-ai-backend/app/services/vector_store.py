@@ -0,0 +1,217 @@
+# app/services/vector_store.py
+
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from cachetools import LRUCache
+from dotenv import load_dotenv
+
+from app.utils.text_utils import content_hash
+
+load_dotenv()
+
+# --- Embedding model settings ---
+# Directory holding an ONNX sentence-embedding export, e.g. all-MiniLM-L6-v2:
+#   model.onnx + tokenizer.json
+EMBEDDING_MODEL_DIR = os.getenv("EMBEDDING_MODEL_DIR")
+# Long texts are split into windows of EMBEDDING_MAX_TOKENS (the length the model was trained on;
+# MiniLM accepts up to 512 but quality drops past 256) and the window vectors are averaged.
+# EMBEDDING_MAX_CHUNKS caps the windows per text: 8 x 256 tokens covers a ~4-page resume, and
+# embedding cost grows linearly with it.
+EMBEDDING_MAX_TOKENS = int(os.getenv("EMBEDDING_MAX_TOKENS", 256))
+EMBEDDING_CHUNK_OVERLAP = int(os.getenv("EMBEDDING_CHUNK_OVERLAP", 32))
+EMBEDDING_MAX_CHUNKS = int(os.getenv("EMBEDDING_MAX_CHUNKS", 8))
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 32))
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", 0))  # 0 = let onnxruntime decide
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", 4096))
+
+# Optional ChromaDB directory; without it embeddings are only kept in memory
+VECTOR_STORE_PATH = os.getenv("VECTOR_STORE_PATH")
+
+
+class OnnxEmbedder:
+    """
+    Mean-pooled, L2-normalized sentence embeddings from a local ONNX model on CPU. Texts longer
+    than one window are embedded chunk by chunk and their chunk vectors averaged (weighted by
+    token count), so a resume is represented by more than its header.
+    """
+
+    def __init__(self, model_dir: str):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        # Truncation with a stride keeps the rest of the text as overlapping `overflowing` windows
+        self.tokenizer.enable_truncation(
+            max_length=EMBEDDING_MAX_TOKENS,
+            stride=min(EMBEDDING_CHUNK_OVERLAP, EMBEDDING_MAX_TOKENS // 2)
+        )
+        self.tokenizer.no_padding()
+
+        options = ort.SessionOptions()
+        if EMBEDDING_THREADS:
+            options.intra_op_num_threads = EMBEDDING_THREADS
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, "model.onnx"),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def _chunks(self, texts: List[str]) -> Tuple[list, List[int]]:
+        """All windows of all texts, plus the index of the text each window belongs to."""
+        windows, owners = [], []
+        for i, encoding in enumerate(self.tokenizer.encode_batch(texts)):
+            for window in [encoding, *encoding.overflowing][:max(1, EMBEDDING_MAX_CHUNKS)]:
+                windows.append(window)
+                owners.append(i)
+        return windows, owners
+
+    def _run(self, windows: list) -> Tuple[np.ndarray, np.ndarray]:
+        """Mean-pooled vectors of one batch of windows, and each window's token count."""
+        length = max(len(w.ids) for w in windows)
+        input_ids = np.zeros((len(windows), length), dtype=np.int64)
+        attention_mask = np.zeros((len(windows), length), dtype=np.int64)
+        token_type_ids = np.zeros((len(windows), length), dtype=np.int64)
+        for row, window in enumerate(windows):
+            size = len(window.ids)
+            input_ids[row, :size] = window.ids
+            attention_mask[row, :size] = window.attention_mask
+            token_type_ids[row, :size] = window.type_ids
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask, "token_type_ids": token_type_ids}
+
+        hidden = self.session.run(None, {k: v for k, v in feeds.items() if k in self.input_names})[0]
+        mask = attention_mask[..., None].astype(np.float32)
+        tokens = mask.sum(axis=1)
+        return (hidden * mask).sum(axis=1) / np.clip(tokens, 1e-9, None), tokens[:, 0]
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        windows, owners = self._chunks(texts)
+        pooled, weights = [], []
+        for start in range(0, len(windows), EMBEDDING_BATCH_SIZE):
+            vectors, tokens = self._run(windows[start:start + EMBEDDING_BATCH_SIZE])
+            pooled.append(vectors)
+            weights.append(tokens)
+        pooled = np.vstack(pooled).astype(np.float32)
+        weights = np.concatenate(weights).astype(np.float32)
+
+        # Token-weighted average of each text's window vectors
+        vectors = np.zeros((len(texts), pooled.shape[1]), dtype=np.float32)
+        np.add.at(vectors, np.array(owners), pooled * weights[:, None])
+        totals = np.zeros(len(texts), dtype=np.float32)
+        np.add.at(totals, np.array(owners), weights)
+        vectors /= np.clip(totals[:, None], 1e-9, None)
+        return vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+
+
+class VectorStore:
+    """
+    Resume and JD embeddings keyed by content hash, with cosine-similarity ranking.
+    Embeddings are memoized in an LRU; when VECTOR_STORE_PATH is set they are also
+    upserted into ChromaDB collections ("resumes", "jds"), otherwise `query()` searches
+    the most recent EMBEDDING_CACHE_SIZE upserts of each kind kept in memory.
+    """
+
+    def __init__(self, embedder: OnnxEmbedder, persist_path: Optional[str] = None):
+        self.embedder = embedder
+        self._cache = LRUCache(maxsize=EMBEDDING_CACHE_SIZE)
+        self._lock = threading.Lock()
+        # Bounded like the embedding cache, so a long-running process doesn't keep every upsert
+        self._memory: Dict[str, LRUCache] = {
+            "resume": LRUCache(maxsize=EMBEDDING_CACHE_SIZE),
+            "jd": LRUCache(maxsize=EMBEDDING_CACHE_SIZE)
+        }
+        self._chroma = None
+        if persist_path:
+            import chromadb
+            self._chroma = chromadb.PersistentClient(path=persist_path)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embeds texts, reusing cached vectors for content seen before."""
+        ids = [content_hash(t) for t in texts]
+        with self._lock:
+            missing = [i for i, doc_id in enumerate(ids) if doc_id not in self._cache]
+        if missing:
+            vectors = self.embedder.embed([texts[i] for i in missing])
+            with self._lock:
+                for i, vector in zip(missing, vectors):
+                    self._cache[ids[i]] = vector
+        with self._lock:
+            # Entries can only be evicted by a concurrent call; re-embed those few if it happens
+            found = [self._cache.get(doc_id) for doc_id in ids]
+        for i, vector in enumerate(found):
+            if vector is None:
+                found[i] = self.embedder.embed([texts[i]])[0]
+        return np.vstack(found) if found else np.zeros((0, 0), dtype=np.float32)
+
+    def _collection(self, kind: str):
+        return self._chroma.get_or_create_collection(f"{kind}s", metadata={"hnsw:space": "cosine"})
+
+    def upsert(self, kind: str, texts: List[str], metadatas: Optional[List[dict]] = None) -> List[str]:
+        """Stores embeddings for `texts` under kind 'resume' or 'jd'; returns their content ids."""
+        ids = [content_hash(t) for t in texts]
+        vectors = self.embed(texts)
+        if self._chroma is not None:
+            # Chroma rejects empty metadata dicts, so "no metadata" is passed as None
+            self._collection(kind).upsert(ids=ids, embeddings=vectors.tolist(), metadatas=metadatas or None)
+        else:
+            with self._lock:
+                for doc_id, vector, metadata in zip(ids, vectors, metadatas or [{} for _ in texts]):
+                    self._memory[kind][doc_id] = (vector, metadata)
+        return ids
+
+    def query(self, kind: str, text: str, top_k: int = 10) -> List[dict]:
+        """Returns the `top_k` stored documents of `kind` most similar to `text`."""
+        query_vector = self.embed([text])[0]
+        if self._chroma is not None:
+            found = self._collection(kind).query(query_embeddings=[query_vector.tolist()], n_results=top_k)
+            return [
+                {"id": doc_id, "score": round(1.0 - distance, 4), "metadata": metadata or {}}
+                for doc_id, distance, metadata in zip(found["ids"][0], found["distances"][0], found["metadatas"][0])
+            ]
+
+        with self._lock:
+            items = list(self._memory[kind].items())
+        if not items:
+            return []
+        scores = np.vstack([vector for _, (vector, _) in items]) @ query_vector
+        order = np.argsort(-scores)[:top_k]
+        return [
+            {"id": items[i][0], "score": round(float(scores[i]), 4), "metadata": items[i][1][1]}
+            for i in order
+        ]
+
+    def rank(self, query_text: str, candidates: List[str], top_k: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Ranks candidate texts by cosine similarity to `query_text`; returns (index, score) best first."""
+        if not candidates:
+            return []
+        vectors = self.embed([query_text] + candidates)
+        scores = vectors[1:] @ vectors[0]
+        order = np.argsort(-scores)
+        if top_k is not None:
+            order = order[:top_k]
+        return [(int(i), round(float(scores[i]), 4)) for i in order]
+
+
+_store: Optional[VectorStore] = None
+_store_failed = False
+
+
+def get_vector_store() -> Optional[VectorStore]:
+    """Returns the shared store, or None when no embedding model is configured or it fails to load."""
+    global _store, _store_failed
+    if _store is None and not _store_failed:
+        if not EMBEDDING_MODEL_DIR:
+            _store_failed = True
+            return None
+        try:
+            _store = VectorStore(OnnxEmbedder(EMBEDDING_MODEL_DIR), persist_path=VECTOR_STORE_PATH)
+            print("✅ Embedding model loaded from", EMBEDDING_MODEL_DIR)
+        except Exception as e:
+            _store_failed = True
+            print("❌ Failed to load embedding model:", str(e))
+    return _store
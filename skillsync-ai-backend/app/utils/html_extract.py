@@ -0,0 +1,204 @@
+# app/utils/html_extract.py
+
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from bs4 import BeautifulSoup
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# C-backed parsers are optional; BeautifulSoup's html.parser is the fallback
+try:
+    from selectolax.parser import HTMLParser as SelectolaxParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+try:
+    from lxml import etree, html as lxml_html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# "auto" picks selectolax, then lxml, then bs4
+SCRAPER_HTML_PARSER = os.getenv("SCRAPER_HTML_PARSER", "auto").lower()
+
+# Text inside these is never part of a job description
+_SKIPPED_TAGS = {"script", "style", "noscript", "template"}
+
+
+@dataclass(frozen=True)
+class Selector:
+    """One element to extract: a tag plus an optional id and/or class (all backends can match these)."""
+    tag: str
+    id: Optional[str] = None
+    cls: Optional[str] = None
+
+    @property
+    def css(self) -> str:
+        return self.tag + (f"#{self.id}" if self.id else "") + (f".{self.cls}" if self.cls else "")
+
+    @property
+    def xpath(self) -> str:
+        conditions = []
+        if self.id:
+            conditions.append(f"@id='{self.id}'")
+        if self.cls:
+            conditions.append(f"contains(concat(' ', normalize-space(@class), ' '), ' {self.cls} ')")
+        return f"//{self.tag}" + "".join(f"[{c}]" for c in conditions)
+
+    def matches(self, tag: str, attrs: dict) -> bool:
+        if tag != self.tag:
+            return False
+        if self.id and attrs.get("id") != self.id:
+            return False
+        if self.cls and self.cls not in (attrs.get("class") or "").split():
+            return False
+        return True
+
+
+# Site -> selectors tried in order; the first one present on the page wins
+SITE_SELECTORS: Dict[str, List[Selector]] = {
+    "linkedin": [Selector("div", cls="description__text")],
+    "indeed": [Selector("div", id="jobDescriptionText")],
+    "google_jobs": [Selector("div", cls="job-description")]  # May vary
+}
+
+
+def register_selectors(site: str, *selectors: Selector, prepend: bool = True):
+    """Adds selectors for a site (ahead of the existing ones unless prepend=False)."""
+    current = SITE_SELECTORS.setdefault(site, [])
+    SITE_SELECTORS[site] = [*selectors, *current] if prepend else [*current, *selectors]
+
+
+def _clean(text: str) -> str:
+    # One line per text block, no blank lines
+    return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def _lxml_strings(element) -> Iterable[str]:
+    if isinstance(element.tag, str) and element.tag not in _SKIPPED_TAGS and element.text:
+        yield element.text
+    for child in element:
+        if isinstance(child.tag, str) and child.tag not in _SKIPPED_TAGS:
+            yield from _lxml_strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def lxml_text(element) -> str:
+    return _clean("\n".join(_lxml_strings(element)))
+
+
+def resolve_backend(backend: str = SCRAPER_HTML_PARSER) -> str:
+    if backend in ("auto", "selectolax") and SELECTOLAX_AVAILABLE:
+        return "selectolax"
+    if backend in ("auto", "selectolax", "lxml") and LXML_AVAILABLE:
+        return "lxml"
+    return "bs4"
+
+
+def _extract_selectolax(html: str, selectors: List[Selector]) -> str:
+    tree = SelectolaxParser(html)
+    for selector in selectors:
+        node = tree.css_first(selector.css)
+        if node is not None:
+            for skipped in node.css(",".join(_SKIPPED_TAGS)):
+                skipped.decompose()
+            return _clean(node.text(deep=True, separator="\n", strip=True))
+    return ""
+
+
+def _extract_lxml(html: str, selectors: List[Selector]) -> str:
+    if not html.strip():
+        return ""
+    tree = lxml_html.fromstring(html)
+    for selector in selectors:
+        found = tree.xpath(selector.xpath)
+        if found:
+            return lxml_text(found[0])
+    return ""
+
+
+def _extract_bs4(html: str, selectors: List[Selector]) -> str:
+    soup = BeautifulSoup(html, "html.parser")
+    for selector in selectors:
+        attrs = {}
+        if selector.id:
+            attrs["id"] = selector.id
+        if selector.cls:
+            attrs["class"] = selector.cls
+        node = soup.find(selector.tag, attrs)
+        if node is not None:
+            for skipped in node.find_all(list(_SKIPPED_TAGS)):
+                skipped.decompose()
+            return _clean(node.get_text("\n", strip=True))
+    return ""
+
+
+_EXTRACTORS = {"selectolax": _extract_selectolax, "lxml": _extract_lxml, "bs4": _extract_bs4}
+
+
+def extract_text(html: str, site: str, backend: str = SCRAPER_HTML_PARSER) -> str:
+    """Text of the first of the site's selectors found in `html` ("" when none match)."""
+    return _EXTRACTORS[resolve_backend(backend)](html, SITE_SELECTORS.get(site, []))
+
+
+class StreamingExtractor:
+    """
+    Incremental lxml parse that stops as soon as the target element is closed, so the rest of
+    the page (footer, inline scripts, tracking JSON) is neither downloaded nor parsed. Feed raw
+    chunks with `feed()`; it returns the text once found, else None. `close()` finishes a page
+    whose target was never closed (or never seen).
+    """
+
+    def __init__(self, site: str):
+        if not LXML_AVAILABLE:
+            raise RuntimeError("lxml is required for streaming extraction")
+        self.selectors = SITE_SELECTORS.get(site, [])
+        self._parser = etree.HTMLPullParser(events=("start", "end"))
+        self._target = None
+        self.bytes_fed = 0
+        self.result: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None
+
+    @property
+    def matched(self) -> bool:
+        """False when the selector never matched; the caller should fall back to `extract_text`."""
+        return self._target is not None
+
+    def _scan(self) -> Optional[str]:
+        for event, element in self._parser.read_events():
+            if event == "start" and self._target is None:
+                # Only the first selector is matched while streaming; fallbacks need the whole page
+                if self.selectors and self.selectors[0].matches(element.tag, element.attrib):
+                    self._target = element
+            elif event == "end" and element is self._target:
+                self.result = lxml_text(element)
+                return self.result
+        return None
+
+    def feed(self, chunk: bytes) -> Optional[str]:
+        if self.done:
+            return self.result
+        self.bytes_fed += len(chunk)
+        self._parser.feed(chunk)
+        return self._scan()
+
+    def close(self) -> str:
+        if not self.done:
+            try:
+                self._parser.close()
+            except etree.XMLSyntaxError:
+                pass
+            self._scan()
+        if not self.done and self._target is not None:
+            # Truncated page: take whatever the target collected
+            self.result = lxml_text(self._target)
+        return self.result or ""
+
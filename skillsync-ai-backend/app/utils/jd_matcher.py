@@ -1,33 +1,28 @@
-from typing import Dict
-from openai import AsyncOpenAI
+from typing import Dict, Optional
 import os
-import httpx
 import json
+from app.services.llm_router import llm_router
+from app.utils.prompt_budget import budget_prompt_inputs
 
-client = AsyncOpenAI(
-    api_key=os.getenv("OPENROUTER_API_KEY"),
-    base_url="https://openrouter.ai/api/v1"
-)
-
-OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "deepseek/deepseek-chat-v3-0324:free")
 
-async def call_openrouter_for_json(prompt: str) -> str:
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "Content-Type": "application/json"
-    }
+async def call_openrouter_for_json(
+    prompt: str,
+    system_prompt: Optional[str] = "You are a helpful assistant.",
+    temperature: Optional[float] = None
+) -> str:
+    messages = [{"role": "user", "content": prompt}]
+    if system_prompt:
+        messages.insert(0, {"role": "system", "content": system_prompt})
 
     body = {
         "model": OPENROUTER_MODEL,
-        "messages": [
-            {"role": "system", "content": "You are a helpful assistant."},
-            {"role": "user", "content": prompt}
-        ]
+        "messages": messages
     }
+    if temperature is not None:
+        body["temperature"] = temperature
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=body)
+    response = await llm_router.complete(body)
 
     if response.status_code != 200:
         raise Exception(f"OpenRouter error: {response.text}")
@@ -36,8 +31,8 @@ async def call_openrouter_for_json(prompt: str) -> str:
     return result["choices"][0]["message"]["content"]
 
 async def match_resume_to_jd(resume_text: str, jd_text: str) -> Dict:
-    resume_text = resume_text[:50000]
-    jd_text = jd_text[:1000]
+    # Compacted and fitted to the prompt token budget instead of blind character cuts
+    resume_text, jd_text, _ = budget_prompt_inputs(resume_text, jd_text)
 
     prompt = f"""
 You are an AI recruiting assistant. Based on the following resume and job description, evaluate the match and return:
@@ -64,14 +59,9 @@ Respond strictly in JSON with keys:
 """
 
     try:
-        response = await client.chat.completions.create(
-            model=os.getenv("OPENROUTER_MODEL"),
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.2
-        )
-
-        raw = response.choices[0].message.content.strip()
-        print("🔍 RAW LLM RESPONSE:\n", raw)  # DEBUG
+        response = await call_openrouter_for_json(prompt, system_prompt=None, temperature=0.2)
+
+        raw = response.strip()
 
         # 🔧 Sanitize output by removing ```json and ```
         if raw.startswith("```json"):
@@ -1,47 +1,114 @@
-from playwright.async_api import async_playwright
+import asyncio
+from urllib.parse import urlsplit
 import httpx
-from bs4 import BeautifulSoup
+from app.services.browser_pool import BrowserPoolError, browser_pool
+from app.services.domain_limiter import domain_limiter
+from app.services.scrape_cache import ScrapeResult, conditional_headers, scrape_cache
+from app.services.scraper_client import fetch_job_page
+from app.utils.html_extract import SITE_SELECTORS
+from app.utils.telemetry import traced
 
-async def extract_jd_from_linkedin(url: str) -> str:
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context()
-        page = await context.new_page()
+# Each extractor goes through the scrape cache: tracking params are stripped, job ids resolved,
+# and stale copies revalidated with If-None-Match / If-Modified-Since before being refetched.
+# Actual fetches (not cache hits) wait for the site's per-domain rate limit.
+
+@traced("scrape linkedin", "scraper.duration", **{"scraper.source": "linkedin"})
+async def _fetch_linkedin(url: str, cached: dict = None) -> ScrapeResult:
+    # Page in an isolated context on a pooled, already-running browser (images/CSS/fonts blocked)
+    async with domain_limiter.slot(url), browser_pool.page() as page:
+        if conditional_headers(cached):
+            await page.set_extra_http_headers(conditional_headers(cached))
+
+        # The DOM is all we need; don't wait for the full load event
+        response = await page.goto(url, timeout=60000, wait_until="domcontentloaded")
+        if response is not None and response.status == 304:
+            return ScrapeResult(not_modified=True)
 
-        try:
-            await page.goto(url, timeout=60000)
+        # Wait for job description to appear
+        selector = SITE_SELECTORS["linkedin"][0].css
+        await page.wait_for_selector(selector, timeout=10000)
 
-            # Wait for job description to appear
-            await page.wait_for_selector("div.description__text", timeout=10000)
-            
-            # Extract job description text
-            job_description = await page.inner_text("div.description__text")
+        # Extract job description text
+        job_description = await page.inner_text(selector)
+        headers = response.headers if response is not None else {}
+        return ScrapeResult(job_description.strip(), headers.get("etag"), headers.get("last-modified"))
 
-            await browser.close()
-            return job_description.strip()
+# The extractors raise on failure (see describe_scrape_error); "" means the page had no description
 
-        except Exception as e:
-            await browser.close()
-            raise Exception(f"Failed to extract job description: {str(e)}")
+async def extract_jd_from_linkedin(url: str) -> str:
+    return await scrape_cache.get_or_fetch(url, _fetch_linkedin)
+
+@traced("scrape indeed", "scraper.duration", **{"scraper.source": "indeed"})
+async def _fetch_indeed(url: str, cached: dict = None) -> ScrapeResult:
+    # Shared pooled client; selectors live in app/utils/html_extract.SITE_SELECTORS
+    async with domain_limiter.slot(url):
+        return await fetch_job_page(url, "indeed", conditional_headers(cached))
 
 async def extract_from_indeed(url: str) -> str:
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url)
-            soup = BeautifulSoup(response.text, "html.parser")
+    return await scrape_cache.get_or_fetch(url, _fetch_indeed)
 
-            job_desc = soup.find("div", {"id": "jobDescriptionText"})
-            return job_desc.get_text(strip=True) if job_desc else ""
-    except Exception:
-        return ""
+@traced("scrape google_jobs", "scraper.duration", **{"scraper.source": "google_jobs"})
+async def _fetch_google_jobs(url: str, cached: dict = None) -> ScrapeResult:
+    async with domain_limiter.slot(url):
+        return await fetch_job_page(url, "google_jobs", conditional_headers(cached))
 
 async def extract_from_google_jobs(url: str) -> str:
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url)
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            job_desc = soup.find("div", {"class": "job-description"})  # May vary
-            return job_desc.get_text(strip=True) if job_desc else ""
-    except Exception:
-        return ""
\ No newline at end of file
+    return await scrape_cache.get_or_fetch(url, _fetch_google_jobs)
+
+# Source -> extractor, for endpoints that take any supported job URL
+EXTRACTORS = {
+    "linkedin": extract_jd_from_linkedin,
+    "indeed": extract_from_indeed,
+    "google_jobs": extract_from_google_jobs
+}
+
+SOURCE_LABELS = {"linkedin": "LinkedIn", "indeed": "Indeed", "google_jobs": "Google Jobs"}
+
+# Indeed's country sites; subdomains (uk.indeed.com, www.indeed.de) are matched too
+INDEED_DOMAINS = (
+    "indeed.com", "indeed.co.uk", "indeed.ca", "indeed.de", "indeed.fr", "indeed.es", "indeed.it",
+    "indeed.nl", "indeed.be", "indeed.ch", "indeed.at", "indeed.ie", "indeed.co.in", "indeed.com.au",
+    "indeed.co.nz", "indeed.com.sg", "indeed.jp", "indeed.com.br", "indeed.com.mx", "indeed.jobs"
+)
+
+def _on_domain(host: str, domain: str) -> bool:
+    return host == domain or host.endswith("." + domain)
+
+def _is_google_host(host: str) -> bool:
+    # google.com or google.<country code> (google.de, google.co.uk, google.com.au); not any
+    # host that merely has a "google" label (docs.google.com, google.evil.example)
+    labels = host.split(".")
+    if labels[0] == "www":
+        labels = labels[1:]
+    if not labels or labels[0] != "google":
+        return False
+    rest = labels[1:]
+    if rest == ["com"] or (len(rest) == 1 and len(rest[0]) == 2):
+        return True
+    return len(rest) == 2 and rest[0] in ("co", "com") and len(rest[1]) == 2
+
+def detect_source(url: str):
+    """Extractor key for a job URL's domain, or None if the site isn't supported."""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if _on_domain(host, "linkedin.com"):
+        return "linkedin"
+    if any(_on_domain(host, domain) for domain in INDEED_DOMAINS):
+        return "indeed"
+    # Google Jobs listings live under /search (ibp=htl;jobs); careers pages under .../jobs/...
+    if _is_google_host(host) and (parts.path.startswith("/search") or "jobs" in parts.path.split("/")):
+        return "google_jobs"
+    return None
+
+def describe_scrape_error(error: Exception) -> dict:
+    """Short, client-safe {"kind", "detail"} for a failed extraction."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return {"kind": "http_status", "detail": f"The site answered HTTP {error.response.status_code}."}
+    # asyncio's and Playwright's timeouts share the name
+    if isinstance(error, (httpx.TimeoutException, asyncio.TimeoutError)) or type(error).__name__ == "TimeoutError":
+        return {"kind": "timeout", "detail": "The page took too long to load."}
+    if isinstance(error, httpx.RequestError):
+        return {"kind": "network", "detail": f"Could not reach the site ({type(error).__name__})."}
+    if isinstance(error, BrowserPoolError):
+        return {"kind": "busy", "detail": "The scraper is busy; try again shortly."}
+    return {"kind": "error", "detail": f"{type(error).__name__}: {str(error)[:200]}"}
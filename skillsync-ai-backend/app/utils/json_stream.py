@@ -0,0 +1,139 @@
+# app/utils/json_stream.py
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class IncrementalJSONParser:
+    """
+    Tolerant incremental parser for one JSON object arriving in chunks, as an LLM streams it.
+    Text before the first "{" (chatter, ```json fences) and after the closing "}" is ignored.
+    `feed()` returns the top-level fields whose values became complete in that chunk, so
+    callers can forward them before the rest of the object has been generated.
+    """
+
+    def __init__(self):
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._phase = "key"         # key -> colon -> value -> after (-> key ...)
+        self._token_start: Optional[int] = None
+        self._key: Optional[str] = None
+        self._buffer = ""           # the object text, kept as one string for slicing
+        self.fields: Dict[str, Any] = {}
+        self.started = False
+        self.done = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        completed = []
+        if self.done:
+            return completed
+        if not self.started:
+            start = chunk.find("{")
+            if start < 0:
+                return completed
+            self.started = True
+            chunk = chunk[start:]
+
+        offset = len(self._buffer)
+        self._buffer += chunk
+        for index, char in enumerate(chunk):
+            field = self._step(char, offset + index)
+            if field is not None:
+                completed.append(field)
+            if self.done:
+                # Drop anything after the closing brace (trailing fences, chatter)
+                self._buffer = self._buffer[:offset + index + 1]
+                break
+        return completed
+
+    def _step(self, char: str, position: int) -> Optional[Tuple[str, Any]]:
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                if self._depth == 1:
+                    return self._close_string(position)
+            return None
+
+        if char == '"':
+            self._in_string = True
+            if self._depth == 1 and self._phase in ("key", "value") and self._token_start is None:
+                self._token_start = position
+            return None
+
+        if char in "{[":
+            self._depth += 1
+            if self._depth == 2 and self._phase == "value" and self._token_start is None:
+                self._token_start = position
+            return None
+
+        if char in "}]":
+            self._depth -= 1
+            if self._depth == 1 and self._phase == "value" and self._token_start is not None:
+                # A nested object/array value just closed
+                return self._complete(position + 1)
+            if self._depth == 0:
+                self.done = True
+                if self._phase == "value" and self._token_start is not None:
+                    return self._complete(position)
+            return None
+
+        if self._depth != 1:
+            return None
+
+        if char == ":" and self._phase == "colon":
+            self._phase = "value"
+        elif char == ",":
+            field = None
+            if self._phase == "value" and self._token_start is not None:
+                # Scalar values (numbers, true/false/null) end at the next comma
+                field = self._complete(position)
+            self._phase = "key"
+            return field
+        elif not char.isspace() and self._phase == "value" and self._token_start is None:
+            self._token_start = position
+        return None
+
+    def _close_string(self, position: int) -> Optional[Tuple[str, Any]]:
+        if self._phase == "key" and self._token_start is not None:
+            try:
+                self._key = json.loads(self._buffer[self._token_start:position + 1])
+            except json.JSONDecodeError:
+                self._key = None
+            self._token_start = None
+            self._phase = "colon"
+            return None
+        if self._phase == "value" and self._token_start is not None:
+            return self._complete(position + 1)
+        return None
+
+    def _complete(self, end: int) -> Optional[Tuple[str, Any]]:
+        raw = self._buffer[self._token_start:end].strip()
+        key = self._key
+        self._token_start = None
+        self._key = None
+        self._phase = "after"
+        if key is None:
+            return None
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            # Malformed values are left to the final validation
+            return None
+        self.fields[key] = value
+        return key, value
+
+    def result(self) -> Dict[str, Any]:
+        """The parsed object; falls back to the fields completed so far if the stream was cut short."""
+        if self.done:
+            try:
+                parsed = json.loads(self._buffer)
+                if isinstance(parsed, dict):
+                    return parsed
+            except json.JSONDecodeError:
+                pass
+        return dict(self.fields)
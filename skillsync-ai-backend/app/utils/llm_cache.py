@@ -0,0 +1,161 @@
+# app/utils/llm_cache.py
+
+import hashlib
+import os
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, List, Optional
+
+from cachetools import TTLCache
+
+from app.db.database import db
+from app.utils.singleflight import SingleFlight
+from app.utils.text_utils import normalize_text
+
+# --- Cache settings ---
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1024))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+
+def make_cache_key(template: str, template_fingerprint: str, model: str, inputs: List[str]) -> str:
+    digest = hashlib.sha256()
+    for part in (template, template_fingerprint, model):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    for text in inputs:
+        digest.update(hashlib.sha256(normalize_text(text).encode("utf-8")).digest())
+    return digest.hexdigest()
+
+
+class LLMCache:
+    """
+    Two-tier cache for validated LLM results: an in-process LRU (with TTL) in front of
+    the `llm_cache` Mongo collection, whose TTL index on `expires_at` evicts old rows.
+    Concurrent misses for the same key share one upstream call.
+    """
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, ttl_seconds: int = LLM_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._memory = TTLCache(maxsize=max_entries, ttl=ttl_seconds)
+        self._flights = SingleFlight()
+        self._stats = {
+            "memory_hits": 0,
+            "mongo_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "mongo_errors": 0
+        }
+
+    async def _read_mongo(self, key: str) -> Optional[dict]:
+        try:
+            doc = await db.llm_cache.find_one({"_id": key, "expires_at": {"$gt": datetime.utcnow()}})
+        except Exception as e:
+            self._stats["mongo_errors"] += 1
+            print("❌ LLM cache read failed:", str(e))
+            return None
+        return doc["result"] if doc else None
+
+    async def _write_mongo(self, key: str, template: str, model: str, result: dict):
+        now = datetime.utcnow()
+        try:
+            await db.llm_cache.replace_one(
+                {"_id": key},
+                {
+                    "template": template,
+                    "model": model,
+                    "result": result,
+                    "created_at": now,
+                    "expires_at": now + timedelta(seconds=self.ttl_seconds)
+                },
+                upsert=True
+            )
+        except Exception as e:
+            self._stats["mongo_errors"] += 1
+            print("❌ LLM cache write failed:", str(e))
+
+    async def get(self, key: str) -> Optional[dict]:
+        if key in self._memory:
+            self._stats["memory_hits"] += 1
+            return self._memory[key]
+        cached = await self._read_mongo(key)
+        if cached is not None:
+            self._stats["mongo_hits"] += 1
+            self._memory[key] = cached
+        return cached
+
+    def record_miss(self):
+        self._stats["misses"] += 1
+
+    async def put(self, key: str, template: str, model: str, result: dict):
+        self._memory[key] = result
+        self._stats["stores"] += 1
+        await self._write_mongo(key, template, model, result)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        template: str,
+        model: str,
+        compute: Callable[[], Awaitable[Optional[dict]]]
+    ) -> Optional[dict]:
+        """Returns the cached result for `key`, or runs `compute` once and stores a non-empty result."""
+        if key in self._memory:
+            self._stats["memory_hits"] += 1
+            return self._memory[key]
+
+        async def load() -> Optional[dict]:
+            cached = await self.get(key)
+            if cached is not None:
+                return cached
+
+            self.record_miss()
+            result = await compute()
+            if result is not None:
+                await self.put(key, template, model, result)
+            return result
+
+        return await self._flights.do(key, load)
+
+    def stats(self) -> dict:
+        hits = self._stats["memory_hits"] + self._stats["mongo_hits"]
+        lookups = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "enabled": LLM_CACHE_ENABLED,
+            "coalesced": self._flights.coalesced,
+            "in_flight": self._flights.in_flight(),
+            "memory_entries": len(self._memory),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+        }
+
+
+llm_cache = LLMCache()
+
+
+async def cached_llm_result(
+    template: str,
+    template_fingerprint: str,
+    model: str,
+    inputs: List[str],
+    compute: Callable[[], Awaitable[Optional[dict]]]
+) -> Optional[Any]:
+    if not LLM_CACHE_ENABLED:
+        return await compute()
+    key = make_cache_key(template, template_fingerprint, model, inputs)
+    return await llm_cache.get_or_compute(key, template, model, compute)
+
+
+async def lookup_llm_result(template: str, template_fingerprint: str, model: str, inputs: List[str]) -> Optional[Any]:
+    """Cache read without computing; used by streaming calls, which store their own result."""
+    if not LLM_CACHE_ENABLED:
+        return None
+    key = make_cache_key(template, template_fingerprint, model, inputs)
+    cached = await llm_cache.get(key)
+    if cached is None:
+        llm_cache.record_miss()
+    return cached
+
+
+async def store_llm_result(template: str, template_fingerprint: str, model: str, inputs: List[str], result: dict):
+    if LLM_CACHE_ENABLED:
+        key = make_cache_key(template, template_fingerprint, model, inputs)
+        await llm_cache.put(key, template, model, result)
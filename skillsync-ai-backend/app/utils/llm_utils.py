@@ -2,22 +2,29 @@ import os
 import json
 import httpx
 import re
-from typing import List, Dict, Any, Optional
+import hashlib
+from functools import lru_cache
+from typing import AsyncIterator, List, Dict, Any, Optional
 from dotenv import load_dotenv
 import asyncio
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from app.services.llm_client import stream_chat_completion
+from app.services.llm_router import llm_router
+from app.services.llm_limiter import LLMUnavailableError, backoff_delay, is_retryable_status, parse_retry_after
+from app.utils.llm_cache import cached_llm_result, lookup_llm_result, store_llm_result
+from app.utils.json_stream import IncrementalJSONParser
+from app.utils.prompt_budget import budget_prompt_inputs, count_tokens
+from app.utils.telemetry import traced
 
 # --- Load environment variables ---
 load_dotenv()
-OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "deepseek/deepseek-chat-v3-0324:free")
 
-HEADERS = {
-    "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-    "Content-Type": "application/json",
-    "X-Title": "Resume Analyzer",
-    "HTTP-Referer": "https://yourdomain.com"  # customize!
-}
+# --- Batched JD matching: several resumes per prompt, the JD sent once ---
+LLM_BATCH_TOKEN_BUDGET = int(os.getenv("LLM_BATCH_TOKEN_BUDGET", 16000))
+LLM_BATCH_MAX_CANDIDATES = int(os.getenv("LLM_BATCH_MAX_CANDIDATES", 8))
+# Room reserved per candidate for its JSON answer
+LLM_BATCH_OUTPUT_TOKENS_PER_CANDIDATE = int(os.getenv("LLM_BATCH_OUTPUT_TOKENS_PER_CANDIDATE", 300))
 
 # --- Pydantic schemas for LLM output validation ---
 
@@ -76,6 +83,26 @@ Resume:
 
 Job Description:
 {job_description}
+""",
+
+    "jd_matching_batch": lambda candidates, job_description: f"""
+You are an expert recruiter AI. Compare EACH candidate resume below with the job description.
+Return a JSON array with exactly one object per candidate, in the same order, each with:
+{{
+    "candidate_id": the candidate number given below,
+    "fit_percentage": number between 0 to 100,
+    "matching_skills": [list of overlapping skills or experiences],
+    "missing_skills": [list of important but missing skills],
+    "strengths": [list of resume strengths],
+    "weaknesses": [list of resume weaknesses],
+    "verdict": "short sentence whether the resume fits or not"
+}}
+Judge every candidate independently against the job description only.
+
+Job Description:
+{job_description}
+
+{candidates}
 """,
 
     "resume_improvement": lambda resume_text, job_description: f"""
@@ -109,6 +136,7 @@ Strictly return only the JSON. No explanation, no markdown, no commentary.
 }
 
 # --- Core OpenRouter call ---
+@traced("call_llm")
 async def call_llm(
     prompt: str,
     system_prompt: str = "You are a helpful AI assistant. Respond only with a valid JSON.",
@@ -125,21 +153,30 @@ async def call_llm(
 
     for attempt in range(retries):
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(
-                    "https://openrouter.ai/api/v1/chat/completions",
-                    headers=HEADERS,
-                    json=body
-                )
-                response.raise_for_status()
-                result = response.json()
-                raw = result["choices"][0]["message"]["content"].strip()
-                # Remove code fences if present
-                cleaned = re.sub(r"^```json\s*|\s*```$", "", raw, flags=re.MULTILINE)
-                return cleaned
-        except (httpx.HTTPStatusError, httpx.TimeoutException) as e:
+            # Routed across the configured models; slow calls are hedged on a second route
+            response = await llm_router.complete(body, timeout=timeout)
+            response.raise_for_status()
+            result = response.json()
+            raw = result["choices"][0]["message"]["content"].strip()
+            # Remove code fences if present
+            cleaned = re.sub(r"^```json\s*|\s*```$", "", raw, flags=re.MULTILINE)
+            return cleaned
+        except LLMUnavailableError:
+            # Circuit open or admission queue full: fail fast, callers turn this into a 503
+            raise
+        except httpx.HTTPStatusError as e:
+            if not is_retryable_status(e.response.status_code):
+                print(f"❌ LLM call rejected: {e}")
+                return None
+            if attempt < retries - 1:
+                # Jittered backoff so throttled callers don't retry in lockstep; honors Retry-After
+                await asyncio.sleep(backoff_delay(attempt, parse_retry_after(e.response.headers.get("Retry-After"))))
+            else:
+                print(f"❌ LLM call failed after {retries} attempts: {e}")
+                return None
+        except httpx.TimeoutException as e:
             if attempt < retries - 1:
-                await asyncio.sleep(2 ** attempt)  # Exponential backoff
+                await asyncio.sleep(backoff_delay(attempt))
             else:
                 print(f"❌ LLM call failed after {retries} attempts: {e}")
                 return None
@@ -147,43 +184,271 @@ async def call_llm(
             print(f"❌ Unexpected error: {type(e).__name__} - {str(e)}")
             return None
 
+# --- Streaming OpenRouter call ---
+async def stream_llm(
+    prompt: str,
+    system_prompt: str = "You are a helpful AI assistant. Respond only with a valid JSON.",
+    retries: int = 3,
+    timeout: int = 60
+) -> AsyncIterator[str]:
+    """Yields the completion text as it is generated. Raises once retries are exhausted."""
+    body = {
+        "model": OPENROUTER_MODEL,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+    }
+
+    tried = ()
+    for attempt in range(retries):
+        started = False
+        # Streams are not hedged, but each retry moves to another route when there is one
+        route = llm_router.pick(exclude=tried)
+        tried += (route,)
+        try:
+            async for delta in stream_chat_completion({**body, "model": route.model}, timeout=timeout, route=route):
+                started = True
+                yield delta
+            return
+        except (httpx.HTTPStatusError, httpx.TimeoutException) as e:
+            retryable = not isinstance(e, httpx.HTTPStatusError) or is_retryable_status(e.response.status_code)
+            # Only retry before anything was forwarded; a half-sent answer cannot be replayed
+            if started or not retryable or attempt == retries - 1:
+                print(f"❌ LLM stream failed after {attempt + 1} attempts: {e}")
+                raise
+            retry_after = parse_retry_after(e.response.headers.get("Retry-After")) if isinstance(e, httpx.HTTPStatusError) else None
+            await asyncio.sleep(backoff_delay(attempt, retry_after))
+
 # --- Wrapped functions with validation ---
 
+SYSTEM_PROMPTS = {
+    "resume_analysis": "You are an expert recruiter AI. Respond only with a valid JSON object matching the exact structure provided.",
+    "jd_matching": "You are a smart recruiter assistant. Always reply in pure JSON format.",
+    "jd_matching_batch": "You are a smart recruiter assistant. Always reply with a pure JSON array.",
+    "resume_improvement": "You are an expert career coach. Respond only with a valid JSON structure."
+}
+
+def _template_fingerprint(template: str) -> str:
+    # Editing a prompt or its system prompt changes the fingerprint, so stale cache rows are never served
+    fn = PROMPT_TEMPLATES[template]
+    rendered = fn(*["{}"] * fn.__code__.co_argcount)
+    return hashlib.sha256((SYSTEM_PROMPTS[template] + rendered).encode("utf-8")).hexdigest()
+
+TEMPLATE_FINGERPRINTS = {name: _template_fingerprint(name) for name in PROMPT_TEMPLATES}
+
+def _budget(inputs: List[str]) -> List[str]:
+    # Inputs are [resume] or [resume, job description]; both are compacted to the token budget
+    resume, jd, _ = budget_prompt_inputs(inputs[0], inputs[1] if len(inputs) > 1 else None)
+    return [resume] if jd is None else [resume, jd]
+
+async def _run_validated(template: str, inputs: List[str], model_cls):
+    """Renders the template, calls the LLM and validates the JSON; repeats are served from the LLM cache."""
+    inputs = _budget(inputs)
+    async def compute() -> Optional[dict]:
+        prompt = PROMPT_TEMPLATES[template](*inputs)
+        response = await call_llm(prompt, system_prompt=SYSTEM_PROMPTS[template])
+        if not response:
+            return None
+        try:
+            data = json.loads(response)
+            return model_cls(**data).dict()
+        except (json.JSONDecodeError, ValidationError) as e:
+            print(f"❌ {model_cls.__name__} validation error:", e)
+            return None
+
+    data = await cached_llm_result(template, TEMPLATE_FINGERPRINTS[template], llm_router.cache_model, inputs, compute)
+    return model_cls(**data) if data is not None else None
+
 async def analyze_resume_text(resume_text: str) -> Optional[ResumeAnalysisResult]:
-    prompt = PROMPT_TEMPLATES["resume_analysis"](resume_text)
-    response = await call_llm(prompt, system_prompt="You are an expert recruiter AI. Respond only with a valid JSON object matching the exact structure provided.")
-    if not response:
-        return None
-    try:
-        data = json.loads(response)
-        validated = ResumeAnalysisResult(**data)
-        return validated
-    except (json.JSONDecodeError, ValidationError) as e:
-        print("❌ ResumeAnalysisResult validation error:", e)
-        return None
+    return await _run_validated("resume_analysis", [resume_text], ResumeAnalysisResult)
 
 async def match_resume_with_jd(resume_text: str, jd_text: str) -> Optional[JDMatchResult]:
-    prompt = PROMPT_TEMPLATES["jd_matching"](resume_text, jd_text)
-    response = await call_llm(prompt, system_prompt="You are a smart recruiter assistant. Always reply in pure JSON format.")
-    if not response:
-        return None
-    try:
-        data = json.loads(response)
-        validated = JDMatchResult(**data)
-        return validated
-    except (json.JSONDecodeError, ValidationError) as e:
-        print("❌ JDMatchResult validation error:", e)
-        return None
+    return await _run_validated("jd_matching", [resume_text, jd_text], JDMatchResult)
 
 async def suggest_resume_improvements(resume_text: str, jd_text: str) -> Optional[ResumeImprovementResult]:
-    prompt = PROMPT_TEMPLATES["resume_improvement"](resume_text, jd_text)
-    response = await call_llm(prompt, system_prompt="You are an expert career coach. Respond only with a valid JSON structure.")
-    if not response:
-        return None
+    return await _run_validated("resume_improvement", [resume_text, jd_text], ResumeImprovementResult)
+
+# --- Batched JD matching ---
+
+_batch_stats = {
+    "batch_requests": 0,
+    "batched_candidates": 0,
+    "cache_hits": 0,
+    "fallbacks": 0
+}
+
+def plan_batches(resume_tokens: List[int], jd_tokens: int) -> List[List[int]]:
+    """
+    Greedily packs candidate indices into batches whose prompt (JD once, every resume, and the
+    reserved answer space) stays within LLM_BATCH_TOKEN_BUDGET, at most LLM_BATCH_MAX_CANDIDATES each.
+    """
+    fixed = jd_tokens + count_tokens(PROMPT_TEMPLATES["jd_matching_batch"]("", ""))
+    batches, current, used = [], [], fixed
+    for index, tokens in enumerate(resume_tokens):
+        cost = tokens + LLM_BATCH_OUTPUT_TOKENS_PER_CANDIDATE + 10  # + the candidate header
+        if current and (used + cost > LLM_BATCH_TOKEN_BUDGET or len(current) >= LLM_BATCH_MAX_CANDIDATES):
+            batches.append(current)
+            current, used = [], fixed
+        current.append(index)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+def _parse_batch_response(response: str, count: int) -> List[Optional[dict]]:
+    """Maps the answer array back to candidate positions by `candidate_id` (or by order)."""
     try:
         data = json.loads(response)
-        validated = ResumeImprovementResult(**data)
-        return validated
-    except (json.JSONDecodeError, ValidationError) as e:
-        print("❌ ResumeImprovementResult validation error:", e)
-        return None
+    except json.JSONDecodeError as e:
+        print("❌ Batch match response is not valid JSON:", e)
+        return [None] * count
+    if isinstance(data, dict):
+        # Some models wrap the array: {"candidates": [...]}
+        data = next((v for v in data.values() if isinstance(v, list)), [])
+    if not isinstance(data, list):
+        return [None] * count
+
+    by_position: List[Optional[dict]] = [None] * count
+    items = [item for item in data if isinstance(item, dict)]
+    for order, item in enumerate(items):
+        candidate_id = item.get("candidate_id")
+        position = candidate_id - 1 if isinstance(candidate_id, int) else (order if len(items) == count else None)
+        if position is not None and 0 <= position < count and by_position[position] is None:
+            by_position[position] = item
+    return by_position
+
+async def _match_batch(resumes: List[str], jd_text: str) -> List[Optional[dict]]:
+    candidates = "\n\n".join(f"### Candidate {i + 1}\n{text}" for i, text in enumerate(resumes))
+    prompt = PROMPT_TEMPLATES["jd_matching_batch"](candidates, jd_text)
+    _batch_stats["batch_requests"] += 1
+    _batch_stats["batched_candidates"] += len(resumes)
+    response = await call_llm(prompt, system_prompt=SYSTEM_PROMPTS["jd_matching_batch"])
+
+    validated: List[Optional[dict]] = []
+    for item in _parse_batch_response(response, len(resumes)) if response else [None] * len(resumes):
+        try:
+            validated.append(JDMatchResult(**item).dict() if item is not None else None)
+        except ValidationError as e:
+            print("❌ JDMatchResult validation error in batch:", e)
+            validated.append(None)
+    return validated
+
+async def match_resumes_with_jd_batch(resume_texts: List[str], jd_text: str) -> List[Optional[JDMatchResult]]:
+    """
+    Scores several resumes against one JD with as few LLM requests as the token budget allows.
+    Results are validated per candidate; a candidate whose answer is missing or invalid falls
+    back to a single match_resume_with_jd call. Results are read from and written to the
+    single-resume cache entries, so batched and single calls share them.
+    """
+    if len(resume_texts) == 1:
+        return [await match_resume_with_jd(resume_texts[0], jd_text)]
+
+    fingerprint = TEMPLATE_FINGERPRINTS["jd_matching"]
+    inputs = [_budget([text, jd_text]) for text in resume_texts]
+    results: List[Optional[JDMatchResult]] = [None] * len(resume_texts)
+
+    pending = []
+    for index, (resume, jd) in enumerate(inputs):
+        cached = await lookup_llm_result("jd_matching", fingerprint, llm_router.cache_model, [resume, jd])
+        if cached is not None:
+            _batch_stats["cache_hits"] += 1
+            results[index] = JDMatchResult(**cached)
+        else:
+            pending.append(index)
+    if not pending:
+        return results
+
+    jd = inputs[pending[0]][1]
+    batches = [
+        [pending[i] for i in batch]
+        for batch in plan_batches([count_tokens(inputs[i][0]) for i in pending], count_tokens(jd))
+    ]
+
+    async def single(index: int):
+        results[index] = await match_resume_with_jd(*inputs[index])
+
+    async def run(batch: List[int]):
+        if len(batch) == 1:
+            await single(batch[0])
+            return
+        answers = await _match_batch([inputs[i][0] for i in batch], jd)
+        fallbacks = []
+        for index, data in zip(batch, answers):
+            if data is None:
+                fallbacks.append(index)
+            else:
+                await store_llm_result("jd_matching", fingerprint, llm_router.cache_model, inputs[index], data)
+                results[index] = JDMatchResult(**data)
+        _batch_stats["fallbacks"] += len(fallbacks)
+        await asyncio.gather(*(single(index) for index in fallbacks))
+
+    await asyncio.gather(*(run(batch) for batch in batches))
+    return results
+
+def get_batch_stats() -> dict:
+    return {
+        **_batch_stats,
+        "max_candidates": LLM_BATCH_MAX_CANDIDATES,
+        "token_budget": LLM_BATCH_TOKEN_BUDGET,
+        "avg_batch_size": round(_batch_stats["batched_candidates"] / _batch_stats["batch_requests"], 2)
+        if _batch_stats["batch_requests"] else 0.0
+    }
+
+# --- Streaming variants: fields are forwarded as soon as they are complete ---
+
+@lru_cache(maxsize=None)
+def _field_adapters(model_cls) -> Dict[str, TypeAdapter]:
+    return {name: TypeAdapter(field.annotation) for name, field in model_cls.model_fields.items()}
+
+async def _stream_validated(template: str, inputs: List[str], model_cls) -> AsyncIterator[dict]:
+    """
+    Yields {"event": "field", "field", "value"} for each top-level field once it is complete and
+    valid on its own, then {"event": "result", "data"} with the whole object validated against
+    `model_cls` (and cached), or {"event": "error"} if the LLM call or validation fails.
+    """
+    inputs = _budget(inputs)
+    fingerprint = TEMPLATE_FINGERPRINTS[template]
+    cached = await lookup_llm_result(template, fingerprint, llm_router.cache_model, inputs)
+    if cached is not None:
+        for name, value in cached.items():
+            yield {"event": "field", "field": name, "value": value}
+        yield {"event": "result", "status": True, "cached": True, "data": cached}
+        return
+
+    parser = IncrementalJSONParser()
+    adapters = _field_adapters(model_cls)
+    try:
+        prompt = PROMPT_TEMPLATES[template](*inputs)
+        async for delta in stream_llm(prompt, system_prompt=SYSTEM_PROMPTS[template]):
+            for name, value in parser.feed(delta):
+                if name not in adapters:
+                    continue
+                try:
+                    value = adapters[name].validate_python(value)
+                except ValidationError:
+                    continue
+                yield {"event": "field", "field": name, "value": value}
+    except LLMUnavailableError as e:
+        yield {"event": "error", "status": False, "message": str(e), "retry_after": e.retry_after}
+        return
+    except Exception as e:
+        print(f"❌ LLM stream error: {type(e).__name__} - {str(e)}")
+        yield {"event": "error", "status": False, "message": "LLM call failed."}
+        return
+
+    try:
+        data = model_cls(**parser.result()).dict()
+    except ValidationError as e:
+        print(f"❌ {model_cls.__name__} validation error:", e)
+        yield {"event": "error", "status": False, "message": "LLM did not return a valid result."}
+        return
+
+    await store_llm_result(template, fingerprint, llm_router.cache_model, inputs, data)
+    yield {"event": "result", "status": True, "cached": False, "data": data}
+
+def stream_resume_match(resume_text: str, jd_text: str) -> AsyncIterator[dict]:
+    return _stream_validated("jd_matching", [resume_text, jd_text], JDMatchResult)
+
+def stream_resume_improvements(resume_text: str, jd_text: str) -> AsyncIterator[dict]:
+    return _stream_validated("resume_improvement", [resume_text, jd_text], ResumeImprovementResult)
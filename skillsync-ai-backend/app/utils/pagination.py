@@ -0,0 +1,53 @@
+# app/utils/pagination.py
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional
+
+from bson import ObjectId
+
+
+def _dump(value: Any) -> dict:
+    if isinstance(value, datetime):
+        return {"t": "date", "v": value.isoformat()}
+    if isinstance(value, ObjectId):
+        return {"t": "oid", "v": str(value)}
+    return {"t": "raw", "v": value}
+
+
+def _load(item: dict) -> Any:
+    if item["t"] == "date":
+        return datetime.fromisoformat(item["v"])
+    if item["t"] == "oid":
+        return ObjectId(item["v"])
+    return item["v"]
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Opaque keyset cursor: the sort-key values (ending with _id) of the last row on a page."""
+    payload = [_dump(v) for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, expected_length: int) -> Optional[List[Any]]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        values = [_load(item) for item in payload]
+    except Exception:
+        return None
+    return values if len(values) == expected_length else None
+
+
+def keyset_condition(fields: List[str], sort_direction: int, values: List[Any]) -> dict:
+    """
+    Matches rows strictly after `values` in the order of `fields` (all sorted in `sort_direction`):
+    (a < x) or (a == x and b < y) or ... for descending order.
+    """
+    op = "$lt" if sort_direction < 0 else "$gt"
+    branches = []
+    for i, field in enumerate(fields):
+        branch = {fields[j]: values[j] for j in range(i)}
+        branch[field] = {op: values[i]}
+        branches.append(branch)
+    return {"$or": branches}
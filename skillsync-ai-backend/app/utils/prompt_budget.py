@@ -0,0 +1,281 @@
+# app/utils/prompt_budget.py
+
+import os
+import re
+import unicodedata
+from collections import Counter
+from typing import List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from app.services.skill_matcher import extract_skills
+
+load_dotenv()
+
+# --- Budget settings (tokens of resume / JD text per prompt) ---
+PROMPT_BUDGET_ENABLED = os.getenv("PROMPT_BUDGET_ENABLED", "true").lower() == "true"
+PROMPT_MAX_RESUME_TOKENS = int(os.getenv("PROMPT_MAX_RESUME_TOKENS", 4000))
+PROMPT_MAX_JD_TOKENS = int(os.getenv("PROMPT_MAX_JD_TOKENS", 1500))
+# tokenizer.json used for counting; defaults to the embedding model's tokenizer when configured.
+# Without one, tokens are estimated at ~4 characters each.
+PROMPT_TOKENIZER_PATH = os.getenv("PROMPT_TOKENIZER_PATH") or (
+    os.path.join(os.getenv("EMBEDDING_MODEL_DIR"), "tokenizer.json") if os.getenv("EMBEDDING_MODEL_DIR") else None
+)
+
+_CHARS_PER_TOKEN = 4
+
+# Page furniture and filler that carry no signal for matching
+_BOILERPLATE = re.compile(
+    r"^(page\s+\d+(\s+of\s+\d+)?|-\s*\d{1,3}\s*-|\d{1,2}|\d{1,2}\s*/\s*\d{1,2}|curriculum\s+vitae|r[eé]sum[eé]|"
+    r"references\s+(are\s+)?available\s+(up)?on\s+request\.?|confidential)$",
+    re.IGNORECASE
+)
+_JD_BOILERPLATE = re.compile(
+    r"equal\s+opportunity\s+employer|regardless\s+of\s+(race|age|gender)|"
+    r"reasonable\s+accommodation|e-verify",
+    re.IGNORECASE
+)
+_SECTION_NAMES = {
+    "summary", "profile", "professional summary", "objective", "career objective", "about me",
+    "experience", "work experience", "professional experience", "employment", "employment history",
+    "education", "skills", "technical skills", "core competencies", "key skills",
+    "projects", "personal projects", "certifications", "certificates", "achievements", "awards",
+    "publications", "languages", "interests", "hobbies", "volunteering", "activities",
+    "responsibilities", "requirements", "qualifications", "preferred qualifications",
+    "nice to have", "benefits", "what you'll do", "what we offer", "about the role", "about us"
+}
+_LOW_VALUE_SECTIONS = {"interests", "hobbies", "references", "about us", "benefits", "what we offer"}
+_BULLET = re.compile(r"^[•·▪●◦\-*]+\s*")
+_SPACES = re.compile(r"[ \t\u00a0]+")
+_WORD = re.compile(r"[a-z0-9+#.]+")
+_STOPWORDS = {
+    "the", "and", "for", "with", "you", "our", "are", "will", "have", "has", "this", "that",
+    "from", "your", "was", "were", "into", "using", "used", "able", "work", "team", "who", "all"
+}
+
+_tokenizer = None
+_tokenizer_loaded = False
+_stats = {
+    "requests": 0,
+    "tokens_before": 0,
+    "tokens_after": 0,
+    "truncated_inputs": 0,
+    "sections_dropped": 0
+}
+
+
+def _get_tokenizer():
+    global _tokenizer, _tokenizer_loaded
+    if not _tokenizer_loaded:
+        _tokenizer_loaded = True
+        if PROMPT_TOKENIZER_PATH and os.path.exists(PROMPT_TOKENIZER_PATH):
+            try:
+                from tokenizers import Tokenizer
+                _tokenizer = Tokenizer.from_file(PROMPT_TOKENIZER_PATH)
+                _tokenizer.no_truncation()
+                _tokenizer.no_padding()
+            except Exception as e:
+                print("❌ Failed to load prompt tokenizer, estimating tokens instead:", str(e))
+    return _tokenizer
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    tokenizer = _get_tokenizer()
+    if tokenizer is not None:
+        return len(tokenizer.encode(text, add_special_tokens=False).ids)
+    return (len(text) + _CHARS_PER_TOKEN - 1) // _CHARS_PER_TOKEN
+
+
+def _token_prefix_chars(text: str, max_tokens: int) -> int:
+    """Number of leading characters of `text` that fit in `max_tokens`."""
+    tokenizer = _get_tokenizer()
+    if tokenizer is None:
+        return min(len(text), max_tokens * _CHARS_PER_TOKEN)
+    offsets = tokenizer.encode(text, add_special_tokens=False).offsets
+    if len(offsets) <= max_tokens:
+        return len(text)
+    return offsets[max_tokens - 1][1] if max_tokens > 0 else 0
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cuts `text` to at most `max_tokens`, backing off to the last line or sentence break."""
+    end = _token_prefix_chars(text, max_tokens)
+    if end >= len(text):
+        return text
+    prefix = text[:end]
+    # Prefer a clean break as long as it keeps most of the allowance
+    for separator in ("\n", ". ", "; ", ", ", " "):
+        cut = prefix.rfind(separator)
+        if cut >= end // 2:
+            return prefix[:cut + (1 if separator != "\n" else 0)].rstrip()
+    return prefix.rstrip()
+
+
+# --- Compaction ---
+
+def compact_text(text: str, jd: bool = False) -> str:
+    """
+    Unicode/whitespace cleanup plus removal of page furniture: page numbers, "Curriculum Vitae"
+    banners, headers/footers repeated on every page, duplicated lines and (for JDs) EEO boilerplate.
+    Line structure is kept so section headings stay recognizable.
+    """
+    text = unicodedata.normalize("NFKC", text or "")
+    lines = [_clean_line(line) for line in text.splitlines()]
+
+    counts = Counter(line.lower() for line in lines if line)
+    first_line = next((line.lower() for line in lines if line), "")
+    seen = set()
+    kept = []
+    blank = False
+    for line in lines:
+        key = line.lower()
+        if not line:
+            # Collapse runs of blank lines to one
+            if kept and not blank:
+                kept.append("")
+            blank = True
+            continue
+        if _BOILERPLATE.match(line) or (jd and _JD_BOILERPLATE.search(line)):
+            continue
+        if key in seen and len(line) <= 80 and (key == first_line or counts[key] >= 3 or _is_heading(line)):
+            # Running headers / footers and repeated headings ("EXPERIENCE (cont.)" pages)
+            continue
+        seen.add(key)
+        kept.append(line)
+        blank = False
+    return "\n".join(kept).strip()
+
+
+def _clean_line(line: str) -> str:
+    line = _SPACES.sub(" ", line).strip()
+    # All bullet glyphs become "- "
+    if _BULLET.match(line):
+        stripped = _BULLET.sub("", line)
+        return f"- {stripped}" if stripped else ""
+    return line
+
+
+def _is_heading(line: str) -> bool:
+    stripped = line.strip().rstrip(":").strip()
+    if not stripped or len(stripped) > 40:
+        return False
+    if stripped.lower() in _SECTION_NAMES:
+        return True
+    letters = [c for c in stripped if c.isalpha()]
+    return len(letters) >= 3 and all(c.isupper() for c in letters) and len(stripped.split()) <= 4
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """Splits on heading lines; returns (heading, text) pairs, the first heading being '' for the preamble."""
+    sections = []
+    heading, body = "", []
+    for line in text.splitlines():
+        if _is_heading(line):
+            if heading or any(b.strip() for b in body):
+                sections.append((heading, "\n".join(body).strip()))
+            heading, body = line.strip(), []
+        else:
+            body.append(line)
+    if heading or any(b.strip() for b in body):
+        sections.append((heading, "\n".join(body).strip()))
+    return sections
+
+
+def _words(text: str) -> set:
+    return {w.strip(".") for w in _WORD.findall(text.lower()) if len(w) > 2 and w not in _STOPWORDS}
+
+
+def _relevance(heading: str, body: str, jd_skills: set, jd_words: set) -> float:
+    text = f"{heading}\n{body}"
+    skills = set(extract_skills(text))
+    words = _words(text)
+    score = 3.0 * len(skills & jd_skills) + len(words & jd_words) / (1 + len(words)) ** 0.5
+    if heading.strip().rstrip(":").lower() in _LOW_VALUE_SECTIONS:
+        score -= 10
+    return score
+
+
+def fit_resume(resume_text: str, max_tokens: int, jd_text: str = "") -> Tuple[str, int]:
+    """
+    Fits the resume into `max_tokens`. The preamble (name, contact, headline) always stays;
+    other sections are kept in order of relevance to the JD until the budget is used, the
+    last one cut at a clean break, and the result is put back in document order.
+    Returns (text, sections dropped).
+    """
+    if count_tokens(resume_text) <= max_tokens:
+        return resume_text, 0
+
+    sections = split_sections(resume_text)
+    jd_skills = set(extract_skills(jd_text)) if jd_text else set()
+    jd_words = _words(jd_text) if jd_text else set()
+
+    def priority(i: int):
+        # The untitled preamble first, then by relevance to the JD (document order without a JD)
+        is_preamble = i == 0 and sections[i][0] == ""
+        return (not is_preamble, -_relevance(*sections[i], jd_skills, jd_words) if jd_text else i)
+
+    order = sorted(range(len(sections)), key=priority)
+
+    remaining = max_tokens
+    chosen = {}
+    for i in order:
+        heading, body = sections[i]
+        block = f"{heading}\n{body}".strip()
+        cost = count_tokens(block) + 1
+        if cost <= remaining:
+            chosen[i] = block
+            remaining -= cost
+        elif remaining > 50:
+            chosen[i] = truncate_to_tokens(block, remaining - 1)
+            remaining = 0
+        if remaining <= 0:
+            break
+    text = "\n\n".join(chosen[i] for i in sorted(chosen))
+    return text, len(sections) - len(chosen)
+
+
+# --- Entry points ---
+
+def budget_prompt_inputs(resume_text: str, jd_text: Optional[str] = None) -> Tuple[str, Optional[str], dict]:
+    """
+    Compacts and fits the resume (and JD, if given) into the configured token budgets.
+    Returns (resume, jd, stats) where stats has the token counts before/after.
+    """
+    if not PROMPT_BUDGET_ENABLED:
+        return resume_text, jd_text, {}
+
+    before = count_tokens(resume_text) + count_tokens(jd_text or "")
+
+    jd = None
+    if jd_text is not None:
+        jd = compact_text(jd_text, jd=True)
+        if count_tokens(jd) > PROMPT_MAX_JD_TOKENS:
+            jd = truncate_to_tokens(jd, PROMPT_MAX_JD_TOKENS)
+            _stats["truncated_inputs"] += 1
+
+    compacted = compact_text(resume_text)
+    resume, dropped = fit_resume(compacted, PROMPT_MAX_RESUME_TOKENS, jd or "")
+    if resume is not compacted:
+        _stats["truncated_inputs"] += 1
+        _stats["sections_dropped"] += dropped
+
+    after = count_tokens(resume) + count_tokens(jd or "")
+    _stats["requests"] += 1
+    _stats["tokens_before"] += before
+    _stats["tokens_after"] += after
+    return resume, jd, {"tokens_before": before, "tokens_after": after, "tokens_saved": before - after}
+
+
+def get_budget_stats() -> dict:
+    saved = _stats["tokens_before"] - _stats["tokens_after"]
+    return {
+        **_stats,
+        "enabled": PROMPT_BUDGET_ENABLED,
+        "tokenizer": "tokenizers" if _get_tokenizer() is not None else "estimate",
+        "max_resume_tokens": PROMPT_MAX_RESUME_TOKENS,
+        "max_jd_tokens": PROMPT_MAX_JD_TOKENS,
+        "tokens_saved": saved,
+        "avg_tokens_saved": round(saved / _stats["requests"], 1) if _stats["requests"] else 0.0
+    }
@@ -1,21 +1,4 @@
 # app/utils/resume_parser.py
 
-import fitz  # PyMuPDF
-
-def parse_resume(file_bytes: bytes, filename: str = ""):
-    try:
-        doc = fitz.open(stream=file_bytes, filetype="pdf")
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        word_count = len(text.split())
-        return {
-            "parsed_text": text,
-            "word_count": word_count
-        }
-    except Exception as e:
-        return {
-            "parsed_text": "",
-            "word_count": 0,
-            "error": str(e)
-        }
+# The extraction engine lives in app/services/resume_parser.py; this module keeps the old import path working.
+from app.services.resume_parser import parse_resume, iter_pages, detect_format, SUPPORTED_CONTENT_TYPES  # noqa: F401
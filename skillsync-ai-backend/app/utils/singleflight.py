@@ -0,0 +1,37 @@
+# app/utils/singleflight.py
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls for the same key into one execution.
+    The first caller starts `fn` in its own task; every caller (the first one included) awaits
+    that task through shield(), so a caller that is cancelled - e.g. its client disconnected -
+    only stops waiting and never cancels the call the others are sharing.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.coalesced = 0
+
+    def _done(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            self._inflight.pop(key, None)
+        # Mark retrieved so a failure nobody is still awaiting does not log "exception never retrieved"
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.get_running_loop().create_task(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._inflight)
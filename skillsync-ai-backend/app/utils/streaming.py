@@ -0,0 +1,39 @@
+# app/utils/streaming.py
+
+import json
+from typing import AsyncIterator
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+STREAM_FORMATS = "^(ndjson|sse)$"
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream"
+}
+
+
+def encode_event(event: dict, fmt: str = "ndjson") -> str:
+    """One event as an NDJSON line or an SSE frame (named after the event's "event" key)."""
+    payload = json.dumps(jsonable_encoder(event))
+    if fmt == "sse":
+        return f"event: {event.get('event', 'message')}\ndata: {payload}\n\n"
+    return payload + "\n"
+
+
+def event_stream(events: AsyncIterator[dict], fmt: str = "ndjson") -> StreamingResponse:
+    """Streams dict events as they are produced; closes the source if the client goes away."""
+
+    async def body():
+        try:
+            async for event in events:
+                yield encode_event(event, fmt)
+        finally:
+            await events.aclose()
+
+    return StreamingResponse(
+        body(),
+        media_type=STREAM_MEDIA_TYPES[fmt],
+        # Keep proxies (nginx) from buffering the whole stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,304 @@
+# app/utils/telemetry.py
+
+import asyncio
+import os
+import re
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+from pymongo import monitoring
+
+load_dotenv()
+
+# --- Settings ---
+TELEMETRY_ENABLED = os.getenv("TELEMETRY_ENABLED", "true").lower() == "true"
+OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "skillsync-ai-backend")
+# OTLP/gRPC collector, e.g. http://localhost:4317 (traces and metrics)
+OTEL_EXPORTER_OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+# Finished spans as JSON lines, for local runs without a collector
+OTEL_TRACES_FILE = os.getenv("OTEL_TRACES_FILE")
+OTEL_METRIC_EXPORT_INTERVAL_MS = int(os.getenv("OTEL_METRIC_EXPORT_INTERVAL_MS", 15000))
+
+# Seconds; shared by every duration histogram
+DURATION_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+
+# The SDK and exporters are optional: without them every helper below is a no-op
+try:
+    from opentelemetry import metrics, trace
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.metrics.export import InMemoryMetricReader, PeriodicExportingMetricReader
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+    OTEL_AVAILABLE = True
+except ImportError:
+    OTEL_AVAILABLE = False
+
+_prometheus_reader = None
+_tracer = None
+_histograms: Dict[str, object] = {}
+
+
+def _setup():
+    global _prometheus_reader, _tracer
+    resource = Resource.create({"service.name": OTEL_SERVICE_NAME})
+
+    tracer_provider = TracerProvider(resource=resource)
+    if OTEL_EXPORTER_OTLP_ENDPOINT:
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        tracer_provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=OTEL_EXPORTER_OTLP_ENDPOINT)))
+    if OTEL_TRACES_FILE:
+        traces_file = open(OTEL_TRACES_FILE, "a", encoding="utf-8")
+        tracer_provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter(
+            out=traces_file,
+            formatter=lambda span: span.to_json(indent=None) + "\n"
+        )))
+    trace.set_tracer_provider(tracer_provider)
+    _tracer = trace.get_tracer("app")
+
+    # Prometheus scrapes the in-memory reader through /metrics; OTLP gets periodic pushes
+    _prometheus_reader = InMemoryMetricReader()
+    readers = [_prometheus_reader]
+    if OTEL_EXPORTER_OTLP_ENDPOINT:
+        from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
+        readers.append(PeriodicExportingMetricReader(
+            OTLPMetricExporter(endpoint=OTEL_EXPORTER_OTLP_ENDPOINT),
+            export_interval_millis=OTEL_METRIC_EXPORT_INTERVAL_MS
+        ))
+    metrics.set_meter_provider(MeterProvider(resource=resource, metric_readers=readers))
+    meter = metrics.get_meter("app")
+
+    for name, description in (
+        ("http.server.request.duration", "HTTP request duration by route"),
+        ("llm.request.duration", "LLM provider call duration by route and model"),
+        ("parser.duration", "Resume extraction duration by format and backend"),
+        ("db.client.operation.duration", "MongoDB command duration by collection and command"),
+        ("scraper.duration", "Job-description scraper duration by source")
+    ):
+        _histograms[name] = meter.create_histogram(
+            name, unit="s", description=description, explicit_bucket_boundaries_advisory=DURATION_BUCKETS
+        )
+
+
+if TELEMETRY_ENABLED and OTEL_AVAILABLE:
+    _setup()
+
+
+def record(histogram: str, seconds: float, attributes: Optional[dict] = None):
+    if histogram in _histograms:
+        _histograms[histogram].record(seconds, attributes or {})
+
+
+@contextmanager
+def span(
+    name: str,
+    histogram: Optional[str] = None,
+    attributes: Optional[dict] = None,
+    kind: str = "internal",
+    labels: Optional[Tuple[str, ...]] = None
+):
+    """
+    Runs the block in a span and, with `histogram`, records its duration there. The yielded dict
+    can add span attributes before the block ends. The histogram is labelled with `labels`
+    (default: all attributes) plus `outcome` ("ok"/"error"/"cancelled"), so keep per-request
+    values out of it.
+    """
+    attributes = dict(attributes or {})
+    started = time.perf_counter()
+    outcome = "ok"
+
+    def observe():
+        if histogram:
+            keys = attributes.keys() if labels is None else labels
+            values = {key: attributes[key] for key in keys if key in attributes}
+            record(histogram, time.perf_counter() - started, {**values, "outcome": outcome})
+    if _tracer is None:
+        try:
+            yield attributes
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            observe()
+        return
+
+    with _tracer.start_as_current_span(name, kind=getattr(SpanKind, kind.upper()), record_exception=True) as current:
+        try:
+            yield attributes
+        except asyncio.CancelledError:
+            # Cancelled work (e.g. a losing hedged request) is not an error
+            outcome = "cancelled"
+            raise
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            for key, value in attributes.items():
+                current.set_attribute(key, value)
+            observe()
+
+
+def traced(name: str, histogram: Optional[str] = None, **attributes):
+    """Decorator form of `span` for coroutine functions."""
+    def decorator(fn):
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with span(name, histogram, attributes):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# --- HTTP ---
+
+class TelemetryMiddleware:
+    """ASGI middleware: one server span and one duration sample per request, labelled by route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _tracer is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        with _tracer.start_as_current_span(f"{scope['method']} {scope['path']}", kind=SpanKind.SERVER) as current:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                # FastAPI puts the matched route in the scope; its template keeps label cardinality low
+                route = getattr(scope.get("route"), "path", None) or "unmatched"
+                current.update_name(f"{scope['method']} {route}")
+                current.set_attribute("http.request.method", scope["method"])
+                current.set_attribute("http.route", route)
+                current.set_attribute("http.response.status_code", status["code"])
+                if status["code"] >= 500:
+                    current.set_status(Status(StatusCode.ERROR))
+                record("http.server.request.duration", time.perf_counter() - started, {
+                    "http.request.method": scope["method"],
+                    "http.route": route,
+                    "http.response.status_code": status["code"]
+                })
+
+
+# --- MongoDB ---
+
+class MongoCommandListener(monitoring.CommandListener):
+    """One client span and duration sample per MongoDB command (Motor runs them on its thread pool)."""
+
+    def __init__(self):
+        self._spans = {}
+
+    @staticmethod
+    def _collection(event) -> str:
+        if event.command_name in ("getMore",):
+            return str(event.command.get("collection", ""))
+        value = event.command.get(event.command_name)
+        return value if isinstance(value, str) else ""
+
+    def started(self, event):
+        if _tracer is None:
+            return
+        collection = self._collection(event)
+        current = _tracer.start_span(f"mongo {event.command_name} {collection}".strip(), kind=SpanKind.CLIENT, attributes={
+            "db.system": "mongodb",
+            "db.namespace": event.database_name,
+            "db.collection.name": collection,
+            "db.operation.name": event.command_name
+        })
+        self._spans[(event.request_id, event.connection_id)] = (current, collection)
+
+    def _finish(self, event, outcome: str):
+        entry = self._spans.pop((event.request_id, event.connection_id), None)
+        if entry is None:
+            return
+        current, collection = entry
+        if outcome == "error":
+            current.set_status(Status(StatusCode.ERROR, str(event.failure.get("errmsg", ""))))
+        current.end()
+        record("db.client.operation.duration", event.duration_micros / 1e6, {
+            "db.collection.name": collection,
+            "db.operation.name": event.command_name,
+            "outcome": outcome
+        })
+
+    def succeeded(self, event):
+        self._finish(event, "ok")
+
+    def failed(self, event):
+        self._finish(event, "error")
+
+
+mongo_listener = MongoCommandListener()
+
+
+# --- Prometheus ---
+
+_INVALID_NAME = re.compile(r"[^a-zA-Z0-9_:]")
+
+
+def _metric_name(name: str, unit: str) -> str:
+    name = _INVALID_NAME.sub("_", name)
+    return name + "_seconds" if unit == "s" and not name.endswith("_seconds") else name
+
+
+def _labels(attributes: dict, extra: Optional[dict] = None) -> str:
+    items = {**{_INVALID_NAME.sub("_", k): v for k, v in attributes.items()}, **(extra or {})}
+    if not items:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for v in items.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(items, escaped)) + "}"
+
+
+def render_prometheus() -> str:
+    """Current metric values in the Prometheus text exposition format."""
+    if _prometheus_reader is None:
+        return ""
+    data = _prometheus_reader.get_metrics_data()
+    lines = []
+    for resource_metrics in (data.resource_metrics if data else []):
+        for scope_metrics in resource_metrics.scope_metrics:
+            for metric in scope_metrics.metrics:
+                name = _metric_name(metric.name, metric.unit)
+                points = metric.data.data_points
+                if hasattr(points[0] if points else None, "bucket_counts"):
+                    lines += [f"# HELP {name} {metric.description}", f"# TYPE {name} histogram"]
+                    for point in points:
+                        cumulative = 0
+                        for bound, count in zip([*point.explicit_bounds, "+Inf"], point.bucket_counts):
+                            cumulative += count
+                            lines.append(f"{name}_bucket{_labels(point.attributes, {'le': bound})} {cumulative}")
+                        lines.append(f"{name}_sum{_labels(point.attributes)} {point.sum}")
+                        lines.append(f"{name}_count{_labels(point.attributes)} {point.count}")
+                else:
+                    kind = "counter" if getattr(metric.data, "is_monotonic", False) else "gauge"
+                    lines += [f"# HELP {name} {metric.description}", f"# TYPE {name} {kind}"]
+                    for point in points:
+                        lines.append(f"{name}{_labels(point.attributes)} {point.value}")
+    return "\n".join(lines) + "\n"
+
+
+def register_gauge(name: str, description: str, read):
+    """Observable gauge whose value `read()` returns at scrape/export time."""
+    if not _histograms:
+        return
+
+    def callback(options):
+        yield metrics.Observation(read())
+
+    metrics.get_meter("app").create_observable_gauge(name, callbacks=[callback], description=description)
@@ -0,0 +1,18 @@
+# app/utils/text_utils.py
+
+import hashlib
+import re
+import unicodedata
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalizes unicode and whitespace so trivially different copies of a text compare equal."""
+    text = unicodedata.normalize("NFKC", text or "")
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of the normalized text; used as a stable id for deduplicated documents."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
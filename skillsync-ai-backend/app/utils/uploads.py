@@ -0,0 +1,282 @@
+# app/utils/uploads.py
+
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional
+
+from dotenv import load_dotenv
+from fastapi import Request
+
+from app.services.resume_parser import sniff_format
+
+# Same import fallback as Starlette: python-multipart renamed its module in 0.0.13
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:
+    from multipart.multipart import MultipartParser, parse_options_header
+
+load_dotenv()
+
+# --- Upload settings ---
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", 5 * 1024 * 1024))
+# Files larger than this are written to a temp file instead of being kept in memory
+UPLOAD_SPOOL_THRESHOLD_BYTES = int(os.getenv("UPLOAD_SPOOL_THRESHOLD_BYTES", 256 * 1024))
+UPLOAD_TMP_DIR = os.getenv("UPLOAD_TMP_DIR") or None
+UPLOAD_CHUNK_BYTES = 64 * 1024
+# Non-file form fields (e.g. jd_text) are kept in memory; cap them as well
+UPLOAD_MAX_FIELD_BYTES = int(os.getenv("UPLOAD_MAX_FIELD_BYTES", 1024 * 1024))
+# Bytes needed to recognise the format (PDF allows junk before its header)
+SNIFF_BYTES = 1024
+
+SUPPORTED_FORMATS = ("pdf", "docx", "txt")
+
+
+class UploadRejected(Exception):
+    """An upload refused while it was still arriving. `kind` is "type", "size" or "form"."""
+
+    def __init__(self, kind: str, message: str):
+        super().__init__(message)
+        self.kind = kind
+        self.message = message
+
+
+class ReceivedUpload:
+    """
+    A fully received, validated upload: small files in memory (`content`), larger ones in a
+    temp file (`path`) that the parser memory-maps. `error` is set instead when the file was
+    refused mid-stream (bulk uploads report it per file). Call `close()` to delete the temp file.
+    """
+
+    def __init__(self, filename: str, content_type: str, format: str = "unknown", size: int = 0,
+                 content: Optional[bytes] = None, path: Optional[str] = None,
+                 error: Optional[UploadRejected] = None):
+        self.filename = filename
+        self.content_type = content_type
+        self.format = format
+        self.size = size
+        self.content = content
+        self.path = path
+        self.error = error
+
+    async def read(self) -> bytes:
+        # Same interface as UploadFile, for code that needs the bytes
+        if self.path is not None:
+            with open(self.path, "rb") as f:
+                return f.read()
+        return self.content or b""
+
+    def close(self):
+        path, self.path = self.path, None
+        if path is not None:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+
+class _UploadSink:
+    """Receives one file chunk by chunk: sniffs the type, enforces the size limit, spools to disk."""
+
+    def __init__(self, filename: str, content_type: str, max_bytes: int = UPLOAD_MAX_BYTES):
+        self.filename = filename or ""
+        self.content_type = content_type or ""
+        self.max_bytes = max_bytes
+        self.format: Optional[str] = None
+        self.size = 0
+        self._buffer = bytearray()
+        self._file = None
+
+    def _check_type(self, head: bytes):
+        self.format = sniff_format(head, self.filename, self.content_type)
+        if self.format not in SUPPORTED_FORMATS:
+            raise UploadRejected("type", "Only PDF, TXT or DOCX files are supported.")
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise UploadRejected("size", f"File too large (max {self.max_bytes // (1024 * 1024)}MB).")
+        if self._file is not None:
+            self._file.write(chunk)
+            return
+        self._buffer += chunk
+        if self.format is None and len(self._buffer) >= SNIFF_BYTES:
+            self._check_type(bytes(self._buffer[:SNIFF_BYTES]))
+        if len(self._buffer) > max(UPLOAD_SPOOL_THRESHOLD_BYTES, SNIFF_BYTES):
+            self._file = tempfile.NamedTemporaryFile(prefix="upload-", dir=UPLOAD_TMP_DIR, delete=False)
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+
+    def finish(self) -> ReceivedUpload:
+        if self.format is None:
+            self._check_type(bytes(self._buffer[:SNIFF_BYTES]))
+        upload = ReceivedUpload(self.filename, self.content_type, self.format, self.size)
+        if self._file is not None:
+            self._file.close()
+            upload.path = self._file.name
+        else:
+            upload.content = bytes(self._buffer)
+        return upload
+
+    def abort(self):
+        self._buffer = bytearray()
+        if self._file is not None:
+            self._file.close()
+            try:
+                os.unlink(self._file.name)
+            except FileNotFoundError:
+                pass
+            self._file = None
+
+
+@dataclass
+class FormPart:
+    """One multipart part: a form field (`value`) or a file (`upload`)."""
+    name: str
+    value: Optional[str] = None
+    upload: Optional[ReceivedUpload] = None
+
+    @property
+    def is_file(self) -> bool:
+        return self.upload is not None
+
+
+def check_content_length(request: Request, max_bytes: int):
+    """Rejects a request whose declared body size already exceeds the limit, before reading it."""
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        raise UploadRejected("size", f"Upload too large (max {max_bytes // (1024 * 1024)}MB).")
+
+
+async def iter_multipart(request: Request, max_bytes: int = UPLOAD_MAX_BYTES, skip_rejected: bool = False) -> AsyncIterator[FormPart]:
+    """
+    Parses a multipart/form-data body straight from the socket and yields each part as soon as
+    it has arrived, so a file can be processed while the next one is still uploading and the body
+    is never held whole (in memory or in Starlette's spooled files).
+    Each file is sniffed from its first KB and cut off as soon as it passes `max_bytes`; the
+    rejection is raised, or with `skip_rejected` yielded as a ReceivedUpload carrying `error`
+    while the rest of that part is discarded.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise UploadRejected("form", "Expected a multipart/form-data body.")
+
+    events: List[tuple] = []
+    headers = {}
+    header_field = bytearray()
+    header_value = bytearray()
+
+    def on_header_field(data, start, end):
+        header_field.extend(data[start:end])
+
+    def on_header_value(data, start, end):
+        header_value.extend(data[start:end])
+
+    def on_header_end():
+        headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished():
+        events.append(("begin", dict(headers)))
+        headers.clear()
+
+    def on_part_data(data, start, end):
+        events.append(("data", bytes(data[start:end])))
+
+    def on_part_end():
+        events.append(("end", None))
+
+    parser = MultipartParser(boundary, {
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end
+    })
+
+    name = None
+    sink: Optional[_UploadSink] = None
+    rejected: Optional[UploadRejected] = None
+    field = bytearray()
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            pending, events[:] = events[:], []
+            for event, payload in pending:
+                if event == "begin":
+                    _, options = parse_options_header(payload.get(b"content-disposition", b""))
+                    name = options.get(b"name", b"").decode("utf-8", errors="replace")
+                    field.clear()
+                    rejected = None
+                    if b"filename" in options:
+                        sink = _UploadSink(
+                            options[b"filename"].decode("utf-8", errors="replace"),
+                            payload.get(b"content-type", b"").decode("latin-1"),
+                            max_bytes
+                        )
+                elif event == "data":
+                    if rejected is not None:
+                        continue
+                    if sink is None:
+                        field.extend(payload)
+                        if len(field) > UPLOAD_MAX_FIELD_BYTES:
+                            raise UploadRejected("form", f"Form field {name} is too large.")
+                        continue
+                    try:
+                        sink.write(payload)
+                    except UploadRejected as e:
+                        sink.abort()
+                        if not skip_rejected:
+                            raise
+                        rejected = e
+                elif event == "end":
+                    if sink is None:
+                        yield FormPart(name, value=field.decode("utf-8", errors="replace"))
+                        continue
+                    current, sink = sink, None
+                    if rejected is None:
+                        try:
+                            upload = current.finish()
+                        except UploadRejected as e:
+                            current.abort()
+                            if not skip_rejected:
+                                raise
+                            rejected = e
+                    if rejected is not None:
+                        upload = ReceivedUpload(current.filename, current.content_type, current.format or "unknown",
+                                                current.size, error=rejected)
+                    yield FormPart(name, upload=upload)
+        parser.finalize()
+    finally:
+        # Stopped early (rejection, client gone): don't leave a half-written temp file behind
+        if sink is not None:
+            sink.abort()
+
+
+async def receive_single_file(request: Request, field: str = "file", max_bytes: int = UPLOAD_MAX_BYTES) -> ReceivedUpload:
+    """The `field` file of a multipart request, streamed with the checks above."""
+    # Boundaries and part headers add little; a body declared far above the limit is refused unread
+    check_content_length(request, max_bytes + 64 * 1024)
+    parts = iter_multipart(request, max_bytes)
+    try:
+        async for part in parts:
+            if part.is_file and part.name == field:
+                return part.upload
+            if part.is_file:
+                part.upload.close()
+    finally:
+        await parts.aclose()
+    raise UploadRejected("form", f"Missing file field '{field}'.")
+
+
+def multipart_openapi(required: List[str], **properties) -> dict:
+    """OpenAPI request body for endpoints that parse multipart themselves (no File()/Form() params)."""
+    return {"requestBody": {"required": True, "content": {"multipart/form-data": {"schema": {
+        "type": "object", "properties": properties, "required": required
+    }}}}}
+
+
+FILE_PROPERTY = {"type": "string", "format": "binary"}
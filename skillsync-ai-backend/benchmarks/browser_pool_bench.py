@@ -0,0 +1,127 @@
+# benchmarks/browser_pool_bench.py
+"""
+Browser-pool benchmark against locally served JD fixtures (benchmarks/fixtures/jd_pages):
+compares launching Chromium per request (the old scraper) with leasing pages from the pool,
+and checks that the LinkedIn scraper extracts the fixture's description.
+
+    python -m benchmarks.browser_pool_bench --requests 40 --concurrency 4
+
+Needs Chromium for Playwright (`playwright install chromium`).
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "jd_pages")
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def send_head(self):
+        # Stylesheets, fonts and images referenced by the fixtures are served as small dummies
+        if self.path.startswith("/static/"):
+            self.send_response(200)
+            self.send_header("Content-Length", "1024")
+            self.end_headers()
+            self.wfile.write(b"\0" * 1024)
+            return None
+        return super().send_head()
+
+
+def serve_fixtures(port: int = 0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", port), functools.partial(_QuietHandler, directory=FIXTURES_DIR))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _percentiles(values: List[float]) -> dict:
+    ordered = sorted(values)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 1) if ordered else None
+    return {"p50_ms": pick(0.5), "p95_ms": pick(0.95), "max_ms": pick(1.0)}
+
+
+async def _per_request(url: str) -> str:
+    # The scraper before the pool: a new Chromium process and context for every call
+    from playwright.async_api import async_playwright
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            page = await (await browser.new_context()).new_page()
+            await page.goto(url, timeout=60000)
+            await page.wait_for_selector("div.description__text", timeout=10000)
+            return (await page.inner_text("div.description__text")).strip()
+        finally:
+            await browser.close()
+
+
+async def _run(mode: str, url: str, requests: int, concurrency: int) -> dict:
+    from app.utils.jd_scrapers import extract_jd_from_linkedin
+
+    fetch = extract_jd_from_linkedin if mode == "pool" else _per_request
+    gate = asyncio.Semaphore(concurrency)
+    latencies, failures = [], 0
+
+    async def one():
+        nonlocal failures
+        async with gate:
+            started = time.perf_counter()
+            try:
+                text = await fetch(url)
+                if "FastAPI" not in text:
+                    failures += 1
+            except Exception:
+                failures += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "failures": failures,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 2),
+        **_percentiles(latencies)
+    }
+
+
+async def main_async(args) -> dict:
+    from app.services.browser_pool import browser_pool
+
+    server = serve_fixtures()
+    url = f"http://127.0.0.1:{server.server_address[1]}/linkedin.html"
+    results = {}
+    try:
+        if not args.skip_baseline:
+            print("▶ per-request launch")
+            results["per_request"] = await _run("per_request", url, args.requests, args.concurrency)
+        print("▶ pool")
+        await browser_pool.start()
+        results["pool"] = await _run("pool", url, args.requests, args.concurrency)
+        results["pool_stats"] = browser_pool.stats()
+    finally:
+        await browser_pool.stop()
+        server.shutdown()
+    return results
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Pooled vs per-request Chromium for JD scraping")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--skip-baseline", action="store_true", help="Only run the pool")
+    args = parser.parse_args(argv)
+    print(json.dumps(asyncio.run(main_async(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
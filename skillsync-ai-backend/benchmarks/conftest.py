@@ -0,0 +1,4 @@
+# benchmarks/conftest.py
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: slow performance checks, run with RUN_BENCHMARKS=1")
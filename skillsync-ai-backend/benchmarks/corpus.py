@@ -0,0 +1,176 @@
+# benchmarks/corpus.py
+"""Synthetic resumes and job descriptions for benchmarks (deterministic for a given seed)."""
+
+import random
+from typing import List
+
+import fitz  # PyMuPDF
+
+FIRST_NAMES = ["Aarav", "Priya", "Daniel", "Mei", "Carlos", "Fatima", "John", "Sara", "Kenji", "Olga"]
+LAST_NAMES = ["Sharma", "Nguyen", "Smith", "Garcia", "Khan", "Ivanova", "Tanaka", "Brown", "Okafor", "Rossi"]
+SKILLS = [
+    "Python", "FastAPI", "Django", "Flask", "MongoDB", "PostgreSQL", "Redis", "Docker", "Kubernetes",
+    "AWS", "GCP", "Terraform", "React", "TypeScript", "Node.js", "Java", "Spring Boot", "Go",
+    "Kafka", "Airflow", "Pandas", "PyTorch", "TensorFlow", "SQL", "Git", "CI/CD", "GraphQL", "REST APIs"
+]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Tech", "Hooli"]
+TITLES = ["Software Engineer", "Backend Developer", "Data Engineer", "ML Engineer", "Full Stack Developer"]
+VERBS = ["Built", "Designed", "Led", "Migrated", "Optimized", "Automated", "Scaled", "Maintained"]
+OBJECTS = [
+    "a REST API serving 2M requests/day", "the payments ingestion pipeline", "an internal analytics dashboard",
+    "the CI/CD workflow for 40 services", "a recommendation service", "the search indexing jobs",
+    "customer onboarding flows", "a real-time notification system"
+]
+
+JOB_DESCRIPTION = """Senior Backend Engineer
+
+About the role
+We are looking for a backend engineer to build and scale our hiring platform APIs.
+
+Responsibilities
+- Design and build REST APIs with Python and FastAPI
+- Own MongoDB data models and query performance
+- Run services on Docker and Kubernetes in AWS
+- Work with product and data teams on matching features
+
+Requirements
+- 4+ years of Python
+- FastAPI or Django, MongoDB or PostgreSQL
+- Docker, CI/CD, AWS
+- Nice to have: Redis, Kafka, Terraform
+
+We are an equal opportunity employer."""
+
+
+def make_resume_text(index: int, rng: random.Random, roles: int = 3, bullets: int = 4) -> str:
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    skills = rng.sample(SKILLS, k=rng.randint(6, 12))
+    lines = [
+        name,
+        f"{rng.choice(TITLES)} | candidate-{index}@example.com | +1 555 {index % 10000:04d}",
+        "",
+        "SUMMARY",
+        f"{rng.choice(TITLES)} with {rng.randint(2, 12)} years of experience in {', '.join(skills[:3])}.",
+        "",
+        "EXPERIENCE"
+    ]
+    for _ in range(roles):
+        lines.append(f"{rng.choice(TITLES)} - {rng.choice(COMPANIES)} ({rng.randint(2012, 2020)} - {rng.randint(2021, 2025)})")
+        for _ in range(bullets):
+            lines.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(skills)}")
+    lines += [
+        "",
+        "SKILLS",
+        ", ".join(skills),
+        "",
+        "EDUCATION",
+        f"B.Tech in Computer Science, {rng.choice(['IIT Madras', 'MIT', 'TU Munich', 'NUS'])} ({rng.randint(2008, 2018)})",
+        "",
+        "HOBBIES",
+        "Chess, hiking, photography"
+    ]
+    return "\n".join(lines)
+
+
+def make_pdf(text: str, pages: int = 1) -> bytes:
+    """Renders the text onto `pages` A4 pages (the text is repeated on every page)."""
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 545, 792), text, fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def make_resumes(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return [make_resume_text(i, rng) for i in range(count)]
+
+
+# --- Parser corpus: varied formats, sizes and layouts, with the text they were built from ---
+
+LAYOUTS = ["single", "two_column", "dense"]
+
+
+def _pdf_page(doc, text: str, layout: str):
+    page = doc.new_page()
+    if layout == "two_column":
+        lines = text.splitlines()
+        half = (len(lines) + 1) // 2
+        page.insert_textbox(fitz.Rect(40, 50, 290, 800), "\n".join(lines[:half]), fontsize=8)
+        page.insert_textbox(fitz.Rect(305, 50, 555, 800), "\n".join(lines[half:]), fontsize=8)
+    else:
+        page.insert_textbox(fitz.Rect(40, 40, 555, 810), text, fontsize=6.5 if layout == "dense" else 9)
+
+
+def make_layout_pdf(pages: List[str], layout: str = "single") -> bytes:
+    """One PDF page per text; each text must fit on its page for the reference to be exact."""
+    doc = fitz.open()
+    for text in pages:
+        _pdf_page(doc, text, layout)
+    data = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return data
+
+
+def make_docx(text: str) -> bytes:
+    """Minimal DOCX (just the parts the parser reads)."""
+    import io
+    import zipfile
+    from xml.sax.saxutils import escape
+
+    body = "".join(f"<w:p><w:r><w:t xml:space=\"preserve\">{escape(line)}</w:t></w:r></w:p>" for line in text.splitlines())
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{body}</w:body></w:document>"
+    )
+    content_types = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        "</Types>"
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", content_types)
+        archive.writestr("word/document.xml", document)
+    return buffer.getvalue()
+
+
+def make_parser_corpus(count: int, seed: int = 0, damaged_rate: float = 0.05) -> List[dict]:
+    """
+    Documents as {'name', 'format', 'layout', 'pages', 'content', 'reference', 'damaged'}.
+    About 70% PDFs (1-20 pages, all layouts), 15% TXT (utf-8 / cp1252 / utf-16) and 15% DOCX.
+    A share of the PDFs is truncated to exercise PyMuPDF's repair and the pdfplumber fallback.
+    """
+    rng = random.Random(seed)
+    docs = []
+    for i in range(count):
+        roll = rng.random()
+        page_count = rng.choice([1, 1, 2, 2, 3, 5, 10, 20])
+        pages = [make_resume_text(i * 100 + p, rng, roles=2, bullets=4) for p in range(page_count)]
+        reference = "\n".join(pages)
+        doc = {"name": f"doc-{i:04d}", "pages": page_count, "reference": reference, "damaged": False}
+        if roll < 0.70:
+            layout = rng.choice(LAYOUTS)
+            content = make_layout_pdf(pages, layout)
+            if rng.random() < damaged_rate:
+                # Drop the xref table and trailer
+                content = content[:int(len(content) * 0.9)]
+                doc["damaged"] = True
+            doc.update(name=doc["name"] + ".pdf", format="pdf", layout=layout, content=content)
+        elif roll < 0.85:
+            encoding = rng.choice(["utf-8", "cp1252", "utf-16"])
+            text = reference.replace("Rossi", "Rossé")
+            doc.update(
+                name=doc["name"] + ".txt", format="txt", layout=encoding, pages=1,
+                content=text.encode(encoding), reference=text
+            )
+        else:
+            doc.update(name=doc["name"] + ".docx", format="docx", layout="docx", pages=1, content=make_docx(reference))
+        docs.append(doc)
+    return docs
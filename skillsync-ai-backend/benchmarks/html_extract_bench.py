@@ -0,0 +1,151 @@
+# benchmarks/html_extract_bench.py
+"""
+JD extraction benchmark over the saved pages in benchmarks/fixtures/jd_pages: pages/sec for the
+old BeautifulSoup(html.parser) path against each backend of app.utils.html_extract, including the
+early-terminating lxml stream. Fixtures are padded with navigation markup before the description
+and scripts/footer after it, so page sizes resemble real job pages.
+
+    python -m benchmarks.html_extract_bench --pad-kb 300 --seconds 3
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+from app.utils import html_extract
+from benchmarks.browser_pool_bench import FIXTURES_DIR
+from benchmarks.parser_bench import RESULTS_DIR, text_similarity
+
+# Fixture file -> site key in html_extract.SITE_SELECTORS
+FIXTURES = {"indeed.html": "indeed", "google_jobs.html": "google_jobs", "linkedin.html": "linkedin"}
+CHUNK_SIZE = 16 * 1024
+
+# What extract_from_indeed / extract_from_google_jobs did before the extraction layer
+_LEGACY_FIND = {
+    "indeed": lambda soup: soup.find("div", {"id": "jobDescriptionText"}),
+    "google_jobs": lambda soup: soup.find("div", {"class": "job-description"}),
+    "linkedin": lambda soup: soup.find("div", {"class": "description__text"})
+}
+
+
+def _pad(html: str, pad_kb: int, rng: random.Random) -> str:
+    """Adds ~10% of `pad_kb` of nav links before the description and the rest as scripts/footer after it."""
+    if pad_kb <= 0:
+        return html
+    before = "".join(
+        f'<li class="nav-item"><a href="/jobs?q=role{i}&l=city{rng.randint(0, 99)}">Role {i}</a></li>'
+        for i in range(pad_kb * 1024 // 10 // 70)
+    )
+    after = "".join(
+        f'<script type="application/json">{{"impression":"{rng.getrandbits(64):x}","slot":{i}}}</script>'
+        f'<div class="footer-link"><a href="/about/{i}">About {i}</a></div>'
+        for i in range(pad_kb * 1024 * 9 // 10 // 130)
+    )
+    html = html.replace("<body>", f'<body><ul class="nav">{before}</ul>', 1)
+    return html.replace("</body>", f"{after}</body>", 1)
+
+
+def load_pages(pad_kb: int, seed: int = 0) -> List[dict]:
+    rng = random.Random(seed)
+    pages = []
+    for name, site in FIXTURES.items():
+        with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+            html = _pad(f.read(), pad_kb, rng)
+        pages.append({"name": name, "site": site, "html": html, "raw": html.encode("utf-8")})
+    return pages
+
+
+def _legacy(page: dict) -> str:
+    node = _LEGACY_FIND[page["site"]](BeautifulSoup(page["html"], "html.parser"))
+    return node.get_text(strip=True) if node else ""
+
+
+def _backend(name: str) -> Callable[[dict], str]:
+    return lambda page: html_extract.extract_text(page["html"], page["site"], backend=name)
+
+
+def _stream(page: dict) -> str:
+    extractor = html_extract.StreamingExtractor(page["site"])
+    raw = page["raw"]
+    for offset in range(0, len(raw), CHUNK_SIZE):
+        if extractor.feed(raw[offset:offset + CHUNK_SIZE]) is not None:
+            break
+    else:
+        extractor.close()
+    page.setdefault("stream_bytes", extractor.bytes_fed)
+    return extractor.result or ""
+
+
+def modes() -> Dict[str, Callable[[dict], str]]:
+    available = {"bs4_legacy": _legacy, "bs4": _backend("bs4")}
+    if html_extract.LXML_AVAILABLE:
+        available["lxml"] = _backend("lxml")
+        available["lxml_stream"] = _stream
+    if html_extract.SELECTOLAX_AVAILABLE:
+        available["selectolax"] = _backend("selectolax")
+    return available
+
+
+def run_mode(fn: Callable[[dict], str], pages: List[dict], seconds: float) -> dict:
+    count, started = 0, time.perf_counter()
+    outputs = {}
+    while time.perf_counter() - started < seconds or count < len(pages):
+        page = pages[count % len(pages)]
+        outputs[page["name"]] = fn(page)
+        count += 1
+    elapsed = time.perf_counter() - started
+    total_bytes = sum(len(p["raw"]) for p in pages) * count / len(pages)
+    return {
+        "pages": count,
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(count / elapsed, 1),
+        "mb_per_sec": round(total_bytes / 1e6 / elapsed, 2),
+        "outputs": outputs
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="JD HTML extraction benchmark")
+    parser.add_argument("--pad-kb", type=int, default=300, help="Markup added around each fixture (KB)")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Time budget per mode")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Result JSON path (default benchmarks/results/html-extract-<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    pages = load_pages(args.pad_kb, args.seed)
+    print(f"📚 {len(pages)} pages, {sum(len(p['raw']) for p in pages) / len(pages) / 1024:.0f} KB each on average")
+
+    results = {name: run_mode(fn, pages, args.seconds) for name, fn in modes().items()}
+    baseline = results["bs4_legacy"]["pages_per_sec"]
+    reference = results["bs4"]["outputs"]
+
+    header = f"{'mode':<14}{'pages/s':>10}{'MB/s':>9}{'speedup':>9}{'agreement':>11}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        outputs = r.pop("outputs")
+        # Legacy text glues blocks together, so it is compared on tokens like the rest
+        r["speedup"] = round(r["pages_per_sec"] / baseline, 2)
+        r["agreement"] = round(min(text_similarity(outputs[p["name"]], reference[p["name"]]) for p in pages), 4)
+        print(f"{name:<14}{r['pages_per_sec']:>10.1f}{r['mb_per_sec']:>9.2f}{r['speedup']:>8.2f}x{r['agreement']:>11.3f}")
+
+    if "lxml_stream" in results:
+        parsed = sum(p.get("stream_bytes", 0) for p in pages) / sum(len(p["raw"]) for p in pages)
+        results["lxml_stream"]["bytes_parsed_ratio"] = round(parsed, 4)
+        print(f"\nlxml_stream stopped after {parsed:.1%} of the bytes on average")
+
+    output = args.output or os.path.join(RESULTS_DIR, "html-extract-" + datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"config": vars(args), "modes": results}, f, indent=2)
+    print(f"\n📄 Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
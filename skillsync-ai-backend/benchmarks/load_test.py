@@ -0,0 +1,398 @@
+# benchmarks/load_test.py
+"""
+End-to-end load test: starts the mock OpenRouter and the app (uvicorn, in-process threads),
+drives each scenario with N concurrent clients and reports throughput, latency percentiles
+and the app's event-loop lag. Results are written as JSON; --compare flags regressions.
+
+    python -m benchmarks.load_test --mongo memory --scenarios match,bulk-match --concurrency 16 --duration 20
+    python -m benchmarks.load_test --mongo mongodb://127.0.0.1:27017 --compare benchmarks/results/baseline.json
+
+--mongo memory needs the optional `mongomock-motor` package; a URL uses a real (local) mongod.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks import corpus
+from benchmarks.mock_openrouter import add_arguments as add_mock_arguments, config_from_args, start_in_thread
+
+SCENARIOS = ["upload", "match", "insights", "bulk-match", "filter-matches"]
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+# --- Stats helpers ---
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(values: List[float], scale: float = 1000.0) -> dict:
+    """p50/p95/p99/max in milliseconds."""
+    return {
+        name: round(value * scale, 2) if value is not None else None
+        for name, value in (
+            ("p50_ms", percentile(values, 0.50)),
+            ("p95_ms", percentile(values, 0.95)),
+            ("p99_ms", percentile(values, 0.99)),
+            ("max_ms", max(values) if values else None)
+        )
+    }
+
+
+class LoopLagMonitor:
+    """Samples how late a periodic sleep wakes up on the app's loop (time the loop was blocked)."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - started - self.interval))
+
+
+# --- Environment ---
+
+def use_memory_mongo():
+    """Swaps the app's Motor database for an in-memory mongomock one (import before any app module)."""
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        sys.exit("❌ --mongo memory needs the optional `mongomock-motor` package (pip install mongomock-motor)")
+    import mongomock.collection
+
+    # pymongo >= 4.11 passes `sort` to update bulk ops, which mongomock doesn't accept yet
+    add_update = mongomock.collection.BulkOperationBuilder.add_update
+
+    def add_update_without_sort(self, *args, sort=None, **kwargs):
+        return add_update(self, *args, **kwargs)
+
+    mongomock.collection.BulkOperationBuilder.add_update = add_update_without_sort
+
+    import app.db.database as database
+    database.db = AsyncMongoMockClient().resume_analyzer
+
+
+def configure_environment(args, mock_url: str):
+    # Read by the app modules at import time, so this runs before importing app.main
+    os.environ["OPENROUTER_BASE_URL"] = mock_url
+    os.environ.setdefault("OPENROUTER_API_KEY", "benchmark")
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    for name in ("MAIL_USERNAME", "MAIL_PASSWORD", "MAIL_SERVER", "MAIL_FROM_NAME"):
+        os.environ.setdefault(name, "benchmark")
+    os.environ.setdefault("MAIL_FROM", "benchmark@example.com")
+    if args.mongo == "memory":
+        os.environ["MONGO_URL"] = "mongodb://127.0.0.1:1/?serverSelectionTimeoutMS=200"
+        use_memory_mongo()
+    else:
+        os.environ["MONGO_URL"] = args.mongo
+        os.environ.setdefault("MONGO_TLS", "false")
+
+
+async def seed_matches(count: int, seed: int):
+    """Match documents for the filter-matches scenario."""
+    from app.db.database import db
+    from app.services.skill_matcher import normalize_skills
+
+    rng = random.Random(seed)
+    await db.matches.delete_many({"benchmark": True})
+    docs = []
+    for i in range(count):
+        skills = rng.sample(corpus.SKILLS, k=rng.randint(3, 8))
+        docs.append({
+            "benchmark": True,
+            "resume_filename": f"seed-{i}.pdf",
+            "fit_percentage": rng.randint(0, 100),
+            "matching_skills": skills,
+            "matching_skills_lc": normalize_skills(skills),
+            "missing_skills": [],
+            "verdict": "seeded",
+            "created_at": datetime(2025, 1, 1 + i % 28, i % 24)
+        })
+    for start in range(0, len(docs), 1000):
+        await db.matches.insert_many(docs[start:start + 1000])
+
+
+def start_app(port: int, lag: LoopLagMonitor, seed_count: int, seed: int):
+    """Runs the app with uvicorn on its own thread and loop, with the lag monitor on that loop."""
+    import uvicorn
+    from app.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    ready = threading.Event()
+
+    async def serve():
+        if seed_count:
+            await seed_matches(seed_count, seed)
+        monitor = asyncio.create_task(lag.run())
+        ready.set()
+        try:
+            await server.serve()
+        finally:
+            monitor.cancel()
+
+    thread = threading.Thread(target=lambda: asyncio.run(serve()), daemon=True)
+    thread.start()
+    ready.wait()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+# --- Scenarios ---
+
+class Scenario:
+    def __init__(self, args, token: str):
+        self.args = args
+        self.token = token
+        self.rng = random.Random(args.seed)
+        self.counter = 0
+        # Inputs vary per request unless --repeat-inputs, so the LLM cache doesn't answer everything
+        self.fixed = corpus.make_resume_text(0, random.Random(args.seed))
+        self.pdf_cache: Dict[int, bytes] = {}
+
+    def resume_text(self) -> str:
+        self.counter += 1
+        if self.args.repeat_inputs:
+            return self.fixed
+        return corpus.make_resume_text(self.counter, self.rng)
+
+    def resume_pdf(self) -> bytes:
+        if self.args.repeat_inputs:
+            if 0 not in self.pdf_cache:
+                self.pdf_cache[0] = corpus.make_pdf(self.fixed)
+            return self.pdf_cache[0]
+        return corpus.make_pdf(self.resume_text())
+
+    def build(self, name: str) -> Callable[[httpx.AsyncClient], "asyncio.Future"]:
+        auth = {"Authorization": f"Bearer {self.token}"}
+
+        if name == "upload":
+            def request(client):
+                files = {"file": (f"r{self.counter}.pdf", self.resume_pdf(), "application/pdf")}
+                return client.post("/upload_resume/", files=files)
+        elif name == "match":
+            def request(client):
+                body = {"resume_text": self.resume_text(), "job_description": corpus.JOB_DESCRIPTION}
+                return client.post("/match_resume/", json=body, headers=auth)
+        elif name == "insights":
+            def request(client):
+                body = {"resume_text": self.resume_text(), "job_description": corpus.JOB_DESCRIPTION}
+                return client.post("/get-insights", json=body)
+        elif name == "bulk-match":
+            def request(client):
+                files = [
+                    ("resumes", (f"r{i}.pdf", self.resume_pdf(), "application/pdf"))
+                    for i in range(self.args.bulk_size)
+                ]
+                data = {"jd_text": corpus.JOB_DESCRIPTION}
+                if self.args.batched:
+                    data["batched"] = "true"
+                return client.post("/recruit/bulk-match", data=data, files=files)
+        elif name == "filter-matches":
+            def request(client):
+                skills = self.rng.sample(corpus.SKILLS, k=2)
+                params = [("min_score", self.rng.randint(0, 80)), ("limit", 50)] + [("skills", s) for s in skills]
+                return client.get("/recruit/filter-matches", params=params)
+        else:
+            raise ValueError(f"Unknown scenario: {name}")
+        return request
+
+
+async def run_scenario(name: str, scenario: Scenario, base_url: str, lag: LoopLagMonitor, mock_stats, args) -> dict:
+    request = scenario.build(name)
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    transport_errors = 0
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        # Warm-up (connections, parser pool, caches) is not measured
+        for _ in range(args.warmup):
+            try:
+                await request(client)
+            except httpx.HTTPError:
+                pass
+
+        llm_before = mock_stats.requests
+        lag_start = len(lag.samples)
+        deadline = time.monotonic() + args.duration
+        remaining = [args.requests] if args.requests else None
+
+        async def worker():
+            nonlocal transport_errors
+            while time.monotonic() < deadline:
+                if remaining is not None:
+                    if remaining[0] <= 0:
+                        return
+                    remaining[0] -= 1
+                # Inputs are built before the clock starts
+                call = request(client)
+                started = time.perf_counter()
+                try:
+                    response = await call
+                    status = str(response.status_code)
+                except httpx.HTTPError:
+                    transport_errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+                statuses[status] = statuses.get(status, 0) + 1
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.monotonic() - started
+
+    ok = sum(count for status, count in statuses.items() if status.startswith("2"))
+    loop_lag = lag.samples[lag_start:]
+    return {
+        "requests": len(latencies) + transport_errors,
+        "ok": ok,
+        "errors": len(latencies) - ok + transport_errors,
+        "status_codes": statuses,
+        "transport_errors": transport_errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(ok / elapsed, 3) if elapsed else 0.0,
+        "latency": summarize(latencies),
+        "event_loop_lag": summarize(loop_lag),
+        "llm_calls": mock_stats.requests - llm_before
+    }
+
+
+# --- Reporting ---
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(__file__)
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results: Dict[str, dict]):
+    header = f"{'scenario':<16}{'ok':>7}{'err':>6}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'lag p99':>10}{'llm':>7}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        lat, lag = r["latency"], r["event_loop_lag"]
+        print(
+            f"{name:<16}{r['ok']:>7}{r['errors']:>6}{r['throughput_rps']:>10.2f}"
+            f"{lat['p50_ms'] or 0:>10.1f}{lat['p95_ms'] or 0:>10.1f}{lat['p99_ms'] or 0:>10.1f}"
+            f"{lag['p99_ms'] or 0:>10.1f}{r['llm_calls']:>7}"
+        )
+
+
+def compare(results: Dict[str, dict], baseline_path: str, max_regression: float) -> bool:
+    """Prints deltas against a saved run; False if throughput or p95 regressed beyond the threshold."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["scenarios"]
+    passed = True
+    print(f"\nCompared with {baseline_path} (max regression {max_regression:.0%}):")
+    for name, r in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]
+        checks = [
+            ("throughput_rps", base["throughput_rps"], r["throughput_rps"], True),
+            ("p95_ms", base["latency"]["p95_ms"], r["latency"]["p95_ms"], False),
+            ("p99_ms", base["latency"]["p99_ms"], r["latency"]["p99_ms"], False)
+        ]
+        for metric, before, after, higher_is_better in checks:
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            regressed = -change > max_regression if higher_is_better else change > max_regression
+            passed = passed and not regressed
+            print(f"  {'❌' if regressed else '✅'} {name:<16}{metric:<16}{before:>10.2f} -> {after:>10.2f} ({change:+.1%})")
+    return passed
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="End-to-end load test against a mock LLM provider")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Comma-separated: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per scenario")
+    parser.add_argument("--requests", type=int, default=0, help="Stop each scenario after this many requests")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--bulk-size", type=int, default=20, help="Resumes per bulk-match request")
+    parser.add_argument("--batched", action="store_true", help="Use batched LLM prompts for bulk-match")
+    parser.add_argument("--repeat-inputs", action="store_true", help="Send identical inputs (measures cache hits)")
+    parser.add_argument("--seed-matches", type=int, default=5000, help="Match documents seeded for filter-matches")
+    parser.add_argument("--mongo", default="memory", help="'memory' (mongomock) or a MongoDB URL")
+    parser.add_argument("--app-port", type=int, default=18600)
+    parser.add_argument("--mock-port", type=int, default=18555)
+    parser.add_argument("--output", help="Result JSON path (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="Baseline result JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.15)
+    add_mock_arguments(parser)
+    args = parser.parse_args(argv)
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    mock = start_in_thread(config_from_args(args), args.mock_port)
+    mock_stats = mock.config.app.state.stats
+    configure_environment(args, f"http://127.0.0.1:{args.mock_port}")
+
+    lag = LoopLagMonitor()
+    server, thread = start_app(args.app_port, lag, args.seed_matches if "filter-matches" in scenarios else 0, args.seed)
+
+    from app.auth.auth_handler import create_access_token
+    scenario = Scenario(args, create_access_token({"sub": "benchmark@example.com"}))
+
+    results = {}
+    try:
+        for name in scenarios:
+            print(f"▶ {name} ({args.concurrency} clients, {args.duration:g}s)")
+            results[name] = asyncio.run(
+                run_scenario(name, scenario, f"http://127.0.0.1:{args.app_port}", lag, mock_stats, args)
+            )
+    finally:
+        server.should_exit = True
+        thread.join(timeout=30)
+        mock.should_exit = True
+
+    print()
+    print_report(results)
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "scenarios": results
+    }
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Results saved to {output}")
+
+    if args.compare and not compare(results, args.compare, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+# benchmarks/mock_openrouter.py
+"""
+OpenRouter-compatible stand-in for load tests: answers /chat/completions with canned JSON
+for each prompt the app sends, after a latency drawn from a configurable distribution,
+with optional 5xx / 429 injection. Supports `stream: true` (SSE deltas).
+
+    python -m benchmarks.mock_openrouter --port 18555 --latency lognormal:0.8,0.5 --throttle-rate 0.02
+    OPENROUTER_BASE_URL=http://127.0.0.1:18555 uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+# --- Canned answers, one per prompt template ---
+CANNED = {
+    "jd_matching": {
+        "fit_percentage": 72,
+        "matching_skills": ["Python", "FastAPI", "MongoDB"],
+        "missing_skills": ["Kubernetes"],
+        "strengths": ["Backend API design", "Async Python"],
+        "weaknesses": ["Limited cloud experience"],
+        "verdict": "Good fit for the role with minor gaps."
+    },
+    "resume_analysis": {
+        "skills": ["Python", "FastAPI", "SQL", "Communication"],
+        "summary": "Backend engineer with five years of Python experience.",
+        "suggestions": ["Quantify project impact", "Add a skills section"],
+        "job_fit_score": 78
+    },
+    "resume_improvement": {
+        "matching_skills": ["Python", "REST APIs"],
+        "missing_skills": ["Docker", "AWS"],
+        "tools_to_learn": ["Docker", "Terraform"],
+        "resources_to_explore": ["AWS Skill Builder", "Docker docs"],
+        "strengths": ["Strong Python fundamentals"],
+        "weaknesses": ["No infrastructure experience"],
+        "fit_summary": {
+            "technical_fit": "Solid",
+            "upside": "High",
+            "recommendation": "Interview",
+            "alternative_roles": ["Platform Engineer"]
+        }
+    },
+    "jd_matcher": {
+        "match_score": 70,
+        "matching_skills": ["Python"],
+        "missing_skills": ["Go"],
+        "strengths": ["APIs"],
+        "weaknesses": ["Cloud"],
+        "fit_statement": "Reasonable fit."
+    }
+}
+
+
+def canned_answer(prompt: str) -> str:
+    """Picks the canned JSON that matches the prompt template the app rendered."""
+    candidates = re.findall(r"^### Candidate (\d+)", prompt, flags=re.MULTILINE)
+    if candidates:
+        return json.dumps([{"candidate_id": int(i), **CANNED["jd_matching"]} for i in candidates])
+    if "tools_to_learn" in prompt:
+        return json.dumps(CANNED["resume_improvement"])
+    if "fit_percentage" in prompt:
+        return json.dumps(CANNED["jd_matching"])
+    if "job_fit_score" in prompt:
+        return json.dumps(CANNED["resume_analysis"])
+    if "match_score" in prompt:
+        return json.dumps(CANNED["jd_matcher"])
+    return json.dumps({"message": "ok"})
+
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """
+    Latency distribution in seconds:
+      fixed:0.5 | uniform:0.2,1.5 | exp:0.8 (mean) | lognormal:0.8,0.5 (median, sigma)
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "exp":
+        return lambda: random.expovariate(1 / values[0])
+    if kind == "lognormal":
+        import math
+        return lambda: random.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+@dataclass
+class MockConfig:
+    latency: str = "lognormal:0.8,0.5"
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: float = 1.0
+    # Streams: the latency is time to first token, then one chunk every `chunk_delay`
+    chunk_size: int = 12
+    chunk_delay: float = 0.01
+    seed: int = 0
+
+
+@dataclass
+class MockStats:
+    requests: int = 0
+    streams: int = 0
+    errors: int = 0
+    throttled: int = 0
+    by_model: Dict[str, int] = field(default_factory=dict)
+    started_at: float = field(default_factory=time.monotonic)
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "streams": self.streams,
+            "errors": self.errors,
+            "throttled": self.throttled,
+            "by_model": dict(self.by_model),
+            "uptime_seconds": round(time.monotonic() - self.started_at, 2)
+        }
+
+
+def create_app(config: MockConfig) -> Starlette:
+    sample_latency = parse_latency(config.latency)
+    rng = random.Random(config.seed)
+    stats = MockStats()
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats.requests += 1
+        model = body.get("model", "")
+        stats.by_model[model] = stats.by_model.get(model, 0) + 1
+
+        roll = rng.random()
+        if roll < config.throttle_rate:
+            stats.throttled += 1
+            return JSONResponse(
+                {"error": {"message": "Rate limit exceeded", "code": 429}},
+                status_code=429,
+                headers={"Retry-After": str(config.retry_after)}
+            )
+        await asyncio.sleep(sample_latency())
+        if roll < config.throttle_rate + config.error_rate:
+            stats.errors += 1
+            return JSONResponse({"error": {"message": "Upstream error", "code": 502}}, status_code=502)
+
+        messages: List[dict] = body.get("messages", [])
+        answer = canned_answer(messages[-1]["content"] if messages else "")
+
+        if body.get("stream"):
+            stats.streams += 1
+
+            async def events():
+                yield ": OPENROUTER PROCESSING\n\n"
+                for i in range(0, len(answer), config.chunk_size):
+                    chunk = {"choices": [{"delta": {"content": answer[i:i + config.chunk_size]}}]}
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                    await asyncio.sleep(config.chunk_delay)
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        return JSONResponse({
+            "id": f"mock-{stats.requests}",
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": answer}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(messages[-1]["content"]) // 4 if messages else 0, "completion_tokens": len(answer) // 4}
+        })
+
+    async def get_stats(request: Request):
+        return JSONResponse(stats.to_dict())
+
+    app = Starlette(routes=[
+        Route("/chat/completions", chat_completions, methods=["POST"]),
+        Route("/api/v1/chat/completions", chat_completions, methods=["POST"]),
+        Route("/stats", get_stats)
+    ])
+    app.state.stats = stats
+    return app
+
+
+def start_in_thread(config: MockConfig, port: int) -> uvicorn.Server:
+    """Runs the mock on its own thread and event loop; returns once it accepts connections."""
+    server = uvicorn.Server(uvicorn.Config(create_app(config), host="127.0.0.1", port=port, log_level="error"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency", default=MockConfig.latency, help="fixed:S | uniform:A,B | exp:MEAN | lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of calls answered with a 502")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of calls answered with a 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def config_from_args(args) -> MockConfig:
+    return MockConfig(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        seed=args.seed
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local OpenRouter stand-in")
+    parser.add_argument("--port", type=int, default=18555)
+    add_arguments(parser)
+    args = parser.parse_args()
+    print(f"🚀 Mock OpenRouter on http://127.0.0.1:{args.port} (latency {args.latency})")
+    uvicorn.run(create_app(config_from_args(args)), host="127.0.0.1", port=args.port, log_level="warning")
@@ -0,0 +1,235 @@
+# benchmarks/parser_bench.py
+"""
+Resume-extraction benchmark: builds a synthetic corpus (PDF / TXT / DOCX, 1-20 pages, several
+layouts, a few damaged PDFs) and runs every extraction backend over it, each in a fresh process
+so peak RSS is per backend. Reports pages/sec, MB/sec, peak RSS, fallback rate and how closely
+the extracted text matches the text the document was built from.
+
+    python -m benchmarks.parser_bench --docs 200
+    python -m benchmarks.parser_bench --check benchmarks/parser_thresholds.json   # exit 1 on regression
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+try:
+    import resource  # not available on Windows
+except ImportError:
+    resource = None
+
+from benchmarks import corpus
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+DEFAULT_THRESHOLDS = os.path.join(os.path.dirname(__file__), "parser_thresholds.json")
+
+# Backend -> formats it handles. parse_resume is the production path (with the pdfplumber fallback).
+BACKENDS = {
+    "parse_resume": ("pdf", "txt", "docx"),
+    "pymupdf": ("pdf",),
+    "pdfplumber": ("pdf",),
+    "txt": ("txt",),
+    "docx": ("docx",)
+}
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def text_similarity(extracted: str, reference: str) -> float:
+    """Token-bag F1 between extracted and reference text; insensitive to column order and wrapping."""
+    got = Counter(_TOKEN.findall(extracted.lower()))
+    want = Counter(_TOKEN.findall(reference.lower()))
+    if not got and not want:
+        return 1.0
+    overlap = sum((got & want).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(got.values())
+    recall = overlap / sum(want.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _extract(backend: str, doc: dict) -> dict:
+    from app.services import resume_parser
+
+    if backend == "parse_resume":
+        result = resume_parser.parse_resume(doc["content"], doc["name"])
+        if result.get("error"):
+            raise RuntimeError(result["error"])
+        return {"text": result["parsed_text"], "pages": result["page_count"], "backend": result["backend"]}
+
+    iterators = {
+        "pymupdf": resume_parser._iter_pdf_pymupdf,
+        "pdfplumber": resume_parser._iter_pdf_pdfplumber,
+        "txt": resume_parser._iter_txt,
+        "docx": resume_parser._iter_docx
+    }
+    pages = list(iterators[backend](doc["content"], {}))
+    return {"text": "".join(pages), "pages": len(pages), "backend": backend}
+
+
+def run_backend(backend: str, docs: List[dict], repeat: int = 1) -> dict:
+    """Runs one backend over its documents (called in a fresh worker process)."""
+    import contextlib
+    import io
+
+    # Import cost and interpreter memory are not part of the measurement
+    from app.services import resume_parser  # noqa: F401
+    baseline_rss = _peak_rss_mb()
+
+    docs = [d for d in docs if d["format"] in BACKENDS[backend]]
+    pages = total_bytes = errors = fallbacks = 0
+    similarities: Dict[str, List[float]] = {}
+    elapsed = 0.0
+    for _ in range(repeat):
+        for doc in docs:
+            started = time.perf_counter()
+            try:
+                # parse_resume prints on fallback / failure; keep the report readable
+                with contextlib.redirect_stdout(io.StringIO()):
+                    out = _extract(backend, doc)
+            except Exception:
+                elapsed += time.perf_counter() - started
+                errors += 1
+                continue
+            elapsed += time.perf_counter() - started
+            pages += out["pages"]
+            total_bytes += len(doc["content"])
+            if backend == "parse_resume" and out["backend"] == "pdfplumber":
+                fallbacks += 1
+            key = "damaged" if doc["damaged"] else doc["format"]
+            similarities.setdefault(key, []).append(text_similarity(out["text"], doc["reference"]))
+
+    runs = len(docs) * repeat
+    clean = [s for key, values in similarities.items() if key != "damaged" for s in values]
+    pdf_runs = sum(1 for d in docs if d["format"] == "pdf") * repeat
+    return {
+        "documents": len(docs),
+        "runs": runs,
+        "pages": pages,
+        "megabytes": round(total_bytes / 1e6, 3),
+        "seconds": round(elapsed, 4),
+        "pages_per_sec": round(pages / elapsed, 2) if elapsed else 0.0,
+        "mb_per_sec": round(total_bytes / 1e6 / elapsed, 3) if elapsed else 0.0,
+        "docs_per_sec": round((runs - errors) / elapsed, 2) if elapsed else 0.0,
+        "errors": errors,
+        "error_rate": round(errors / runs, 4) if runs else 0.0,
+        "fallbacks": fallbacks,
+        "fallback_rate": round(fallbacks / pdf_runs, 4) if backend == "parse_resume" and pdf_runs else None,
+        "similarity_mean": round(sum(clean) / len(clean), 4) if clean else None,
+        "similarity_min": round(min(clean), 4) if clean else None,
+        "similarity_by_kind": {key: round(sum(v) / len(v), 4) for key, v in similarities.items()},
+        "baseline_rss_mb": baseline_rss,
+        "peak_rss_mb": _peak_rss_mb()
+    }
+
+
+def run_all(docs: List[dict], backends: List[str], repeat: int = 1) -> Dict[str, dict]:
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for backend in backends:
+        # A fresh process per backend keeps peak RSS from leaking between them
+        with context.Pool(1) as pool:
+            results[backend] = pool.apply(run_backend, (backend, docs, repeat))
+    return results
+
+
+def check_thresholds(results: Dict[str, dict], thresholds: Dict[str, dict]) -> List[str]:
+    """
+    Thresholds are {backend: {metric: limit}}; metrics starting with "min_"/"max_" are lower/upper
+    bounds on the metric of the same name, e.g. {"parse_resume": {"min_pages_per_sec": 200}}.
+    Returns the list of violations (empty when everything passes).
+    """
+    failures = []
+    for backend, limits in thresholds.items():
+        if backend not in results:
+            continue
+        for key, limit in limits.items():
+            bound, metric = key.split("_", 1)
+            value = results[backend].get(metric)
+            if value is None:
+                continue
+            if (bound == "min" and value < limit) or (bound == "max" and value > limit):
+                failures.append(f"{backend}.{metric} = {value} (limit {key} {limit})")
+    return failures
+
+
+def print_report(results: Dict[str, dict]):
+    header = f"{'backend':<14}{'docs':>6}{'pages':>7}{'pages/s':>10}{'MB/s':>8}{'peak MB':>9}{'fallback':>10}{'errors':>8}{'sim':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        fallback = f"{r['fallback_rate']:.1%}" if r["fallback_rate"] is not None else "-"
+        print(
+            f"{name:<14}{r['documents']:>6}{r['pages']:>7}{r['pages_per_sec']:>10.1f}{r['mb_per_sec']:>8.2f}"
+            f"{r['peak_rss_mb'] or 0:>9.1f}{fallback:>10}{r['errors']:>8}{r['similarity_mean'] or 0:>8.3f}"
+        )
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Resume extraction benchmark")
+    parser.add_argument("--docs", type=int, default=100, help="Documents in the synthetic corpus")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1, help="Passes over the corpus per backend")
+    parser.add_argument("--damaged-rate", type=float, default=0.05, help="Share of PDFs truncated")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help=f"Comma-separated: {', '.join(BACKENDS)}")
+    parser.add_argument("--output", help="Result JSON path (default benchmarks/results/parser-<timestamp>.json)")
+    parser.add_argument("--check", nargs="?", const=DEFAULT_THRESHOLDS, help="Threshold JSON; exit 1 on violations")
+    args = parser.parse_args(argv)
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    unknown = set(backends) - set(BACKENDS)
+    if unknown:
+        parser.error(f"unknown backends: {', '.join(sorted(unknown))}")
+
+    started = time.perf_counter()
+    docs = corpus.make_parser_corpus(args.docs, seed=args.seed, damaged_rate=args.damaged_rate)
+    formats = Counter(d["format"] for d in docs)
+    print(
+        f"📚 {len(docs)} documents ({', '.join(f'{n} {f}' for f, n in sorted(formats.items()))}, "
+        f"{sum(d['damaged'] for d in docs)} damaged) built in {time.perf_counter() - started:.1f}s"
+    )
+
+    results = run_all(docs, backends, repeat=args.repeat)
+    print()
+    print_report(results)
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "config": {"docs": args.docs, "seed": args.seed, "repeat": args.repeat, "damaged_rate": args.damaged_rate},
+        "backends": results
+    }
+    output = args.output or os.path.join(RESULTS_DIR, "parser-" + datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Results saved to {output}")
+
+    if args.check:
+        with open(args.check, encoding="utf-8") as f:
+            failures = check_thresholds(results, json.load(f))
+        if failures:
+            print("\n❌ Threshold violations:")
+            for failure in failures:
+                print("  -", failure)
+            sys.exit(1)
+        print("\n✅ All thresholds met")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# benchmarks/test_parser_bench.py
+"""
+The parser benchmark as a pytest check: a small synthetic corpus through every backend, held to
+benchmarks/parser_thresholds.json. Each backend runs in a fresh process, so it is opt-in:
+
+    RUN_BENCHMARKS=1 python -m pytest benchmarks -m benchmark
+"""
+
+import json
+import os
+
+import pytest
+
+from benchmarks import corpus
+from benchmarks.parser_bench import BACKENDS, DEFAULT_THRESHOLDS, check_thresholds, run_all
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.skipif(not os.getenv("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS=1 to run benchmarks")
+]
+
+# Enough documents for every format, layout and a damaged PDF, small enough for a test run
+BENCH_DOCS = int(os.getenv("PARSER_BENCH_DOCS", 40))
+
+
+@pytest.fixture(scope="module")
+def results():
+    docs = corpus.make_parser_corpus(BENCH_DOCS, seed=0)
+    return run_all(docs, list(BACKENDS))
+
+
+def test_every_backend_ran(results):
+    assert set(results) == set(BACKENDS)
+    for backend, result in results.items():
+        assert result["runs"] > 0, backend
+
+
+def test_parser_thresholds(results):
+    with open(DEFAULT_THRESHOLDS, encoding="utf-8") as f:
+        thresholds = json.load(f)
+    assert check_thresholds(results, thresholds) == []
@@ -1,16 +1,5 @@
-import os
-import httpx
-from dotenv import load_dotenv
-
-load_dotenv()
-
-api_key = os.getenv("OPENROUTER_API_KEY")
-headers = {
-    "Authorization": f"Bearer {api_key}",
-    "HTTP-Referer": "https://yourdomain.com",
-    "X-Title": "Resume Analyzer",
-    "Content-Type": "application/json"
-}
+import asyncio
+from app.services.llm_client import post_chat_completion, close_llm_client, get_transport_stats
 
 body = {
     "model": "deepseek/deepseek-chat-v3-0324:free",
@@ -20,10 +9,12 @@ body = {
 }
 
 async def test():
-    async with httpx.AsyncClient() as client:
-        res = await client.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=body)
+    # Two calls over the shared client: the second should reuse the pooled connection
+    for _ in range(2):
+        res = await post_chat_completion(body)
         print("Status:", res.status_code)
         print("Response:", res.text)
+    print("Transport:", get_transport_stats())
+    await close_llm_client()
 
-import asyncio
 asyncio.run(test())
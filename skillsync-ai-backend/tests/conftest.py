@@ -0,0 +1,15 @@
+# tests/conftest.py
+#
+# Unit tests: no MongoDB, LLM provider or browser needed (the job queue tests use
+# mongomock-motor and are skipped without it). Run from skillsync-ai-backend/:
+#   python -m pytest tests
+
+import os
+import sys
+
+# Importing app.db.database builds a (lazy) Motor client; point it at nothing so a missing
+# .env doesn't matter. Tests that need Mongo swap in mongomock (see test_job_queue.py).
+os.environ.setdefault("MONGO_URL", "mongodb://127.0.0.1:1/?serverSelectionTimeoutMS=200")
+os.environ.setdefault("MONGO_TLS", "false")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
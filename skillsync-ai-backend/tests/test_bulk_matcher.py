@@ -0,0 +1,61 @@
+# tests/test_bulk_matcher.py
+
+import asyncio
+
+import pytest
+
+from app.services import bulk_matcher
+from app.services.bulk_matcher import LLMMicroBatcher, _guarded
+
+
+@pytest.fixture
+def batch_calls(monkeypatch):
+    calls = []
+
+    async def fake_batch(resume_texts, jd_text):
+        calls.append(list(resume_texts))
+        await asyncio.sleep(0.01)
+        return [f"result:{text}" for text in resume_texts]
+
+    monkeypatch.setattr(bulk_matcher, "match_resumes_with_jd_batch", fake_batch)
+    monkeypatch.setattr(bulk_matcher, "LLM_BATCH_MAX_CANDIDATES", 3)
+    return calls
+
+
+def test_micro_batcher_groups_submissions(batch_calls):
+    async def scenario():
+        batcher = LLMMicroBatcher("jd", asyncio.Semaphore(2), window_ms=20)
+        results = await asyncio.gather(*(batcher.submit(f"r{i}") for i in range(5)))
+        await batcher.close()
+        return results
+
+    results = asyncio.run(scenario())
+    assert results == [f"result:r{i}" for i in range(5)]
+    # A full batch is sent at once, the remainder when the window closes
+    assert batch_calls == [["r0", "r1", "r2"], ["r3", "r4"]]
+
+
+def test_micro_batcher_cancel_drops_pending_and_in_flight_work(batch_calls):
+    async def scenario():
+        batcher = LLMMicroBatcher("jd", asyncio.Semaphore(1), window_ms=1000)
+        waiting = [asyncio.create_task(batcher.submit(f"r{i}")) for i in range(4)]
+        await asyncio.sleep(0)
+        # r0-r2 went out as a batch; r3 is still waiting for the window
+        await batcher.cancel()
+        return await asyncio.gather(*waiting, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, (asyncio.CancelledError, bulk_matcher.BulkMatchError)) for result in results)
+
+
+def test_guarded_reports_failures_unless_passed_through():
+    async def fails(error):
+        raise error
+
+    async def scenario():
+        reported = await _guarded("cv.pdf", fails(bulk_matcher.BulkMatchError("bad file")))
+        assert reported == {"resume_name": "cv.pdf", "status": False, "error": "bad file"}
+        with pytest.raises(TimeoutError):
+            await _guarded("cv.pdf", fails(TimeoutError()), passthrough=(TimeoutError,))
+
+    asyncio.run(scenario())
@@ -0,0 +1,196 @@
+# tests/test_job_queue.py
+#
+# Lease, heartbeat, reclaim and retry logic of the bulk job queue against an in-memory Mongo.
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from app.services import job_queue
+from app.services.job_queue import ITEM_FAILED, JOB_COMPLETED, JOB_QUEUED, JOB_RUNNING, JobWorkerPool
+from app.services.llm_limiter import LLMUnavailableError
+
+
+@pytest.fixture
+def queue_db(monkeypatch):
+    database = mongomock_motor.AsyncMongoMockClient().test_queue
+    monkeypatch.setattr(job_queue, "db", database)
+    return database
+
+
+@pytest.fixture
+def deleted_files(monkeypatch):
+    # GridFS file ids the queue deleted
+    deleted = []
+
+    async def delete_job_files(file_ids):
+        deleted.extend(file_ids)
+
+    monkeypatch.setattr(job_queue, "delete_job_files", delete_job_files)
+    return deleted
+
+
+async def _submit(count: int = 1) -> ObjectId:
+    files = [{"filename": f"r{i}.txt", "content_type": "text/plain", "file_id": ObjectId()} for i in range(count)]
+    return ObjectId(await job_queue.submit_job("python sql", files))
+
+
+def test_claim_leases_the_oldest_item_once(queue_db):
+    async def scenario():
+        job_id = await _submit(2)
+        first, second = JobWorkerPool(1), JobWorkerPool(1)
+
+        item = await first._claim()
+        assert item["index"] == 0
+        assert item["status"] == JOB_RUNNING
+        assert item["worker_id"] == first.worker_id
+        assert item["attempts"] == 1
+        assert item["lease_expires_at"] > datetime.utcnow()
+
+        # A leased item is not handed out again
+        other = await second._claim()
+        assert other["index"] == 1
+        assert await second._claim() is None
+        assert await queue_db.bulk_job_items.count_documents({"job_id": job_id, "status": JOB_RUNNING}) == 2
+
+    asyncio.run(scenario())
+
+
+def test_expired_lease_is_reclaimed_and_the_old_worker_cannot_finish(queue_db, deleted_files):
+    async def scenario():
+        await _submit(1)
+        crashed, rescuer = JobWorkerPool(1), JobWorkerPool(1)
+
+        item = await crashed._claim()
+        await queue_db.bulk_job_items.update_one(
+            {"_id": item["_id"]},
+            {"$set": {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}}
+        )
+
+        reclaimed = await rescuer._claim()
+        assert reclaimed["_id"] == item["_id"]
+        assert reclaimed["worker_id"] == rescuer.worker_id
+        assert reclaimed["attempts"] == 2
+
+        # The worker that lost its lease finishes late: the write is ignored
+        await crashed._finish_item(item, {"resume_name": "r0.txt", "status": True})
+        current = await queue_db.bulk_job_items.find_one({"_id": item["_id"]})
+        assert current["status"] == JOB_RUNNING
+        assert current["worker_id"] == rescuer.worker_id
+        assert deleted_files == []
+
+    asyncio.run(scenario())
+
+
+def test_heartbeat_extends_the_lease(queue_db, monkeypatch):
+    monkeypatch.setattr(job_queue, "BULK_JOB_LEASE_SECONDS", 0.3)
+
+    async def scenario():
+        await _submit(1)
+        pool = JobWorkerPool(1)
+        item = await pool._claim()
+
+        heartbeat = asyncio.create_task(pool._heartbeat(item["_id"]))
+        await asyncio.sleep(0.25)
+        heartbeat.cancel()
+
+        current = await queue_db.bulk_job_items.find_one({"_id": item["_id"]})
+        assert current["lease_expires_at"] > item["lease_expires_at"]
+
+    asyncio.run(scenario())
+
+
+def test_transient_error_requeues_with_backoff_and_keeps_the_file(queue_db, deleted_files, monkeypatch):
+    monkeypatch.setattr(job_queue, "BULK_JOB_RETRY_SECONDS", 0.2)
+
+    async def scenario():
+        await _submit(1)
+        pool = JobWorkerPool(1)
+        item = await pool._claim()
+
+        await pool._retry_item(item, LLMUnavailableError("circuit open", retry_after=0.1))
+        current = await queue_db.bulk_job_items.find_one({"_id": item["_id"]})
+        assert current["status"] == JOB_QUEUED
+        assert current["file_id"] == item["file_id"]
+        assert current["not_before"] > datetime.utcnow()
+        assert deleted_files == []
+
+        # Not claimable until the backoff has passed
+        assert await pool._claim() is None
+        await asyncio.sleep(0.25)
+        again = await pool._claim()
+        assert again["_id"] == item["_id"]
+        assert again["attempts"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_transient_error_fails_the_item_after_max_attempts(queue_db, deleted_files, monkeypatch):
+    monkeypatch.setattr(job_queue, "BULK_JOB_MAX_ATTEMPTS", 1)
+
+    async def scenario():
+        job_id = await _submit(1)
+        pool = JobWorkerPool(1)
+        item = await pool._claim()
+
+        await pool._retry_item(item, LLMUnavailableError("circuit open"))
+        current = await queue_db.bulk_job_items.find_one({"_id": item["_id"]})
+        assert current["status"] == ITEM_FAILED
+        assert "Gave up after 1 attempts" in current["result"]["error"]
+        assert deleted_files == [item["file_id"]]
+
+        job = await queue_db.bulk_jobs.find_one({"_id": job_id})
+        assert job["status"] == JOB_COMPLETED
+        assert job["failed"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_item_that_keeps_losing_its_lease_is_given_up(queue_db, monkeypatch):
+    monkeypatch.setattr(job_queue, "BULK_JOB_MAX_ATTEMPTS", 2)
+
+    async def scenario():
+        await _submit(1)
+        pool = JobWorkerPool(1)
+        for _ in range(3):
+            item = await pool._claim()
+            await queue_db.bulk_job_items.update_one(
+                {"_id": item["_id"]},
+                {"$set": {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}}
+            )
+
+        # Third claim: over the limit, so it is not processed again
+        result = await pool._run_item(item)
+        assert result["status"] is False
+        assert "Gave up after 2 attempts" in result["error"]
+
+    asyncio.run(scenario())
+
+
+def test_worker_requeues_on_transient_errors(queue_db, monkeypatch):
+    monkeypatch.setattr(job_queue, "BULK_JOB_RETRY_SECONDS", 30)
+    monkeypatch.setattr(job_queue, "BULK_JOB_POLL_SECONDS", 0.01)
+
+    async def scenario():
+        await _submit(1)
+        pool = JobWorkerPool(1)
+
+        async def run_item(item):
+            raise LLMUnavailableError("circuit open")
+
+        pool._run_item = run_item
+        worker = asyncio.create_task(pool._work())
+        await asyncio.sleep(0.1)
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+
+        item = await queue_db.bulk_job_items.find_one({})
+        assert item["status"] == JOB_QUEUED
+        assert item["attempts"] == 1
+        assert "worker_id" not in item
+
+    asyncio.run(scenario())
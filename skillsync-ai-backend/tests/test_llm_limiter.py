@@ -0,0 +1,142 @@
+# tests/test_llm_limiter.py
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import llm_limiter
+from app.services.llm_limiter import (
+    BREAKER_CLOSED,
+    BREAKER_HALF_OPEN,
+    BREAKER_OPEN,
+    LLMLimiter,
+    LLMUnavailableError,
+    parse_retry_after
+)
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    monkeypatch.setattr(llm_limiter, "LLM_BREAKER_FAILURES", 3)
+    monkeypatch.setattr(llm_limiter, "LLM_BREAKER_COOLDOWN_SECONDS", 0.05)
+    monkeypatch.setattr(llm_limiter, "LLM_DECREASE_COOLDOWN_SECONDS", 0)
+    return LLMLimiter()
+
+
+async def _call(limiter: LLMLimiter, status: int):
+    async with limiter.slot() as slot:
+        slot.observe(httpx.Response(status))
+
+
+async def _open_breaker(limiter: LLMLimiter):
+    for _ in range(3):
+        await _call(limiter, 503)
+
+
+def test_breaker_opens_after_consecutive_failures(limiter):
+    async def scenario():
+        await _call(limiter, 503)
+        await _call(limiter, 503)
+        assert limiter.breaker_state == BREAKER_CLOSED
+        await _call(limiter, 503)
+        assert limiter.breaker_state == BREAKER_OPEN
+        with pytest.raises(LLMUnavailableError) as error:
+            await limiter.acquire()
+        assert error.value.retry_after >= 1.0
+        assert limiter.stats()["rejected_breaker_open"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_success_resets_the_failure_count(limiter):
+    async def scenario():
+        await _call(limiter, 503)
+        await _call(limiter, 503)
+        await _call(limiter, 200)
+        await _call(limiter, 503)
+        await _call(limiter, 503)
+        assert limiter.breaker_state == BREAKER_CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_half_open_lets_one_probe_through_and_closes_on_success(limiter):
+    async def scenario():
+        await _open_breaker(limiter)
+        await asyncio.sleep(0.06)
+        assert limiter.breaker_state == BREAKER_HALF_OPEN
+
+        probe = limiter.slot()
+        slot = await probe.__aenter__()
+        # Only the probe is admitted while it is in flight
+        with pytest.raises(LLMUnavailableError):
+            await limiter.acquire()
+        slot.observe(httpx.Response(200))
+        await probe.__aexit__(None, None, None)
+
+        assert limiter.breaker_state == BREAKER_CLOSED
+        await _call(limiter, 200)
+
+    asyncio.run(scenario())
+
+
+def test_failed_probe_reopens_the_breaker(limiter):
+    async def scenario():
+        await _open_breaker(limiter)
+        await asyncio.sleep(0.06)
+        await _call(limiter, 500)
+        assert limiter.breaker_state == BREAKER_OPEN
+        with pytest.raises(LLMUnavailableError):
+            await limiter.acquire()
+
+    asyncio.run(scenario())
+
+
+def test_transport_errors_count_as_failures(limiter):
+    async def scenario():
+        for _ in range(3):
+            with pytest.raises(httpx.ConnectError):
+                async with limiter.slot():
+                    raise httpx.ConnectError("refused")
+        assert limiter.breaker_state == BREAKER_OPEN
+        assert limiter.stats()["transport_errors"] == 3
+        assert limiter.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_limit_backs_off_on_429_and_grows_on_success(limiter):
+    async def scenario():
+        start = limiter.limit
+        await _call(limiter, 429)
+        assert limiter.limit == start * llm_limiter.LLM_LIMIT_BACKOFF_RATIO
+        reduced = limiter.limit
+        await _call(limiter, 200)
+        assert limiter.limit > reduced
+
+    asyncio.run(scenario())
+
+
+def test_callers_over_the_limit_queue_in_order(limiter):
+    async def scenario():
+        limiter.limit = 1
+        order = []
+
+        async def worker(name: str):
+            async with limiter.slot():
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(worker(name) for name in "abc"))
+        assert order == ["a", "b", "c"]
+        assert limiter.stats()["queued"] == 2
+        assert limiter.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
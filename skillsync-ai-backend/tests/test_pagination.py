@@ -0,0 +1,65 @@
+# tests/test_pagination.py
+
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_condition
+
+
+def test_cursor_round_trips_sort_key_values():
+    values = [87, datetime(2026, 5, 1, 12, 30, 15, 123000), ObjectId()]
+    cursor = encode_cursor(values)
+
+    assert isinstance(cursor, str)
+    assert decode_cursor(cursor, 3) == values
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor(["a/b+c?" * 10, None])
+    assert all(ch.isalnum() or ch in "-_=" for ch in cursor)
+    assert decode_cursor(cursor, 2) == ["a/b+c?" * 10, None]
+
+
+def test_bad_cursors_decode_to_none():
+    assert decode_cursor("not a cursor", 2) is None
+    assert decode_cursor(encode_cursor([1, ObjectId()]), 3) is None
+
+
+def test_keyset_condition_descending():
+    oid = ObjectId()
+    condition = keyset_condition(["fit_percentage", "_id"], -1, [80, oid])
+    assert condition == {"$or": [
+        {"fit_percentage": {"$lt": 80}},
+        {"fit_percentage": 80, "_id": {"$lt": oid}}
+    ]}
+
+
+def test_keyset_pages_cover_every_row_once():
+    # Same order Mongo would use: fit_percentage desc, then _id desc as the tie-breaker
+    rows = [{"fit_percentage": score, "_id": ObjectId()} for score in (90, 80, 80, 80, 70, 60)]
+    ordered = sorted(rows, key=lambda r: (r["fit_percentage"], r["_id"]), reverse=True)
+    fields = ["fit_percentage", "_id"]
+
+    def after(row, condition):
+        return any(
+            all(
+                (row[f] < v["$lt"]) if isinstance(v, dict) else row[f] == v
+                for f, v in branch.items()
+            )
+            for branch in condition["$or"]
+        )
+
+    seen, cursor = [], None
+    while True:
+        candidates = ordered
+        if cursor is not None:
+            condition = keyset_condition(fields, -1, decode_cursor(cursor, 2))
+            candidates = [row for row in ordered if after(row, condition)]
+        page = candidates[:2]
+        seen += page
+        if len(page) < 2:
+            break
+        cursor = encode_cursor([page[-1][f] for f in fields])
+
+    assert seen == ordered
@@ -0,0 +1,91 @@
+# tests/test_singleflight.py
+
+import asyncio
+
+import pytest
+
+from app.utils.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    async def scenario():
+        flight = SingleFlight()
+        calls = 0
+
+        async def fn():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        results = await asyncio.gather(*(flight.do("k", fn) for _ in range(5)))
+        assert results == [1] * 5
+        assert calls == 1
+        assert flight.coalesced == 4
+        assert flight.in_flight() == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_leader_does_not_cancel_the_shared_call():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+        calls = 0
+
+        async def fn():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return 42
+
+        leader = asyncio.create_task(flight.do("k", fn))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(flight.do("k", fn)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        release.set()
+
+        assert await asyncio.gather(*followers) == [42, 42]
+        assert calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_failure_reaches_every_caller_and_clears_the_key():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def fails():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(flight.do("k", fails), flight.do("k", fails), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert flight.in_flight() == 0
+
+        async def works():
+            return "ok"
+
+        # The next call runs afresh instead of replaying the failure
+        assert await flight.do("k", works) == "ok"
+
+    asyncio.run(scenario())
+
+
+def test_different_keys_run_separately():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def value(v):
+            await asyncio.sleep(0.01)
+            return v
+
+        results = await asyncio.gather(flight.do("a", lambda: value(1)), flight.do("b", lambda: value(2)))
+        assert results == [1, 2]
+        assert flight.coalesced == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,195 @@
+# tests/test_uploads.py
+
+import asyncio
+import os
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.routes import recruit
+from app.services.parsing_service import close_parser_pool
+from app.utils import uploads
+from app.utils.uploads import UploadRejected, iter_multipart
+
+BOUNDARY = "testboundary"
+
+
+def _body(parts) -> bytes:
+    """multipart/form-data body from (name, value) fields and (name, filename, content_type, bytes) files, in order."""
+    chunks = []
+    for part in parts:
+        chunks.append(f"--{BOUNDARY}\r\n".encode())
+        if len(part) == 2:
+            name, value = part
+            chunks.append(f'Content-Disposition: form-data; name="{name}"\r\n\r\n'.encode())
+            chunks.append(value.encode() if isinstance(value, str) else value)
+        else:
+            name, filename, content_type, content = part
+            chunks.append(
+                f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                f"Content-Type: {content_type}\r\n\r\n".encode()
+            )
+            chunks.append(content)
+        chunks.append(b"\r\n")
+    chunks.append(f"--{BOUNDARY}--\r\n".encode())
+    return b"".join(chunks)
+
+
+class _Request:
+    """The two things iter_multipart reads from a Starlette request; the body arrives in small chunks."""
+
+    def __init__(self, body: bytes, chunk: int = 1000):
+        self.headers = {"content-type": f"multipart/form-data; boundary={BOUNDARY}", "content-length": str(len(body))}
+        self._body = body
+        self._chunk = chunk
+
+    async def stream(self):
+        for start in range(0, len(self._body), self._chunk):
+            yield self._body[start:start + self._chunk]
+
+
+async def _collect(request, **kwargs):
+    return [part async for part in iter_multipart(request, **kwargs)]
+
+
+def test_fields_and_files_in_any_order():
+    body = _body([
+        ("resumes", "a.txt", "text/plain", b"python developer"),
+        ("jd_text", "python sql"),
+        ("resumes", "b.pdf", "application/pdf", b"%PDF-1.4 minimal"),
+        ("top_k", "3")
+    ])
+    parts = asyncio.run(_collect(_Request(body)))
+
+    assert [(part.name, part.is_file) for part in parts] == [
+        ("resumes", True), ("jd_text", False), ("resumes", True), ("top_k", False)
+    ]
+    assert parts[0].upload.content == b"python developer"
+    assert parts[0].upload.format == "txt"
+    assert parts[1].value == "python sql"
+    assert parts[2].upload.format == "pdf"
+    assert parts[3].value == "3"
+
+
+def test_type_is_sniffed_not_trusted():
+    body = _body([("resumes", "cv.pdf", "application/pdf", b"\x89PNG\r\n\x1a\n" + b"\x00" * 2000)])
+    with pytest.raises(UploadRejected) as error:
+        asyncio.run(_collect(_Request(body)))
+    assert error.value.kind == "type"
+
+
+def test_oversized_file_is_cut_off_or_reported(monkeypatch):
+    big = b"%PDF-1.4\n" + b"0" * 5000
+    body = _body([("resumes", "big.pdf", "application/pdf", big), ("resumes", "ok.txt", "text/plain", b"fine")])
+
+    with pytest.raises(UploadRejected) as error:
+        asyncio.run(_collect(_Request(body), max_bytes=2000))
+    assert error.value.kind == "size"
+
+    # skip_rejected: the bad file is reported and the rest of the body still parses
+    parts = asyncio.run(_collect(_Request(body), max_bytes=2000, skip_rejected=True))
+    assert parts[0].upload.error.kind == "size"
+    assert parts[1].upload.content == b"fine"
+
+
+def test_large_files_are_spooled_and_deleted_on_close(monkeypatch, tmp_path):
+    monkeypatch.setattr(uploads, "UPLOAD_SPOOL_THRESHOLD_BYTES", 2048)
+    monkeypatch.setattr(uploads, "UPLOAD_TMP_DIR", str(tmp_path))
+    content = b"%PDF-1.4\n" + b"1" * 10000
+    parts = asyncio.run(_collect(_Request(_body([("file", "a.pdf", "application/pdf", content)]))))
+
+    upload = parts[0].upload
+    assert upload.content is None and upload.path is not None
+    assert asyncio.run(upload.read()) == content
+    upload.close()
+    assert os.listdir(tmp_path) == []
+
+
+def test_abandoned_stream_leaves_no_temp_file(monkeypatch, tmp_path):
+    monkeypatch.setattr(uploads, "UPLOAD_SPOOL_THRESHOLD_BYTES", 2048)
+    monkeypatch.setattr(uploads, "UPLOAD_TMP_DIR", str(tmp_path))
+    body = _body([("file", "a.pdf", "application/pdf", b"%PDF-1.4\n" + b"1" * 10000)])
+
+    async def scenario():
+        parts = iter_multipart(_Request(body[:-3000]))
+        # The body ends mid-file; the parser stops without yielding it
+        assert [part async for part in parts] == []
+
+    asyncio.run(scenario())
+    assert os.listdir(tmp_path) == []
+
+
+def test_non_multipart_body_is_rejected():
+    request = _Request(b"jd_text=x")
+    request.headers["content-type"] = "application/x-www-form-urlencoded"
+    with pytest.raises(UploadRejected) as error:
+        asyncio.run(_collect(request))
+    assert error.value.kind == "form"
+
+
+# --- /recruit/bulk-match form handling ---
+
+@pytest.fixture
+def bulk_match_calls(monkeypatch):
+    calls = []
+
+    async def fake_run_bulk_match(jd_text, resumes, **options):
+        calls.append({"jd_text": jd_text, "files": [resume.filename for resume in resumes], **options})
+        return [{"resume_name": resume.filename, "status": True} for resume in resumes]
+
+    monkeypatch.setattr(recruit, "run_bulk_match", fake_run_bulk_match)
+    yield calls
+    # Resumes start parsing as they arrive, which may have started the parser pool
+    close_parser_pool()
+
+
+def _post_bulk_match(body: bytes) -> httpx.Response:
+    app = FastAPI()
+    app.include_router(recruit.router)
+
+    async def send():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post(
+                "/recruit/bulk-match",
+                content=body,
+                headers={"content-type": f"multipart/form-data; boundary={BOUNDARY}"}
+            )
+
+    return asyncio.run(send())
+
+
+def test_bulk_match_accepts_fields_after_files(bulk_match_calls):
+    body = _body([
+        ("resumes", "a.txt", "text/plain", b"python developer"),
+        ("resumes", "b.txt", "text/plain", b"java developer"),
+        ("jd_text", "python sql"),
+        ("min_skill_overlap", "40")
+    ])
+    response = _post_bulk_match(body)
+
+    assert response.status_code == 200
+    assert [match["resume_name"] for match in response.json()["matches"]] == ["a.txt", "b.txt"]
+    assert bulk_match_calls[0]["jd_text"] == "python sql"
+    assert bulk_match_calls[0]["min_skill_overlap"] == 40
+
+
+def test_bulk_match_applies_options_sent_after_the_files(bulk_match_calls):
+    # jd_text first, an option trailing the files: the option still applies
+    body = _body([
+        ("jd_text", "python sql"),
+        ("resumes", "a.txt", "text/plain", b"python developer"),
+        ("batched", "true")
+    ])
+    response = _post_bulk_match(body)
+
+    assert response.status_code == 200
+    assert bulk_match_calls[0]["batched"] is True
+
+
+def test_bulk_match_validates_late_fields(bulk_match_calls):
+    body = _body([("resumes", "a.txt", "text/plain", b"python developer"), ("concurrency", "999")])
+    response = _post_bulk_match(body)
+
+    assert response.status_code == 422
+    assert bulk_match_calls == []